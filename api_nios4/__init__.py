@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*- 
+#================================================================================
+#Copyright of Davide Sbreviglieri 2024
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+#DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+#FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+#DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+#SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+#CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+#OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE
+#================================================================================
+#API NIOS4
+#================================================================================
+#Client of the Nios4 web service. The public names are re-exported here, so
+#``from api_nios4 import api_nios4, MetadataCache`` works as with the former
+#single-file module:
+#  client     api_nios4, CallResult
+#  transport  Nios4Transport
+#  codec      JsonCodec
+#  caches     MetadataCache, QueryCache, FileCache
+#  retry      RetryPolicy, AdaptiveLimiter
+#  auth       TokenManager
+#  metrics    RequestMetrics
+#  transfer   UploadStream, TransferManager
+#  writes     SyncScheduler, WriteBehindBuffer
+#  pool       ClientPool
+#  coercer    RecordCoercer
+#  aio        AsyncNios4 (requires aiohttp)
+#================================================================================
+from .transport import Nios4Transport
+from .codec import JsonCodec
+from .caches import MetadataCache, QueryCache, FileCache
+from .retry import RetryPolicy, AdaptiveLimiter
+from .auth import TokenManager
+from .metrics import RequestMetrics
+from .transfer import UploadStream, TransferManager
+from .client import SCHEMA_SNAPSHOT_VERSION, CallResult, api_nios4
+from .writes import SyncScheduler, WriteBehindBuffer
+from .pool import ClientPool
+from .coercer import RecordCoercer
+from .aio import AsyncNios4
+
+__all__ = [
+    "api_nios4", "CallResult", "SCHEMA_SNAPSHOT_VERSION", "Nios4Transport", "JsonCodec",
+    "MetadataCache", "QueryCache", "FileCache", "RetryPolicy", "AdaptiveLimiter", "TokenManager",
+    "RequestMetrics", "UploadStream", "TransferManager", "SyncScheduler", "WriteBehindBuffer",
+    "ClientPool", "RecordCoercer", "AsyncNios4",
+]
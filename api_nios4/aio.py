@@ -0,0 +1,900 @@
+# -*- coding: utf-8 -*- 
+#================================================================================
+#Copyright of Davide Sbreviglieri 2024
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+#DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+#FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+#DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+#SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+#CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+#OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE
+#================================================================================
+#ASYNCIO CLIENT
+#================================================================================
+from __future__ import annotations
+
+from typing import Optional, Dict, Any, List
+from decimal import Decimal
+import threading
+import inspect
+import asyncio
+import copy
+import time
+import os
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from .codec import JsonCodec
+from .caches import MetadataCache, QueryCache
+from .retry import RetryPolicy
+from .metrics import RequestMetrics
+from .client import CallResult, _CALL_STATE, api_nios4
+from .writes import WriteBehindBuffer
+from .coercer import RecordCoercer
+
+class _AsyncFileSink:
+    #file written by a coroutine, the disk writes running in worker threads
+    #--------------------------------------------------------
+    def __init__(self,file:Any,chunk_size:int=1048576):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.size = 0
+    #--------------------------------------------------------
+    async def rewind(self):
+        #drop what a previous attempt wrote
+        if self.size:
+            await asyncio.to_thread(self.file.seek, 0)
+            await asyncio.to_thread(self.file.truncate)
+        self.size = 0
+    #--------------------------------------------------------
+    async def write(self,chunk:bytes):
+        await asyncio.to_thread(self.file.write, chunk)
+        self.size += len(chunk)
+
+class AsyncNios4(api_nios4):
+    #--------------------------------------------------------
+    def __init__(self,token:str = "",username:str = "",password:str="",
+                 pool_size:int=100,pool_size_per_host:int=0,max_concurrency:int=100,
+                 timeout:float=300,session:Any=None,codec:Optional[JsonCodec]=None,
+                 retry:Optional[RetryPolicy]=None,metrics:Optional[RequestMetrics]=None,thread_safe:bool=True,
+                 query_cache:Optional[QueryCache]=None,metadata_cache:Optional[MetadataCache]=None):
+        """
+        Initialize the asyncio client.
+
+        ``AsyncNios4`` mirrors the ``api_nios4`` surface with coroutines for
+        the record, metadata, file and synchronization calls. All the
+        coroutines share a single ``aiohttp`` connection pool, and the number
+        of requests in flight is bounded by ``max_concurrency``. The composite
+        calls without a native version (``get_records``,
+        ``save_records_batch``, ``sync_until_complete``, ``record_coercer``
+        and the schema snapshots) are coroutines too, running the blocking
+        implementation in a worker thread, and so are ``enable_write_behind``,
+        ``flush``, ``close`` and ``call``: every method of ``api_nios4`` that
+        may block is a coroutine here, so the class cannot be used in place
+        of a blocking client. The utility methods without I/O (``tid``,
+        ``check_value``, ``normalize_date``, ``create_data_file``,
+        ``set_defaults``, ``add_hook``...) are inherited unchanged.
+
+        Parameters
+        ----------
+        token : str, optional
+            Authentication token. Default is an empty string.
+        username : str, optional
+            Username for authentication. Default is an empty string.
+        password : str, optional
+            Password for authentication. Default is an empty string.
+        pool_size : int, optional
+            Maximum number of simultaneous connections of the pool. ``0``
+            means unlimited. Default 100.
+        pool_size_per_host : int, optional
+            Maximum number of simultaneous connections to the same host.
+            ``0`` means unlimited. Default 0.
+        max_concurrency : int, optional
+            Maximum number of requests in flight at the same time. Default 100.
+        timeout : float, optional
+            Total timeout in seconds of each request. Default 300.
+        session : aiohttp.ClientSession, optional
+            Pre-configured session to use. If omitted, a session is created on
+            first use inside the running event loop.
+        codec : JsonCodec, optional
+            JSON codec for request bodies and responses. Default ``JsonCodec()``.
+        retry : RetryPolicy, optional
+            Retry policy for transient failures. Default
+            ``RetryPolicy(max_attempts=1)`` (no retries).
+        metrics : RequestMetrics, optional
+            Request metrics aggregator (see ``api_nios4.add_hook``).
+        thread_safe : bool, optional
+            Keep ``dbname``, ``token`` and the error state per asyncio task
+            (and thread), so that coroutines run concurrently (``asyncio.gather``,
+            tasks) do not see each other's overrides and errors. Default
+            ``True``; ``False`` shares them on the client, which is only safe
+            when the coroutines are awaited one at a time.
+        query_cache : QueryCache, optional
+            Cache of ``find_records``/``fuzzy_records`` results, invalidated
+            by the writes of this client; it can be shared with synchronous
+            clients. If omitted, every query reaches the server.
+        metadata_cache : MetadataCache, optional
+            Cache of ``table_list``/``table_info``/``fields_info`` responses,
+            shared with the schema snapshots; it can be shared with
+            synchronous clients.
+
+        Raises
+        ------
+        ImportError
+            If ``aiohttp`` is not installed.
+
+        Examples
+        --------
+        >>> async with AsyncNios4(token="abc123") as client:
+        ...     await client.login()
+        ...     rows = await client.find_records("customers", dbname="mydb")
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncNios4 requires the aiohttp package (pip install aiohttp)")
+        super().__init__(token=token,username=username,password=password,codec=codec,retry=retry,metrics=metrics,
+                         thread_safe=thread_safe,query_cache=query_cache,metadata_cache=metadata_cache)
+        self.pool_size = pool_size
+        self.pool_size_per_host = pool_size_per_host
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.session = session
+        self._semaphore = None
+    #--------------------------------------------------------
+    async def __aenter__(self):
+        return self
+    #--------------------------------------------------------
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+    #--------------------------------------------------------
+    def __enter__(self):
+        raise TypeError("AsyncNios4 is an asynchronous context manager: use 'async with'")
+    #--------------------------------------------------------
+    async def aclose(self):
+        """
+        Close the shared ``aiohttp`` session, then flush the write-behind
+        buffers and close the blocking transport in a worker thread.
+        """
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+        await asyncio.to_thread(api_nios4.close, self)
+    #--------------------------------------------------------
+    async def close(self):
+        """
+        Close the client. Coroutine version of ``api_nios4.close``, same as ``aclose``.
+        """
+        await self.aclose()
+    #--------------------------------------------------------
+    async def flush(self):
+        """
+        Flush every write-behind buffer. Coroutine version of
+        ``api_nios4.flush``, run in a worker thread.
+        """
+        await asyncio.to_thread(api_nios4.flush, self)
+    #--------------------------------------------------------
+    async def _flush_write_behind(self,tablename:str):
+        #flush the buffer of the table (if any) before a direct write
+        buffer = self.write_behind.get((self.dbname, tablename))
+        if buffer is not None:
+            await asyncio.to_thread(buffer.flush)
+    #--------------------------------------------------------
+    async def enable_write_behind(self,tablename:str,dbname:str="",token:str="",max_rows:int=500,
+                                  max_delay:float=1.0) -> WriteBehindBuffer:
+        """
+        Buffer the ``save_record`` calls of a table. Coroutine version of
+        ``api_nios4.enable_write_behind``, run in a worker thread.
+
+        The buffered records are sent by the blocking client in the buffer
+        thread; ``save_record`` then returns an ``asyncio.Future`` resolving
+        to the response of the batch.
+        """
+        return await self._in_thread(api_nios4.enable_write_behind, tablename, dbname, token, max_rows, max_delay)
+    #--------------------------------------------------------
+    async def call(self,method:Any,*args,**kwargs) -> CallResult:
+        """
+        Await a client coroutine and return its outcome as a ``CallResult``.
+        Coroutine version of ``api_nios4.call``: in thread-safe mode the
+        ``dbname``/``token`` overrides only apply to this call.
+
+        Examples
+        --------
+        >>> results = await asyncio.gather(*(client.call(client.find_records, "customers", dbname=db) for db in dbnames))
+        """
+        reset = _CALL_STATE.set(_CALL_STATE.get()) if self.thread_safe else None
+        try:
+            value = method(*args, **kwargs)
+            if inspect.isawaitable(value):
+                value = await value
+            return CallResult(value, self.error_code, self.error_message, self.dbname, self.token)
+        finally:
+            if reset is not None:
+                _CALL_STATE.reset(reset)
+    #--------------------------------------------------------
+    def _get_session(self):
+        """
+        Return the shared session, creating it (and the concurrency limiter)
+        inside the running event loop on first use.
+        """
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size,limit_per_host=self.pool_size_per_host)
+            self.session = aiohttp.ClientSession(connector=connector,timeout=aiohttp.ClientTimeout(total=self.timeout))
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self.session
+    #--------------------------------------------------------
+    async def _request_async(self,method:str,url:str,idempotent:Optional[bool]=None,sink:Optional[_AsyncFileSink]=None,
+                             **kwargs) -> tuple[int, bytes]:
+        """
+        Send a request on the shared pool and return ``(status, body)``.
+
+        Transient failures are retried with the client ``RetryPolicy``, with
+        the same idempotency rules as ``api_nios4._request``, and the
+        instrumentation hooks are called around the request. With a ``sink``
+        the body of a 200 response is streamed into it instead of being
+        returned.
+        """
+        if not self.before_hooks and not self.after_hooks:
+            return await self._send_async(method, url, idempotent, None, sink, **kwargs)
+        event = self._request_event(method, url, kwargs.get("data"))
+        self._emit(self.before_hooks, event)
+        event = dict(event, status=None, bytes_received=None, retries=0, duration=0.0, error=None)
+        started = time.monotonic()
+        try:
+            status, body = await self._send_async(method, url, idempotent, event, sink, **kwargs)
+        except BaseException as e:
+            event["duration"] = time.monotonic() - started
+            event["error"] = type(e).__name__
+            self._emit(self.after_hooks, event)
+            raise
+        event["duration"] = time.monotonic() - started
+        event["status"] = status
+        event["bytes_received"] = sink.size if sink is not None and status == 200 else len(body)
+        self._emit(self.after_hooks, event)
+        return status, body
+    #--------------------------------------------------------
+    async def _send_async(self,method:str,url:str,idempotent:Optional[bool],event:Optional[dict],
+                          sink:Optional[_AsyncFileSink]=None,**kwargs) -> tuple[int, bytes]:
+        """
+        Send a request with the retry policy, recording the number of retries
+        in ``event`` if given.
+        """
+        session = self._get_session()
+        action = self._action(url)
+        if idempotent is None:
+            idempotent = method == "GET" or action in self.IDEMPOTENT_ACTIONS
+        retry = self.retry
+        retry.start()
+        attempt = 1
+        while True:
+            data = kwargs.get("data")
+            if attempt > 1 and hasattr(data, "seek"):
+                data.seek(0)
+            try:
+                async with self._semaphore:
+                    async with session.request(method, url, **kwargs) as response:
+                        status = response.status
+                        retry_after = response.headers.get("Retry-After")
+                        if sink is not None and status == 200:
+                            await sink.rewind()
+                            async for chunk in response.content.iter_chunked(sink.chunk_size):
+                                await sink.write(chunk)
+                            body = b""
+                        else:
+                            body = await response.read()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= retry.max_attempts or not (idempotent or isinstance(e, aiohttp.ClientConnectorError)) \
+                        or not retry.acquire(action):
+                    retry.finish(attempt, False)
+                    raise
+                await asyncio.sleep(retry.delay(attempt))
+                attempt += 1
+                if event is not None:
+                    event["retries"] = attempt - 1
+                continue
+            if status not in retry.retry_statuses or attempt >= retry.max_attempts \
+                    or not (idempotent or status == 429) or not retry.acquire(action):
+                retry.finish(attempt, status not in retry.retry_statuses)
+                return status, body
+            await asyncio.sleep(retry.delay(attempt, retry_after))
+            attempt += 1
+            if event is not None:
+                event["retries"] = attempt - 1
+    #--------------------------------------------------------
+    async def _call(self,method:str,url:str,error_code:str,key:str = "",payload:Any=None,idempotent:Optional[bool]=None,
+                    cache_key:Optional[tuple]=None) -> Any:
+        """
+        Send a request and parse the standard ``{"error": ...}`` envelope.
+
+        Returns ``values[key]`` (or the whole response if ``key`` is empty),
+        or ``None`` after setting the error state. With a ``cache_key``
+        (see ``QueryCache.key``) the response is read from and stored in the
+        ``query_cache``.
+        """
+        cache = self.query_cache if cache_key is not None else None
+        if cache is not None:
+            content = cache.get(cache_key)
+            if content is not None:
+                values = self.codec.loads(content)
+                return values[key] if key != "" else values
+            generation = cache.generation(cache_key[0], cache_key[1])
+        if payload is None:
+            status, body = await self._request_async(method, url, idempotent)
+        else:
+            status, body = await self._request_async(method, url, idempotent, data=self.codec.dumps(payload),
+                                                     headers={"Content-Type": "application/json"})
+        if status == 200:
+            values = self.codec.loads(body)
+            if values["error"] == True:
+                self.error_code = values["error_code"]
+                self.error_message = values["error_message"]
+                return None
+            if cache is not None:
+                cache.set(cache_key, body, generation)
+            return values[key] if key != "" else values
+        self.error_code = error_code
+        self.error_message = body.decode("utf-8", errors="replace")
+        return None
+    #--------------------------------------------------------
+    async def _metadata(self,url:str,error_code:str,key:str,tablename:Optional[str]) -> Any:
+        """
+        Return ``values[key]`` of a metadata request, read from and stored in
+        the ``metadata_cache`` (if any) like the blocking methods do.
+        """
+        cache = self.metadata_cache
+        if cache is None:
+            return await self._call("GET", url, error_code, key)
+        cache_key = (self.dbname, tablename, MetadataCache.user_key(self.token))
+        values = cache.get(cache_key)
+        if values is None:
+            values = await self._call("GET", url, error_code)
+            if values is None:
+                return None
+            cache.set(cache_key, values)
+        return values[key]
+    #--------------------------------------------------------
+    async def login(self, token: str = "") -> bool:
+        """
+        Authenticate the user. Coroutine version of ``api_nios4.login``.
+        """
+        self.reset_error()
+
+        if token != "":
+            self.token = token
+
+        url = self.base_url + f'?action=user_login&email={self.username}&password={self.password}'
+        if self.token != "":
+            url = self.base_url + f'?action=user_login&token={self.token}'
+
+        user = await self._call("GET", url, "E1", "user")
+        if user is None:
+            return False
+        self.id_user = user['id']
+        self.email_user = user['email']
+        if self.token == "":
+            self.token = user['token']
+            if self._token == "":
+                self.set_defaults(token=user['token'])
+        return True
+    #--------------------------------------------------------
+    async def database_list(self, token: str = "") -> Optional[list]:
+        """
+        Retrieve the databases of the user. Coroutine version of ``api_nios4.database_list``.
+        """
+        self.reset_error()
+        if token != "":
+            self.token = token
+        if self.token == "":
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+        url = self.base_url + f'?action=database_list&token={self.token}'
+        return await self._call("GET", url, "E2", "db")
+    #--------------------------------------------------------
+    async def users_list(self,dbname:str="",token:str="") -> Optional[list]:
+        """
+        Retrieve the users of a database. Coroutine version of ``api_nios4.users_list``.
+        """
+        self.reset_error()
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+        if self.token == "":
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+        url = self.base_url + f'?action=users&token={self.token}&db={self.dbname}'
+        return await self._call("GET", url, "E3", "users")
+    #--------------------------------------------------------
+    async def table_list(self,dbname:str="",token:str="") -> Optional[list]:
+        """
+        Retrieve the tables of a database. Coroutine version of ``api_nios4.table_list``.
+        """
+        self.reset_error()
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+        if self.token == "":
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+        url = self.base_url + f'?action=table_list&token={self.token}&db={self.dbname}'
+        return await self._metadata(url, "E4", "tables", None)
+    #--------------------------------------------------------
+    async def table_info(self,tablename:str,dbname:str="",token:str="") -> Optional[dict]:
+        """
+        Retrieve the description of a table. Coroutine version of ``api_nios4.table_info``.
+        """
+        self.reset_error()
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+        if self.token == "":
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+        url = self.base_url + f'?action=table_info&token={self.token}&db={self.dbname}&tablename={tablename}'
+        return await self._metadata(url, "E5", "table", tablename)
+    #--------------------------------------------------------
+    async def fields_info(self,tablename:str,dbname:str="",token:str="") -> Optional[list]:
+        """
+        Retrieve the fields of a table. Coroutine version of ``api_nios4.fields_info``.
+        """
+        self.reset_error()
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+        if self.token == "":
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+        url = self.base_url + f'?action=table_info&token={self.token}&db={self.dbname}&tablename={tablename}'
+        return await self._metadata(url, "E6", "fields", tablename)
+    #--------------------------------------------------------
+    async def get_record(self,tablename:str,gguid:str,dbname:str="",token:str="") -> Optional[list]:
+        """
+        Retrieve a record by gguid. Coroutine version of ``api_nios4.get_record``.
+        """
+        self.reset_error()
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+        if self.token == "":
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+        url = self.base_url + f'?action=model&token={self.token}&db={self.dbname}&tablename={tablename}&gguid={gguid}'
+        return await self._call("GET", url, "E7", "records")
+    #--------------------------------------------------------
+    async def detail_delete(self,tablename:str,gguid:str,dbname:str ="",token:str="")-> Optional[dict]:
+        """
+        Delete a record and its details. Coroutine version of ``api_nios4.detail_delete``.
+        """
+        self.reset_error()
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+        if gguid == "":
+            return None
+        if self.token == "":
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+        await self._flush_write_behind(tablename)
+        payload = {'tablename': tablename, 'gguid': gguid}
+        url = self.base_url + f'?action=detail_delete&token={self.token}&db={self.dbname}&tablename={tablename}'
+        values = await self._call("POST", url, "E8", payload=payload)
+        if values is not None:
+            self._after_write(tablename)
+        return values
+    #--------------------------------------------------------
+    async def detail_resolve(self,tablename:str,gguid:str,dbname:str ="",token:str="") -> Optional[dict]:
+        """
+        Force the recalculation of a record. Coroutine version of ``api_nios4.detail_resolve``.
+        """
+        self.reset_error()
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+        if self.token == "":
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+        payload = {'tablename': tablename, 'gguid': gguid}
+        url = self.base_url + f'?action=detail_resolve&token={self.token}&db={self.dbname}&tablename={tablename}'
+        values = await self._call("POST", url, "E9", payload=payload)
+        if values is not None and self.query_cache is not None:
+            self.query_cache.invalidate(self.dbname, tablename)
+        return values
+    #--------------------------------------------------------
+    async def fuzzy_records(self,tablename:str,fields_search: List[str],fields_return: List[str],
+                            query:str,dbname:str ="",token:str="",threshold:Decimal=0.5,
+                            search_by:Dict[str, Any] | None = None,
+                            conditions:Dict[str, Any] | None = None,
+                            iduser:str = "")-> Optional[list]:
+        """
+        Fuzzy search on a table. Coroutine version of ``api_nios4.fuzzy_records``.
+        """
+        self.reset_error()
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+        if self.token == "":
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+        payload = self._fuzzy_payload(fields_search,fields_return,query,threshold,search_by,conditions,iduser)
+        url = self.base_url + f'?action=model_fuzzy&token={self.token}&db={self.dbname}&tablename={tablename}'
+        cache_key = None
+        if self.query_cache is not None:
+            cache_key = self.query_cache.key(self.dbname, tablename, "model_fuzzy", payload, self.token)
+        return await self._call("POST", url, "E10", "results", payload, cache_key=cache_key)
+    #--------------------------------------------------------
+    async def find_records(self,tablename:str,dbname:str="",token:str="",fields_search: List[str] = None,value_search: str = "",
+                           search_by:Dict[str, Any] | None = None,
+                           conditions:Dict[str, Any] | None = None,order_info:List[Any]= None,
+                           iduser:str = "")-> Optional[list]:
+        """
+        Query records from a table. Coroutine version of ``api_nios4.find_records``.
+        """
+        self.reset_error()
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+        if self.token == "":
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+        payload = self._find_payload(fields_search,value_search,search_by,conditions,order_info,iduser)
+        url = self.base_url + f'?action=model&token={self.token}&db={self.dbname}&tablename={tablename}'
+        cache_key = None
+        if self.query_cache is not None:
+            cache_key = self.query_cache.key(self.dbname, tablename, "model", payload, self.token)
+        return await self._call("POST", url, "E11", "records", payload, cache_key=cache_key)
+    #--------------------------------------------------------
+    async def iter_records(self,tablename:str,dbname:str="",token:str="",fields_search: List[str] = None,value_search: str = "",
+                           search_by:Dict[str, Any] | None = None,
+                           conditions:Dict[str, Any] | None = None,order_info:List[Any]= None,
+                           iduser:str = "",page_size:int=500):
+        """
+        Iterate over the records of a query one page at a time. Asynchronous
+        generator version of ``api_nios4.iter_records``.
+
+        Examples
+        --------
+        >>> async for row in client.iter_records("orders", conditions={"status": "open"}):
+        ...     process(row)
+        """
+        self.reset_error()
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+        if self.token == "":
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return
+        order_info = list(order_info or [])
+        if not any(order[0] == "gguid" for order in order_info):
+            order_info.append(["gguid", True])
+        payload = self._find_payload(fields_search,value_search,search_by,conditions,order_info,iduser)
+        payload['perpage'] = page_size
+        url = self.base_url + f'?action=model&token={self.token}&db={self.dbname}&tablename={tablename}'
+        page = 1
+        read = 0
+        while True:
+            payload['page'] = page
+            values = await self._call("POST", url, "E11", payload=dict(payload))
+            if values is None:
+                return
+            records = values['records']
+            total = values.get('total')
+            for record in records:
+                yield record
+            read += len(records)
+            if len(records) < page_size or (total is not None and read >= total):
+                return
+            page += 1
+    #--------------------------------------------------------
+    async def save_record(self,tablename: str,values: Dict[str, Any],dbname: str ="",token:str="",is_new:bool=True,delete:bool=False)-> Optional[dict]:
+        """
+        Save or delete a record. Coroutine version of ``api_nios4.save_record``.
+        An HTTP status other than 200 sets ``AE1``. With a write-behind buffer
+        on the table (see ``enable_write_behind``) the record is buffered and
+        an ``asyncio.Future`` resolving to the response of its batch is returned.
+        """
+        self.reset_error()
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+        if values["gguid"] == "" or values["gguid"] == None:
+            self.error_code = "E1"
+            self.error_message = "The record's gguid is not defined"
+            return None
+        buffer = self.write_behind.get((self.dbname, tablename))
+        if buffer is not None:
+            if not delete:
+                return asyncio.wrap_future(buffer.add(values))
+            await asyncio.to_thread(buffer.flush)
+        if self.token == "":
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+        payload = {
+            "is_new": is_new,
+            "values": values,
+            "delete": delete,
+        }
+        url = self.base_url + f'?action=detail_save&token={self.token}&db={self.dbname}&tablename={tablename}'
+        values = await self._call("POST", url, "AE1", payload=payload, idempotent=not is_new and not delete)
+        if values is not None:
+            self._after_write(tablename)
+        return values
+    #--------------------------------------------------------
+    async def save_records(self,tablename: str,values: List[Dict[str, Any]],dbname: str ="",token:str="") -> Optional[dict]:
+        """
+        Save multiple records. Coroutine version of ``api_nios4.save_records``.
+        An HTTP status other than 200 sets ``AE2``.
+        """
+        self.reset_error()
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+        for row in values:
+            if row.get("gguid") == "" or row.get("gguid") == None:
+                self.error_code = "E1"
+                self.error_message = "The record's gguid is not defined"
+                return None
+        if self.token == "":
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+        await self._flush_write_behind(tablename)
+        payload = {
+            "rows": values
+        }
+        url = self.base_url + f'?action=table_save&token={self.token}&db={self.dbname}&tablename={tablename}'
+        values = await self._call("POST", url, "AE2", payload=payload)
+        if values is not None:
+            self._after_write(tablename)
+        return values
+    #--------------------------------------------------------
+    async def download_file(self,path:str,gguidrif:str,tablename:str, dbname: str ="",token:str="",
+                            chunk_size:int=1048576) -> bool:
+        """
+        Download a file and save it locally. Coroutine version of ``api_nios4.download_file``.
+
+        The body is streamed into ``path + ".part"`` (the disk writes run in
+        worker threads) and renamed to ``path`` once complete, so an error
+        page or a truncated body never replaces the file. The request goes
+        through the retry policy and the instrumentation hooks; errors are
+        reported as ``F1`` (request failed), ``F2`` (local I/O) and ``F3``
+        (HTTP status other than 200).
+        """
+        self.reset_error()
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+        if self.token == "":
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return False
+        url = self.file_url + f'?action=file_download&token={self.token}&db={self.dbname}&tablename={tablename}&gguid={gguidrif}'
+        part = f"{path}.part"
+        try:
+            f = await asyncio.to_thread(open, part, "wb")
+            try:
+                status, body = await self._request_async("GET", url, sink=_AsyncFileSink(f, chunk_size))
+            finally:
+                await asyncio.to_thread(f.close)
+            if status != 200:
+                self.error_code = "F3"
+                self.error_message = f"HTTP {status}: {body[:500].decode('utf-8', errors='replace')}"
+                await asyncio.to_thread(os.remove, part)
+                return False
+            await asyncio.to_thread(os.replace, part, path)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.error_code = "F1"
+            self.error_message = str(e) or e.__class__.__name__
+            await asyncio.to_thread(self._discard, part)
+            return False
+        except OSError as e:
+            self.error_code = "F2"
+            self.error_message = str(e)
+            await asyncio.to_thread(self._discard, part)
+            return False
+        return True
+    #--------------------------------------------------------
+    @staticmethod
+    def _discard(path:str):
+        #remove a partial download, if any
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    #--------------------------------------------------------
+    async def upload_file(self,path:str,is_image:bool,gguidrif:str,tablename:str, dbname: str ="",token:str="") -> bool:
+        """
+        Upload a file to the synchronizer. Coroutine version of ``api_nios4.upload_file``.
+
+        The file is streamed from disk instead of being read in memory.
+        """
+        self.reset_error()
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+        type = "image"
+        if is_image == False:
+            type = "file"
+        if self.token == "":
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return False
+        url = self.file_url + f'?action=file_upload&token={self.token}&db={self.dbname}&tablename={tablename}&gguid={gguidrif}&type={type}'
+        try:
+            f = await asyncio.to_thread(open, path, "rb")
+            try:
+                status, body = await self._request_async("POST", url, data=f, headers={"Content-Type": "application/octet-stream"})
+            finally:
+                f.close()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.error_code = "F1"
+            self.error_message = str(e) or e.__class__.__name__
+            return False
+        except OSError as e:
+            self.error_code = "F2"
+            self.error_message = str(e)
+            return False
+        if status != 200:
+            self.error_code = "F1"
+            self.error_message = body.decode("utf-8", errors="replace")
+            return False
+        try:
+            valori = self.codec.loads(body)
+        except ValueError:
+            self.error_code = "F5"
+            self.error_message = f"Response non-JSON: {body[:500].decode('utf-8', errors='replace')}"
+            return False
+        return valori.get("result") != "KO"
+    #--------------------------------------------------------
+    async def sync(self,dbname: str ="",token:str="") -> Optional[dict]:
+        """
+        Force the synchronization of the database. Coroutine version of ``api_nios4.sync``.
+        An HTTP status other than 200 sets ``AE3``.
+        """
+        self.reset_error()
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+        if self.token == "":
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+        url = self.base_url + f'?action=sync&token={self.token}&db={self.dbname}'
+        return await self._call("GET", url, "AE3")
+    #--------------------------------------------------------
+    async def _in_thread(self,method:Any,*args,**kwargs) -> Any:
+        """
+        Run a blocking ``api_nios4`` method in a worker thread and return its
+        result, without blocking the event loop.
+
+        The method runs on a plain ``api_nios4`` copy of the client sharing
+        its transport, codec, retry policy and hooks; the overrides and the
+        error state it leaves are then copied to the calling task.
+        """
+        client = self._blocking_copy()
+        value = await asyncio.to_thread(method, client, *args, **kwargs)
+        self._adopt(client)
+        return value
+    #--------------------------------------------------------
+    def _blocking_copy(self) -> api_nios4:
+        """
+        Return a plain ``api_nios4`` copy of the client for ``_in_thread``,
+        starting from the state of the calling task.
+        """
+        client = copy.copy(self)
+        client.__class__ = api_nios4
+        client.thread_safe = False
+        client.set_defaults(dbname=self.dbname, token=self.token)
+        client.reset_error()
+        return client
+    #--------------------------------------------------------
+    def _adopt(self,client:api_nios4):
+        """
+        Copy back what a blocking method left on its copy: the overrides and
+        the error state for the calling task, and the metadata cache it may
+        have created.
+        """
+        self.dbname = client.dbname
+        self.token = client.token
+        self.error_code = client.error_code
+        self.error_message = client.error_message
+        self.metadata_cache = client.metadata_cache
+    #--------------------------------------------------------
+    async def get_records(self,tablename:str,gguids:List[str],dbname:str="",token:str="",
+                          chunk_size:int=200,max_workers:int=4) -> Optional[dict]:
+        """
+        Retrieve many records by gguid. Coroutine version of
+        ``api_nios4.get_records``, run in a worker thread.
+        """
+        return await self._in_thread(api_nios4.get_records, tablename, gguids, dbname, token, chunk_size, max_workers)
+    #--------------------------------------------------------
+    async def save_records_batch(self,tablename: str,rows: List[Dict[str, Any]],dbname: str ="",token:str="",
+                                 chunk_size:int=500,max_bytes:int=1048576,max_workers:int=4) -> Optional[dict]:
+        """
+        Save many records in parallel chunks. Coroutine version of
+        ``api_nios4.save_records_batch``, run in a worker thread.
+        """
+        return await self._in_thread(api_nios4.save_records_batch, tablename, rows, dbname, token,
+                                     chunk_size, max_bytes, max_workers)
+    #--------------------------------------------------------
+    async def sync_until_complete(self,dbname: str ="",token:str="",deadline:Optional[float]=None,
+                                  interval:float=0,max_backoff:float=30,progress:Any=None,
+                                  max_stalls:int=10) -> Optional[dict]:
+        """
+        Synchronize until the server reports a complete synchronization.
+        Coroutine version of ``api_nios4.sync_until_complete``, run in a
+        worker thread.
+        """
+        return await self._in_thread(api_nios4.sync_until_complete, dbname, token, deadline,
+                                     interval, max_backoff, progress, False, max_stalls)
+    #--------------------------------------------------------
+    async def record_coercer(self,tablename:str,dbname:str="",token:str="",**kwargs) -> Optional[RecordCoercer]:
+        """
+        Build a ``RecordCoercer`` for a table. Coroutine version of
+        ``api_nios4.record_coercer``, run in a worker thread.
+        """
+        return await self._in_thread(api_nios4.record_coercer, tablename, dbname, token, **kwargs)
+    #--------------------------------------------------------
+    async def save_schema_snapshot(self,tablenames:List[str]=None,dbname:str="",token:str="",path:str="",
+                                   refresh:bool=False) -> bool:
+        """
+        Save the schema of a database to disk. Coroutine version of
+        ``api_nios4.save_schema_snapshot``, run in a worker thread.
+        """
+        return await self._in_thread(api_nios4.save_schema_snapshot, tablenames, dbname, token, path, refresh)
+    #--------------------------------------------------------
+    async def load_schema_snapshot(self,dbname:str="",token:str="",path:str="",max_age:float=3600,
+                                   refresh:bool=True) -> bool:
+        """
+        Load the schema of a database from disk. Coroutine version of
+        ``api_nios4.load_schema_snapshot``, run in a worker thread.
+
+        The loaded schema is served by the coroutine ``table_list``,
+        ``table_info`` and ``fields_info``. The background refresh of a stale
+        snapshot is tracked by ``self.snapshot_thread`` and
+        ``self.snapshot_result`` as in the blocking client.
+        """
+        client = self._blocking_copy()
+        client.snapshot_thread = None
+        value = await asyncio.to_thread(api_nios4.load_schema_snapshot, client, dbname, token, path, max_age, refresh)
+        self._adopt(client)
+        refreshing = client.snapshot_thread
+        if refreshing is not None:
+            def wait():
+                #the refresh stores its outcome on the copy
+                refreshing.join()
+                self.snapshot_result = client.snapshot_result
+            self.snapshot_result = None
+            self.snapshot_thread = threading.Thread(target=wait, daemon=True)
+            self.snapshot_thread.start()
+        return value
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*- 
+#================================================================================
+#Copyright of Davide Sbreviglieri 2024
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+#DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+#FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+#DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+#SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+#CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+#OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE
+#================================================================================
+#TOKEN RENEWAL
+#================================================================================
+from __future__ import annotations
+
+import requests
+from typing import Optional
+from collections import OrderedDict
+import threading
+import time
+import re
+
+from .codec import JsonCodec
+
+class TokenManager:
+    #error envelopes are small: larger 200 bodies (record pages) are not inspected
+    ERROR_BODY_MAX = 65536
+    _ERROR_FLAG = re.compile(rb'"error"\s*:\s*true')
+    #--------------------------------------------------------
+    def __init__(self,ttl:float=0,refresh_ahead:float=0.1,auth_statuses:tuple=(401, 403),
+                 error_codes:tuple=(),error_messages:tuple=("token",)):
+        """
+        Initialize the token lifecycle policy of a client.
+
+        When a request fails because the token is no longer valid (HTTP
+        status in ``auth_statuses``, or an ``{"error": true}`` response whose
+        ``error_code`` is in ``error_codes`` or whose ``error_message``
+        contains one of ``error_messages``), the client logs in again with
+        its username and password and sends the request once more with the
+        new token. The re-login is single-flight: concurrent callers hitting
+        the expired token wait for one ``user_login`` call and reuse its
+        token. With ``ttl`` the token is also renewed ahead of expiry: the
+        first request after ``ttl * (1 - refresh_ahead)`` seconds starts a
+        background re-login, and a request after ``ttl`` waits for it. Use
+        one policy per client.
+
+        Parameters
+        ----------
+        ttl : float, optional
+            Token lifetime in seconds, ``0`` if unknown (renewal only on
+            failure). Default 0.
+        refresh_ahead : float, optional
+            Fraction of ``ttl`` before expiry at which the token is renewed in
+            the background. Default 0.1.
+        auth_statuses : tuple of int, optional
+            HTTP statuses meaning an invalid token. Default ``(401, 403)``.
+        error_codes : tuple of str, optional
+            Web service error codes meaning an invalid or expired token.
+            Default ``()``.
+        error_messages : tuple of str, optional
+            Case-insensitive fragments of ``error_message`` meaning an invalid
+            or expired token, for the web service errors answered with HTTP
+            200. Default ``("token",)``; pass ``()`` to rely on
+            ``error_codes`` only.
+
+        Examples
+        --------
+        >>> client = api_nios4(username="john", password="secret",
+        ...                    auth=TokenManager(ttl=3600, error_codes=("TOKEN_EXPIRED",)))
+        >>> client.login()
+        >>> client.find_records("customers", "mydb")   # re-login transparently if the token expired
+        >>> client.auth.stats()["relogins"]
+        0
+        """
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.auth_statuses = set(auth_statuses)
+        self.error_codes = tuple(error_codes)
+        self.error_messages = tuple(message.lower() for message in error_messages)
+        self.obtained_at = time.monotonic()
+        self.refreshing = False
+        self.replaced = OrderedDict()
+        self.relogins = 0
+        self.proactive = 0
+        self.failures = 0
+        self.lock = threading.Lock()
+    #--------------------------------------------------------
+    def renewed(self,old:str,new:str):
+        """
+        Record that ``old`` was replaced by ``new`` (called with ``lock`` held).
+        """
+        self.obtained_at = time.monotonic()
+        if old != "" and old != new:
+            self.replaced[old] = new
+            while len(self.replaced) > 16:
+                self.replaced.popitem(last=False)
+    #--------------------------------------------------------
+    def claim_refresh(self) -> bool:
+        """
+        Mark a background renewal as started. Returns ``False`` if one is
+        already running or a login is in progress.
+        """
+        if not self.lock.acquire(blocking=False):
+            return False
+        try:
+            if self.refreshing:
+                return False
+            self.refreshing = True
+            return True
+        finally:
+            self.lock.release()
+    #--------------------------------------------------------
+    def state(self) -> str:
+        """
+        Return ``"valid"``, ``"refresh"`` (renew in the background) or
+        ``"expired"`` according to ``ttl``.
+        """
+        if self.ttl <= 0:
+            return "valid"
+        age = time.monotonic() - self.obtained_at
+        if age >= self.ttl:
+            return "expired"
+        if age >= self.ttl * (1 - self.refresh_ahead):
+            return "refresh"
+        return "valid"
+    #--------------------------------------------------------
+    def is_failure(self,response:requests.Response,stream:bool=False,codec:Optional[JsonCodec]=None) -> bool:
+        """
+        Whether ``response`` reports an invalid token. Only bodies of up to
+        ``ERROR_BODY_MAX`` bytes flagged ``"error": true`` are decoded (with
+        ``codec``, the client one); the body of streamed responses is not
+        inspected.
+        """
+        if response.status_code in self.auth_statuses:
+            return True
+        if stream or response.status_code != 200 or not self.error_codes and not self.error_messages:
+            return False
+        content = response.content
+        if len(content) > self.ERROR_BODY_MAX or not self._ERROR_FLAG.search(content):
+            return False
+        try:
+            values = (codec or JsonCodec()).loads(content)
+        except ValueError:
+            return False
+        if not isinstance(values, dict) or values.get("error") != True:
+            return False
+        message = str(values.get("error_message") or "").lower()
+        return values.get("error_code") in self.error_codes or any(fragment in message for fragment in self.error_messages)
+    #--------------------------------------------------------
+    def stats(self) -> dict:
+        """
+        Return the re-login counters and the token age.
+        """
+        return {"relogins": self.relogins, "proactive": self.proactive, "failures": self.failures,
+                "age": time.monotonic() - self.obtained_at}
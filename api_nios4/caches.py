@@ -0,0 +1,588 @@
+# -*- coding: utf-8 -*- 
+#================================================================================
+#Copyright of Davide Sbreviglieri 2024
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+#DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+#FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+#DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+#SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+#CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+#OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE
+#================================================================================
+#CACHES
+#================================================================================
+from __future__ import annotations
+
+from typing import Optional, Any
+from collections import OrderedDict
+import threading
+import copy
+import hashlib
+import time
+import uuid
+import json
+import os
+import shutil
+
+from .codec import JsonCodec
+
+class MetadataCache:
+    #--------------------------------------------------------
+    def __init__(self,ttl:float=300,maxsize:int=256):
+        """
+        Initialize an in-process cache for schema metadata.
+
+        Entries are keyed by ``(dbname, tablename, user)`` (``tablename`` is
+        ``None`` for the table list of a database, ``user`` is ``user_key``
+        of the token), so clients of different users sharing the cache never
+        see each other's metadata. Entries expire ``ttl`` seconds after being
+        stored and the least recently used entry is evicted when ``maxsize``
+        entries are exceeded. Values are copied in and out, so callers can
+        modify what they get without corrupting the cache. The cache is
+        thread-safe and can be shared by several clients.
+
+        Parameters
+        ----------
+        ttl : float, optional
+            Time to live of an entry, in seconds. ``0`` disables expiration.
+            Default 300.
+        maxsize : int, optional
+            Maximum number of entries. Default 256.
+
+        Examples
+        --------
+        >>> cache = MetadataCache(ttl=600)
+        >>> client = api_nios4(token="abc123", metadata_cache=cache)
+        >>> client.fields_info("customers", "mydb")   # server call
+        >>> client.fields_info("customers", "mydb")   # memory read
+        >>> cache.stats()["hits"]
+        1
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    #--------------------------------------------------------
+    @staticmethod
+    def user_key(token:str) -> str:
+        """
+        Return the user part of a key: a digest of ``token``, so the cache
+        does not hold the tokens themselves.
+        """
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()[:32]
+    #--------------------------------------------------------
+    def get(self,key:tuple) -> Any:
+        """
+        Return a copy of the cached value of ``key``, or ``None`` if missing
+        or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, value = entry
+            if expires and expires < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(value)
+    #--------------------------------------------------------
+    def set(self,key:tuple,value:Any):
+        """
+        Store a copy of ``value`` under ``key``, evicting the least recently
+        used entries beyond ``maxsize``.
+        """
+        expires = time.monotonic() + self.ttl if self.ttl else 0
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    #--------------------------------------------------------
+    def invalidate(self,dbname:str="",tablename:str=""):
+        """
+        Remove cached entries.
+
+        Without arguments the whole cache is cleared; with ``dbname`` only the
+        entries of that database are removed, and with ``tablename`` only the
+        entries of that table (for every user).
+        """
+        with self._lock:
+            if dbname == "" and tablename == "":
+                self._entries.clear()
+                return
+            for key in list(self._entries):
+                if dbname != "" and key[0] != dbname:
+                    continue
+                if tablename != "" and key[1] != tablename:
+                    continue
+                del self._entries[key]
+    #--------------------------------------------------------
+    def entries(self,dbname:str,user:str) -> dict:
+        """
+        Return copies of the live entries of a database for ``user`` as
+        ``{tablename: value}`` (``None`` is the key of the table list),
+        without touching counters or LRU order.
+        """
+        now = time.monotonic()
+        with self._lock:
+            live = {key[1]: value for key, (expires, value) in self._entries.items()
+                    if key[0] == dbname and key[2] == user and (not expires or expires >= now)}
+        return copy.deepcopy(live)
+    #--------------------------------------------------------
+    def stats(self) -> dict:
+        """
+        Return the hit/miss/eviction counters and the current size.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions, "size": len(self._entries)}
+
+class QueryCache:
+    #--------------------------------------------------------
+    def __init__(self,ttl:float=30,max_bytes:int=67108864,maxsize:int=1024):
+        """
+        Initialize an in-process cache for ``find_records``/``fuzzy_records`` results.
+
+        Entries are keyed by database, table and a SHA-256 hash of the
+        canonical (key-sorted) JSON payload together with the action and the
+        token, so identical queries of the same user share an entry. The raw
+        response is stored and decoded on every hit, so callers can modify
+        the returned records freely. Entries expire ``ttl`` seconds after
+        being stored; the least recently used ones are evicted beyond
+        ``max_bytes`` of stored responses or ``maxsize`` entries. The client
+        invalidates the entries of a table after its own writes on it
+        (``save_record``, ``save_records``, ``save_records_batch``,
+        ``detail_delete``, ``detail_resolve``, write-behind flushes); writes
+        made by other clients are only seen once the entries expire. The
+        cache is thread-safe and can be shared by several clients.
+
+        Parameters
+        ----------
+        ttl : float, optional
+            Time to live of an entry, in seconds. ``0`` disables expiration,
+            as in ``MetadataCache``. Default 30.
+        max_bytes : int, optional
+            Maximum total size of the stored responses. Default 64 MiB.
+        maxsize : int, optional
+            Maximum number of entries. Default 1024.
+
+        Examples
+        --------
+        >>> cache = QueryCache(ttl=60)
+        >>> client = api_nios4(token="abc123", query_cache=cache)
+        >>> client.find_records("customers", "mydb", conditions={"city": "Rome"})   # server call
+        >>> client.find_records("customers", "mydb", conditions={"city": "Rome"})   # memory read
+        >>> client.save_record("customers", record, "mydb")                          # invalidates "customers"
+        >>> cache.stats()["hits"]
+        1
+        """
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._epoch = 0
+        self._generations = {}
+        self._lock = threading.Lock()
+    #--------------------------------------------------------
+    @staticmethod
+    def key(dbname:str,tablename:str,action:str,payload:Any,token:str="") -> tuple:
+        """
+        Return the cache key of a query.
+        """
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=JsonCodec.default)
+        digest = hashlib.sha256(f"{action}\n{token}\n{canonical}".encode("utf-8")).hexdigest()
+        return (dbname, tablename, digest)
+    #--------------------------------------------------------
+    def generation(self,dbname:str,tablename:str) -> tuple:
+        """
+        Return a value changed by every invalidation covering the table
+        (of the table itself, of its database or of the whole cache). Pass
+        the value read before a query to ``set``, so that a result fetched
+        while the table was being written is not stored; writes on other
+        tables do not discard it.
+        """
+        with self._lock:
+            return (self._epoch, self._generations.get((dbname, tablename), 0))
+    #--------------------------------------------------------
+    def get(self,key:tuple) -> Optional[bytes]:
+        """
+        Return the stored response of ``key``, or ``None`` if missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, content = entry
+            if expires and expires < time.monotonic():
+                del self._entries[key]
+                self.bytes -= len(content)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return content
+    #--------------------------------------------------------
+    def set(self,key:tuple,content:bytes,generation:Optional[tuple]=None):
+        """
+        Store the response ``content`` under ``key``, unless the table was
+        invalidated since ``generation`` (the value of ``generation()`` read
+        before the request) or the response alone exceeds ``max_bytes``.
+        """
+        content = bytes(content)
+        if len(content) > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != (self._epoch, self._generations.get(key[:2], 0)):
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= len(previous[1])
+            self._entries[key] = (time.monotonic() + self.ttl if self.ttl else 0, content)
+            self.bytes += len(content)
+            while len(self._entries) > self.maxsize or self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.evictions += 1
+    #--------------------------------------------------------
+    def invalidate(self,dbname:str="",tablename:str=""):
+        """
+        Remove cached results.
+
+        Without arguments the whole cache is cleared; with ``dbname`` only the
+        entries of that database are removed, and with ``tablename`` only the
+        entries of that table.
+        """
+        with self._lock:
+            if dbname != "" and tablename != "":
+                self._generations[(dbname, tablename)] = self._generations.get((dbname, tablename), 0) + 1
+            else:
+                #covers many tables: the per-table counters restart under the new epoch
+                self._epoch += 1
+                self._generations.clear()
+            self.invalidations += 1
+            for key in list(self._entries):
+                if dbname != "" and key[0] != dbname:
+                    continue
+                if tablename != "" and key[1] != tablename:
+                    continue
+                self.bytes -= len(self._entries.pop(key)[1])
+    #--------------------------------------------------------
+    def stats(self) -> dict:
+        """
+        Return the hit/miss/eviction/invalidation counters, the number of
+        entries and the bytes stored.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "invalidations": self.invalidations, "size": len(self._entries), "bytes": self.bytes}
+
+class FileCache:
+    #--------------------------------------------------------
+    def __init__(self,directory:str,max_bytes:int=1073741824,dedup:bool=True,link:bool=False,
+                 max_age:float=0,revalidate:Any=None):
+        """
+        Initialize an on-disk cache for the files returned by ``download_file``.
+
+        Files are keyed by ``(dbname, tablename, gguidrif)`` and stored under
+        ``directory/objects``; every entry of the index is a small file under
+        ``directory/entries``, written atomically on its own, so storing or
+        removing a file costs the same whatever the size of the cache, the
+        cache survives restarts and several processes can share the
+        directory. With ``dedup`` the stored files are named by the SHA-256
+        of their content, so identical attachments of different records are
+        kept once. When the stored files exceed ``max_bytes`` the least
+        recently used entries are evicted. Stored files are read-only, and an
+        entry whose stored file was modified anyway (size or modification
+        time changed) is discarded instead of being served. A cache hit is
+        copied (or hard-linked, with ``link``) to the requested path. The
+        cache is thread-safe and can be shared by several clients.
+
+        Parameters
+        ----------
+        directory : str
+            Cache directory, created if missing.
+        max_bytes : int, optional
+            Maximum total size of the stored files. Default 1 GiB.
+        dedup : bool, optional
+            Name stored files by content hash. Default ``True``.
+        link : bool, optional
+            Hard-link files instead of copying them, when the filesystem allows
+            it. Faster, but the files at the requested paths are the read-only
+            cached files: replace them instead of modifying them in place
+            (an in-place change only invalidates the entry). Default ``False``.
+        max_age : float, optional
+            Seconds after which an entry is stale and fetched again. ``0``
+            disables expiration. Default 0.
+        revalidate : callable, optional
+            Called on every hit as ``revalidate(dbname, tablename, gguidrif, entry)``
+            with ``entry = {"blob", "size", "mtime", "stored"}`` (``stored`` is
+            a Unix timestamp); returning ``False`` discards the entry and the
+            file is downloaded again.
+
+        Examples
+        --------
+        >>> cache = FileCache("/var/cache/nios4", max_bytes=512 * 1024 * 1024)
+        >>> client = api_nios4(token="abc123", file_cache=cache)
+        >>> client.download_file("logo.png", "gguid-1", "images", "mydb")   # server call
+        >>> client.download_file("logo.png", "gguid-1", "images", "mydb")   # disk copy
+        >>> cache.stats()["hits"]
+        1
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.dedup = dedup
+        self.link = link
+        self.max_age = max_age
+        self.revalidate = revalidate
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._objects = os.path.join(directory, "objects")
+        self._index = os.path.join(directory, "entries")
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(self._objects, exist_ok=True)
+        os.makedirs(self._index, exist_ok=True)
+        loaded = []
+        for name in os.listdir(self._index):
+            if name.endswith(".json"):
+                item = self._read_entry(os.path.join(self._index, name))
+                if item is not None:
+                    loaded.append(item)
+        #least recently stored first
+        for key, entry in sorted(loaded, key=lambda item: item[1]["stored"]):
+            self._entries[key] = entry
+    #--------------------------------------------------------
+    def _entry_path(self,key:tuple) -> str:
+        return os.path.join(self._index, hashlib.sha256(json.dumps(list(key)).encode("utf-8")).hexdigest() + ".json")
+    #--------------------------------------------------------
+    def _read_entry(self,path:str) -> Optional[tuple]:
+        #(key, entry) stored in an index file, None if unreadable or its file is gone
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                item = json.load(f)
+            key = (item["dbname"], item["tablename"], item["gguidrif"])
+            entry = {"blob": item["blob"], "size": item["size"], "mtime": item["mtime"], "stored": item["stored"]}
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if not os.path.exists(os.path.join(self._objects, entry["blob"])):
+            return None
+        return key, entry
+    #--------------------------------------------------------
+    def _write_entry(self,key:tuple,entry:dict):
+        #store one index entry atomically
+        path = self._entry_path(key)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"dbname": key[0], "tablename": key[1], "gguidrif": key[2], **entry}, f)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    #--------------------------------------------------------
+    def _remove_entry(self,key:tuple):
+        try:
+            os.remove(self._entry_path(key))
+        except FileNotFoundError:
+            pass
+    #--------------------------------------------------------
+    def _place(self,source:str,target:str,link:bool):
+        #link or copy source to target atomically
+        tmp = f"{target}.{uuid.uuid4().hex}.tmp"
+        try:
+            if link:
+                try:
+                    os.link(source, tmp)
+                except OSError:
+                    shutil.copyfile(source, tmp)
+            else:
+                shutil.copyfile(source, tmp)
+            os.replace(tmp, target)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    #--------------------------------------------------------
+    def _intact(self,entry:dict,checksum:str) -> bool:
+        #whether the stored file is unchanged since put and matches checksum
+        blob = os.path.join(self._objects, entry["blob"])
+        try:
+            info = os.stat(blob)
+        except OSError:
+            return False
+        if info.st_size != entry["size"] or info.st_mtime_ns != entry["mtime"]:
+            return False
+        if checksum == "":
+            return True
+        algorithm, _, expected = checksum.partition(":")
+        algorithm = algorithm.lower()
+        if self.dedup and algorithm == "sha256":
+            #the name of a deduplicated file is its SHA-256
+            return entry["blob"] == expected.lower()
+        digest = hashlib.new(algorithm)
+        with open(blob, "rb") as f:
+            for block in iter(lambda: f.read(1048576), b""):
+                digest.update(block)
+        return digest.hexdigest() == expected.lower()
+    #--------------------------------------------------------
+    def get(self,dbname:str,tablename:str,gguidrif:str,path:str,checksum:str="") -> bool:
+        """
+        Copy the cached file of a record to ``path``. Returns ``False`` on a
+        miss (absent, stale, modified, rejected by ``revalidate`` or not
+        matching ``checksum``, given as ``"<algorithm>:<hex digest>"``).
+        """
+        key = (dbname, tablename, gguidrif)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            #stored by another process sharing the directory
+            item = self._read_entry(self._entry_path(key))
+            if item is not None:
+                entry = item[1]
+                with self._lock:
+                    self._entries.setdefault(key, entry)
+        if entry is not None and self.max_age and entry["stored"] + self.max_age < time.time():
+            entry = None
+        if entry is not None and not self._intact(entry, checksum):
+            entry = None
+        if entry is not None and self.revalidate is not None and not self.revalidate(dbname, tablename, gguidrif, dict(entry)):
+            entry = None
+        if entry is None:
+            self.invalidate(dbname, tablename, gguidrif)
+            with self._lock:
+                self.misses += 1
+            return False
+        try:
+            self._place(os.path.join(self._objects, entry["blob"]), path, self.link)
+        except FileNotFoundError:
+            #evicted in the meantime
+            with self._lock:
+                self.misses += 1
+            return False
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self.hits += 1
+        return True
+    #--------------------------------------------------------
+    def put(self,dbname:str,tablename:str,gguidrif:str,path:str):
+        """
+        Store a read-only copy of the file at ``path`` as the content of a
+        record, evicting the least recently used entries beyond ``max_bytes``.
+        """
+        if self.dedup:
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1048576), b""):
+                    digest.update(block)
+            blob = digest.hexdigest()
+        else:
+            blob = hashlib.sha256(json.dumps([dbname, tablename, gguidrif]).encode("utf-8")).hexdigest()
+        target = os.path.join(self._objects, blob)
+        key = (dbname, tablename, gguidrif)
+        #always a copy (made outside the lock): a link would make the caller's file the cached one
+        tmp = f"{target}.{uuid.uuid4().hex}.tmp"
+        try:
+            if not self.dedup or not os.path.exists(target):
+                shutil.copyfile(path, tmp)
+                os.chmod(tmp, 0o444)
+            with self._lock:
+                if os.path.exists(tmp) and (not self.dedup or not os.path.exists(target)):
+                    if os.path.exists(target):
+                        #read-only files cannot be replaced on Windows
+                        os.chmod(target, 0o644)
+                    os.replace(tmp, target)
+                elif not os.path.exists(target):
+                    #evicted since the check above
+                    shutil.copyfile(path, target)
+                    os.chmod(target, 0o444)
+                self._store(key, blob, target)
+        finally:
+            if os.path.exists(tmp):
+                os.chmod(tmp, 0o644)
+                os.remove(tmp)
+    #--------------------------------------------------------
+    def _store(self,key:tuple,blob:str,target:str):
+        #index the stored file and evict; called with the lock held
+        info = os.stat(target)
+        entry = {"blob": blob, "size": info.st_size, "mtime": info.st_mtime_ns, "stored": time.time()}
+        previous = self._entries.pop(key, None)
+        self._entries[key] = entry
+        self._write_entry(key, entry)
+        if previous is not None and previous["blob"] != blob:
+            self._release(previous["blob"])
+        blobs = {}
+        for entry in self._entries.values():
+            blobs[entry["blob"]] = entry["size"]
+        total = sum(blobs.values())
+        while total > self.max_bytes and len(self._entries) > 1:
+            evicted, entry = self._entries.popitem(last=False)
+            self._remove_entry(evicted)
+            self.evictions += 1
+            if self._release(entry["blob"]):
+                total -= entry["size"]
+    #--------------------------------------------------------
+    def _release(self,blob:str) -> bool:
+        #remove a stored file no longer referenced; called with the lock held
+        if any(entry["blob"] == blob for entry in self._entries.values()):
+            return False
+        path = os.path.join(self._objects, blob)
+        try:
+            #read-only files cannot be removed on Windows
+            os.chmod(path, 0o644)
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        return True
+    #--------------------------------------------------------
+    def invalidate(self,dbname:str="",tablename:str="",gguidrif:str=""):
+        """
+        Remove cached files.
+
+        Without arguments the whole cache is cleared; ``dbname``, ``tablename``
+        and ``gguidrif`` restrict the removal to the matching entries.
+        """
+        with self._lock:
+            removed = []
+            for key in list(self._entries):
+                if dbname != "" and key[0] != dbname:
+                    continue
+                if tablename != "" and key[1] != tablename:
+                    continue
+                if gguidrif != "" and key[2] != gguidrif:
+                    continue
+                removed.append((key, self._entries.pop(key)))
+            if dbname != "" and tablename != "" and gguidrif != "" and not removed:
+                #an entry of another process not loaded here
+                self._remove_entry((dbname, tablename, gguidrif))
+            for key, entry in removed:
+                self._remove_entry(key)
+                self._release(entry["blob"])
+    #--------------------------------------------------------
+    def stats(self) -> dict:
+        """
+        Return the hit/miss/eviction counters, the number of entries and the
+        bytes stored on disk.
+        """
+        with self._lock:
+            blobs = {entry["blob"]: entry["size"] for entry in self._entries.values()}
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "size": len(self._entries), "bytes": sum(blobs.values())}
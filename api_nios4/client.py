@@ -0,0 +1,3407 @@
+# -*- coding: utf-8 -*- 
+#================================================================================
+#Copyright of Davide Sbreviglieri 2024
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+#DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+#FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+#DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+#SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+#CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+#OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE
+#================================================================================
+#API NIOS4
+#================================================================================
+from __future__ import annotations
+
+import requests
+import urllib3
+from typing import Optional, Dict, Any, List, Union, Iterator, NamedTuple
+from datetime import datetime,timezone,date
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor, Future
+from urllib.parse import urlsplit, parse_qs
+import threading
+import weakref
+import codecs
+import contextvars
+import hashlib
+import base64
+import time
+import uuid
+import json
+import os
+
+from .transport import Nios4Transport
+from .codec import JsonCodec
+from .caches import MetadataCache, QueryCache, FileCache
+from .retry import RetryPolicy, AdaptiveLimiter
+from .auth import TokenManager
+from .metrics import RequestMetrics
+from .transfer import UploadStream
+from .writes import SyncScheduler, WriteBehindBuffer
+from .coercer import RecordCoercer
+
+SCHEMA_SNAPSHOT_VERSION = 1
+
+class CallResult(NamedTuple):
+    """
+    Immutable outcome of a call made with ``api_nios4.call``: the returned
+    value, the error state and the database/token the call used.
+    """
+    value: Any
+    error_code: str
+    error_message: str
+    dbname: str
+    token: str
+    #--------------------------------------------------------
+    @property
+    def ok(self) -> bool:
+        return self.error_code == ""
+
+#per thread / asyncio task state of the thread-safe clients: a {client: {attribute: value}}
+#mapping, replaced (never mutated in place) on every change so that copied contexts keep
+#their own; entries go away with their client
+_CALL_STATE = contextvars.ContextVar("api_nios4_call_state", default=None)
+
+class _ContextAttribute:
+    #client attribute kept per thread / asyncio task in thread-safe mode,
+    #falling back to the client-wide value (see api_nios4.set_defaults)
+    #--------------------------------------------------------
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.shared = "_" + name
+    #--------------------------------------------------------
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        if obj.__dict__.get("thread_safe"):
+            states = _CALL_STATE.get()
+            state = states.get(obj) if states is not None else None
+            if state is not None and self.name in state:
+                return state[self.name]
+        return obj.__dict__.get(self.shared, "")
+    #--------------------------------------------------------
+    def __set__(self, obj, value):
+        if not obj.__dict__.get("thread_safe"):
+            obj.__dict__[self.shared] = value
+            return
+        states = _CALL_STATE.get()
+        states = weakref.WeakKeyDictionary(states) if states is not None else weakref.WeakKeyDictionary()
+        states[obj] = {**states.get(obj, {}), self.name: value}
+        _CALL_STATE.set(states)
+
+class api_nios4:
+    #actions that can be sent again without changing the result
+    #(table_save inserts new rows like detail_save with is_new: it is not one of them)
+    IDEMPOTENT_ACTIONS = {"model", "model_fuzzy", "detail_resolve", "file_upload"}
+    #per thread / task in thread-safe mode
+    dbname = _ContextAttribute()
+    token = _ContextAttribute()
+    error_code = _ContextAttribute()
+    error_message = _ContextAttribute()
+    #--------------------------------------------------------
+    def tid(self) -> int:
+        """
+        Generate a unique time-based identifier (TID) in UTC timezone.
+
+        The identifier is created from the current UTC time in the format
+        ``YYYYMMDDHHMMSS``. If the generated value ends with "60" (an invalid
+        second value), it is adjusted by subtracting 1.
+
+        Returns
+        -------
+        int
+            The generated time identifier as an integer.
+
+        Examples
+        --------
+        >>> obj.tid()
+        20250930143215
+        """
+        val = datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')
+        #I check that the value does not end with 60
+        sval = str(int(val))
+        if sval[-2:] == "60":
+            val = val-1
+        return int(val)
+    #--------------------------------------------------------
+    def reset_error(self):
+        """
+        Reset error message
+        """
+        self.error_code = ""
+        self.error_message = ""    
+    #--------------------------------------------------------
+    def check_value(self,value :Any,format : str) -> Any:
+        """
+        Validate and normalize a value according to the specified format.
+
+        Depending on the given format, the function converts the input value
+        into a standardized type:
+        
+        - ``text``: Converts the value to a string (empty string if None).
+        - ``decimalnumber``: Converts to a float using Decimal, or 0 if None/empty.
+        - ``integernumber``: Converts to an integer, or 0 if None/empty.
+        - ``date``: Converts to a normalized date using ``self.normalize_date``,
+        or 0 if None/empty.
+
+        Parameters
+        ----------
+        value : Any
+            The input value to validate and normalize.
+        format : str
+            The expected format of the value. Supported options are:
+            ``"text"``, ``"decimalnumber"``, ``"integernumber"``, ``"date"``.
+
+        Returns
+        -------
+        Any
+            The normalized value, with its type depending on the specified format.
+
+        Examples
+        --------
+        >>> obj.check_value("123.45", "decimalnumber")
+        123.45
+
+        >>> obj.check_value("", "integernumber")
+        0
+
+        >>> obj.check_value(None, "text")
+        ''
+
+        >>> obj.check_value("2025-09-30", "date")
+        20250930
+        """        
+        if format == "text":
+            value = str(value) if value is not None else ""
+        if format == "decimalnumber":
+            if value == "":
+                value = None
+            value = float(Decimal(value)) if value is not None else 0
+        if format == "integernumber":
+            if value == "":
+                value = None
+            value = int(float(value)) if value is not None else 0
+        if format == "date":
+            if value is None or value == "":
+                value = 0
+            else:
+                value = self.normalize_date(value)
+        return value
+    #--------------------------------------------------------        
+    def normalize_tid(self, value: int) -> str:
+        """
+        Convert a numeric time identifier (TID) into an ISO 8601 datetime string.
+
+        The input value is expected to be in the format ``YYYYMMDDHHMMSS`` and will
+        be parsed into a Python ``datetime`` object, which is then converted into
+        ISO 8601 string representation.
+
+        Parameters
+        ----------
+        value : int
+            The time identifier in the format ``YYYYMMDDHHMMSS``.
+
+        Returns
+        -------
+        str
+            The corresponding datetime in ISO 8601 format.
+
+        Examples
+        --------
+        >>> obj.normalize_tid(20250930143215)
+        '2025-09-30T14:32:15'
+        """        
+        dt = datetime.strptime(str(value), "%Y%m%d%H%M%S")
+        return dt.isoformat()
+    #--------------------------------------------------------        
+    def normalize_date(self, value: Any) -> int:
+        """
+        Normalize a date or datetime into a numeric time identifier (TID).
+
+        The function accepts different types of inputs and converts them
+        into an integer timestamp in the format ``YYYYMMDDHHMMSS``:
+
+        - ``datetime`` or ``date`` objects: converted directly.
+        - ``int`` values: returned as-is (assumed already normalized).
+        - ``str`` values: parsed as ``YYYY-MM-DD``.
+        
+        If the input string cannot be parsed as a date, a ``ValueError`` is raised.
+
+        Parameters
+        ----------
+        value : Any
+            The input value to normalize. Supported types are ``datetime``,
+            ``date``, ``int``, or ``str`` in the format ``YYYY-MM-DD``.
+
+        Returns
+        -------
+        int
+            The normalized date as an integer in the format ``YYYYMMDDHHMMSS``.
+
+        Raises
+        ------
+        ValueError
+            If the string input cannot be parsed as a valid date.
+
+        Examples
+        --------
+        >>> obj.normalize_date(datetime(2025, 9, 30, 14, 32, 15))
+        20250930143215
+
+        >>> obj.normalize_date(date(2025, 9, 30))
+        20250930000000
+
+        >>> obj.normalize_date(20250930143215)
+        20250930143215
+
+        >>> obj.normalize_date("2025-09-30")
+        20250930000000
+        """        
+        if isinstance(value, (datetime, date)):
+            dt = value
+        elif isinstance(value, int):
+            return value
+        
+        else:
+            try:
+                dt = datetime.strptime(value, "%Y-%m-%d")
+            except (ValueError, TypeError):
+                raise ValueError(f"Non è possibile interpretare {value!r} come data")
+
+        return int(dt.strftime("%Y%m%d%H%M%S"))    
+    #--------------------------------------------------------        
+    def __init__(self,token:str = "",username:str = "",password:str="",transport:Any=None,
+                 metadata_cache:Optional[MetadataCache]=None,snapshot_dir:str="",
+                 codec:Optional[JsonCodec]=None,retry:Optional[RetryPolicy]=None,
+                 limiter:Optional[AdaptiveLimiter]=None,sync_window:float=0,sync_max_latency:float=0,
+                 file_cache:Optional[FileCache]=None,metrics:Optional[RequestMetrics]=None,
+                 thread_safe:bool=False,dbname:str="",auth:Optional[TokenManager]=None,
+                 query_cache:Optional[QueryCache]=None):
+        """
+        Initialize the client with optional authentication credentials.
+
+        This constructor sets up the base URL for the web service and initializes
+        the authentication attributes. It also resets any stored error state.
+
+        Parameters
+        ----------
+        token : str, optional
+            Authentication token. Default is an empty string.
+        username : str, optional
+            Username for authentication. Default is an empty string.
+        password : str, optional
+            Password for authentication. Default is an empty string.
+        transport : Nios4Transport, optional
+            HTTP transport used by every call. If omitted a pooled
+            ``Nios4Transport`` with default settings is created. Any object
+            exposing ``request(method, url, **kwargs)`` can be injected
+            (e.g. a fake transport in tests).
+        metadata_cache : MetadataCache, optional
+            Cache for the results of ``table_list``, ``table_info`` and
+            ``fields_info``. If omitted, every call reaches the server.
+        snapshot_dir : str, optional
+            Directory where ``save_schema_snapshot`` and ``load_schema_snapshot``
+            keep one schema file per database. Default is the current directory.
+        codec : JsonCodec, optional
+            JSON codec for request bodies and responses. Default ``JsonCodec()``,
+            which picks the fastest installed backend.
+        retry : RetryPolicy, optional
+            Retry policy for transient failures. Default
+            ``RetryPolicy(max_attempts=1)``: every request is sent once, as
+            without a policy; pass e.g. ``RetryPolicy()`` (3 attempts) to
+            enable retries.
+        limiter : AdaptiveLimiter, optional
+            Rate limiter and adaptive concurrency governor applied to every
+            request. If omitted, requests are not limited.
+        sync_window : float, optional
+            If greater than ``0``, enable a ``SyncScheduler``: writes mark their
+            database as dirty and ``sync`` is called in the background once no
+            write happened for ``sync_window`` seconds. Default ``0`` (disabled).
+        sync_max_latency : float, optional
+            Maximum delay in seconds between the first pending write and its
+            ``sync`` when writes keep coming. Default ``10 * sync_window``.
+        file_cache : FileCache, optional
+            On-disk cache serving repeated ``download_file`` calls. If omitted,
+            every download reaches the server.
+        metrics : RequestMetrics, optional
+            Aggregator registered as an ``after`` hook (see ``add_hook``) to
+            collect per-action latency histograms and counters.
+        thread_safe : bool, optional
+            If ``True``, ``dbname``, ``token``, ``error_code`` and
+            ``error_message`` are kept separately for every thread (and asyncio
+            task): the ``dbname``/``token`` overrides of a call and its error
+            state do not leak into calls running concurrently, so one client
+            and its connection pool can serve a whole thread pool. Assigning
+            these attributes then only affects the current thread; use
+            ``set_defaults`` for client-wide values. Default ``False``.
+        dbname : str, optional
+            Default database name. Default is an empty string.
+        auth : TokenManager, optional
+            Token lifecycle policy: transparent single-flight re-login when
+            the token expires (requires ``username``/``password``). If
+            omitted, an expired token surfaces as an error.
+        query_cache : QueryCache, optional
+            Cache for the results of ``find_records`` and ``fuzzy_records``,
+            invalidated by the writes of this client. If omitted, every query
+            reaches the server.
+
+        Attributes
+        ----------
+        base_url : str
+            Base URL of the web service API.
+        file_url : str
+            Base URL of the synchronizer used by ``upload_file``/``download_file``.
+        token : str
+            Authentication token, if provided.
+        id_user : str
+            User identifier (initialized as empty).
+        email_user : str
+            User email (initialized as empty).
+        username : str
+            Authentication username, if provided.
+        password : str
+            Authentication password, if provided.
+        dbname : str
+            Database name (initialized as empty).
+        transport : Nios4Transport
+            HTTP transport shared by all the calls of the client.
+        metadata_cache : MetadataCache or None
+            Schema metadata cache, if enabled.
+        file_cache : FileCache or None
+            Downloaded files cache, if enabled.
+        metrics : RequestMetrics or None
+            Request metrics aggregator, if enabled.
+        query_cache : QueryCache or None
+            Query results cache, if enabled.
+
+        Examples
+        --------
+        >>> client = MyClient(token="abc123", username="john", password="secret")
+        >>> client.base_url
+        'https://web.nios4.com/ws/'
+        """        
+        self.thread_safe = thread_safe
+        self.base_url = 'https://web.nios4.com/ws/'
+        self.file_url = 'https://app.pocketsell.com/_sync/'
+        self.set_defaults(dbname=dbname, token=token)
+        self._error_code = ""
+        self._error_message = ""
+        self.id_user = ""  
+        self.email_user = ""
+        self.username = username
+        self.password = password
+        self.transport = transport if transport is not None else Nios4Transport()
+        self.metadata_cache = metadata_cache
+        self.file_cache = file_cache
+        self.query_cache = query_cache
+        self.codec = codec if codec is not None else JsonCodec()
+        self.retry = retry if retry is not None else RetryPolicy(max_attempts=1)
+        self.limiter = limiter
+        self.auth = auth
+        self.before_hooks = []
+        self.after_hooks = []
+        self.metrics = metrics
+        if metrics is not None:
+            self.after_hooks.append(metrics.record)
+        self.write_behind = {}
+        self.last_transfer = {}
+        self.sync_scheduler = None
+        if sync_window > 0:
+            self.sync_scheduler = SyncScheduler(self, sync_window, sync_max_latency or 10 * sync_window)
+        self.snapshot_dir = snapshot_dir
+        self.snapshot_thread = None
+        self.snapshot_result = None
+    #------------------------------------------------------------
+    def set_defaults(self,dbname:Optional[str]=None,token:Optional[str]=None):
+        """
+        Set the client-wide database name and/or token.
+
+        In thread-safe mode these are the values seen by every thread that
+        did not override them; otherwise this is the same as assigning
+        ``self.dbname``/``self.token``.
+
+        Parameters
+        ----------
+        dbname : str, optional
+            Default database name. Unchanged if ``None``.
+        token : str, optional
+            Default authentication token. Unchanged if ``None``.
+
+        Examples
+        --------
+        >>> client = api_nios4(username="john", password="secret", thread_safe=True)
+        >>> client.login()
+        >>> client.set_defaults(dbname="mydb")
+        """
+        if dbname is not None:
+            self._dbname = dbname
+        if token is not None:
+            self._token = token
+    #------------------------------------------------------------
+    def call(self,method:Any,*args,**kwargs) -> CallResult:
+        """
+        Call a client method and return its outcome as an immutable ``CallResult``.
+
+        In thread-safe mode the ``dbname``/``token`` overrides passed to the
+        method only apply to this call: the previous values of the current
+        thread are restored afterwards. Without thread-safe mode the
+        overrides persist as with a direct call.
+
+        Parameters
+        ----------
+        method : callable
+            Bound method of this client (e.g. ``client.find_records``).
+        *args, **kwargs
+            Arguments of the method.
+
+        Returns
+        -------
+        CallResult
+            ``(value, error_code, error_message, dbname, token)``; ``ok`` is
+            ``True`` when ``error_code`` is empty.
+
+        Examples
+        --------
+        >>> client = api_nios4(token="abc123", thread_safe=True)
+        >>> with ThreadPoolExecutor(16) as pool:
+        ...     results = list(pool.map(lambda db: client.call(client.find_records, "customers", dbname=db), dbnames))
+        >>> [r.dbname for r in results if not r.ok]
+        []
+        """
+        reset = _CALL_STATE.set(_CALL_STATE.get()) if self.thread_safe else None
+        try:
+            value = method(*args, **kwargs)
+            return CallResult(value, self.error_code, self.error_message, self.dbname, self.token)
+        finally:
+            if reset is not None:
+                _CALL_STATE.reset(reset)
+    #------------------------------------------------------------
+    def __enter__(self):
+        return self
+    #------------------------------------------------------------
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    #------------------------------------------------------------
+    def close(self):
+        """
+        Flush the write-behind buffers, run the pending scheduled
+        synchronizations, then release the connections held by the transport.
+        """
+        for buffer in list(self.write_behind.values()):
+            buffer.close()
+        if self.sync_scheduler is not None:
+            self.sync_scheduler.close()
+        close = getattr(self.transport, "close", None)
+        if close is not None:
+            close()
+    #------------------------------------------------------------
+    def _action(self,url:str) -> str:
+        """
+        Return the ``action`` parameter of a web service URL.
+        """
+        return parse_qs(urlsplit(url).query).get("action", [""])[0]
+    #------------------------------------------------------------
+    def _is_connect_error(self,error:Exception) -> bool:
+        """
+        Whether a request failed before reaching the server (so that even a
+        non-idempotent request can be sent again).
+        """
+        if isinstance(error, requests.ConnectTimeout):
+            return True
+        if isinstance(error, requests.ConnectionError):
+            reason = getattr(error.args[0], "reason", None) if error.args else None
+            return isinstance(reason, urllib3.exceptions.NewConnectionError)
+        return False
+    #------------------------------------------------------------
+    def add_hook(self,before:Any=None,after:Any=None):
+        """
+        Register instrumentation hooks called around every request.
+
+        ``before(event)`` is called before a request is sent and
+        ``after(event)`` once it completed (retries included) or failed. The
+        event is a dictionary with ``action``, ``method``, ``tablename``,
+        ``db`` and ``bytes_sent`` (``None`` if unknown); ``after`` events also
+        carry ``status`` (``None`` on errors), ``bytes_received`` (``None`` if
+        unknown), ``retries``, ``duration`` in seconds and ``error`` (the
+        exception class name, or ``None``). The token is never included.
+        Exceptions raised by a hook are ignored.
+
+        Parameters
+        ----------
+        before : callable, optional
+            Hook called before the request.
+        after : callable, optional
+            Hook called after the request.
+
+        Examples
+        --------
+        >>> client = api_nios4(token="abc123")
+        >>> client.add_hook(after=lambda e: print(e["action"], e["status"], e["duration"]))
+        >>> client.find_records("customers", "mydb")
+        model 200 0.143
+        """
+        if before is not None:
+            self.before_hooks.append(before)
+        if after is not None:
+            self.after_hooks.append(after)
+    #------------------------------------------------------------
+    def _emit(self,hooks:list,event:dict):
+        for hook in hooks:
+            try:
+                hook(event)
+            except Exception:
+                pass
+    #------------------------------------------------------------
+    def _request_event(self,method:str,url:str,data:Any) -> dict:
+        """
+        Build the instrumentation event of a request (see ``add_hook``).
+        """
+        query = parse_qs(urlsplit(url).query)
+        bytes_sent = None
+        if data is None:
+            bytes_sent = 0
+        elif isinstance(data, (bytes, bytearray, memoryview, UploadStream)):
+            bytes_sent = len(data) if not isinstance(data, UploadStream) or data.size is not None else None
+        elif isinstance(data, str):
+            bytes_sent = len(data.encode("utf-8"))
+        return {"action": query.get("action", [""])[0], "method": method,
+                "tablename": query.get("tablename", [""])[0], "db": query.get("db", [""])[0],
+                "bytes_sent": bytes_sent}
+    #------------------------------------------------------------
+    def _request(self,method:str,url:str,idempotent:Optional[bool]=None,**kwargs) -> requests.Response:
+        """
+        Send a request through the client transport.
+
+        Every call to the web service goes through this method, so that
+        connection pooling, the limiter, the retry policy, the token
+        renewal and the instrumentation hooks apply uniformly. A ``json``
+        argument is serialized with the client codec. ``idempotent`` defaults
+        to ``True`` for GET requests and for the actions in
+        ``IDEMPOTENT_ACTIONS``; other requests are only retried when they did
+        not reach the server.
+        """
+        if "json" in kwargs:
+            kwargs["data"] = self.codec.dumps(kwargs.pop("json"))
+            kwargs["headers"] = {**(kwargs.get("headers") or {}), "Content-Type": "application/json"}
+        auth = self.auth
+        if auth is None or self._action(url) == "user_login":
+            return self._instrumented(method, url, idempotent, **kwargs)
+        used = parse_qs(urlsplit(url).query).get("token", [""])[0]
+        state = auth.state()
+        if state == "expired":
+            token = self._relogin(used)
+            if token is not None and token != used:
+                url = url.replace(f"token={used}", f"token={token}", 1)
+                used = token
+        elif state == "refresh" and auth.claim_refresh():
+            threading.Thread(target=self._relogin, args=(self._token, True), daemon=True).start()
+        response = self._instrumented(method, url, idempotent, **kwargs)
+        if not auth.is_failure(response, kwargs.get("stream", False), self.codec):
+            return response
+        data = kwargs.get("data")
+        if data is not None and not isinstance(data, (bytes, bytearray, memoryview, str, dict)) and not hasattr(data, "seek"):
+            return response
+        token = self._relogin(used)
+        if token is None or token == used:
+            return response
+        response.close()
+        if hasattr(data, "seek"):
+            data.seek(0)
+        return self._instrumented(method, url.replace(f"token={used}", f"token={token}", 1), idempotent, **kwargs)
+    #------------------------------------------------------------
+    def _relogin(self,failed:str,proactive:bool=False) -> Optional[str]:
+        """
+        Obtain a new token replacing ``failed`` and return it (``None`` if
+        the login fails or ``failed`` is not a token of this client).
+
+        Single-flight: callers arriving while a login is in progress wait
+        for it and reuse its token instead of logging in again.
+        """
+        auth = self.auth
+        with auth.lock:
+            try:
+                current = self._token
+                if failed in auth.replaced:
+                    #already renewed by a concurrent caller
+                    return current
+                if failed != current:
+                    #a token passed explicitly to the call: not ours to renew
+                    return None
+                if self.username == "":
+                    auth.failures += 1
+                    return None
+                url = self.base_url + f'?action=user_login&email={self.username}&password={self.password}'
+                #also runs in the proactive refresh thread, where an
+                #exception would be lost: any failure is a failed login
+                try:
+                    user, code, message = self._fetch("GET", url, "E1", "user")
+                    token = user['token'] if user is not None else None
+                except Exception:
+                    token = None
+                if not token:
+                    auth.failures += 1
+                    return None
+                self.set_defaults(token=token)
+                auth.renewed(failed, token)
+                auth.relogins += 1
+                if proactive:
+                    auth.proactive += 1
+            finally:
+                if proactive:
+                    auth.refreshing = False
+        if self.token == failed:
+            self.token = token
+        return token
+    #------------------------------------------------------------
+    def _instrumented(self,method:str,url:str,idempotent:Optional[bool]=None,**kwargs) -> requests.Response:
+        """
+        Send a request calling the instrumentation hooks around it.
+        """
+        if not self.before_hooks and not self.after_hooks:
+            return self._send(method, url, idempotent, None, **kwargs)
+        event = self._request_event(method, url, kwargs.get("data"))
+        self._emit(self.before_hooks, event)
+        event = dict(event, status=None, bytes_received=None, retries=0, duration=0.0, error=None)
+        started = time.monotonic()
+        try:
+            response = self._send(method, url, idempotent, event, **kwargs)
+        except BaseException as e:
+            event["duration"] = time.monotonic() - started
+            event["error"] = type(e).__name__
+            self._emit(self.after_hooks, event)
+            raise
+        event["duration"] = time.monotonic() - started
+        event["status"] = response.status_code
+        if not kwargs.get("stream"):
+            event["bytes_received"] = len(response.content)
+        elif response.headers.get("Content-Length", "").isdigit():
+            event["bytes_received"] = int(response.headers["Content-Length"])
+        self._emit(self.after_hooks, event)
+        return response
+    #------------------------------------------------------------
+    def _send(self,method:str,url:str,idempotent:Optional[bool],event:Optional[dict],**kwargs) -> requests.Response:
+        """
+        Send a request with the limiter and the retry policy, recording the
+        number of retries in ``event`` if given.
+        """
+        action = self._action(url)
+        if idempotent is None:
+            idempotent = method == "GET" or action in self.IDEMPOTENT_ACTIONS
+        retry = self.retry
+        retry.start()
+        #a body that cannot be rewound (generator, pipe) can be sent only once
+        data = kwargs.get("data")
+        max_attempts = retry.max_attempts
+        if data is not None and not isinstance(data, (bytes, bytearray, memoryview, str, dict)) and not hasattr(data, "seek"):
+            max_attempts = 1
+        attempt = 1
+        while True:
+            if attempt > 1 and hasattr(data, "seek"):
+                data.seek(0)
+            limiter = self.limiter
+            if limiter is not None:
+                limiter.acquire()
+            started = time.monotonic()
+            try:
+                response = self.transport.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if limiter is not None:
+                    limiter.release(time.monotonic() - started, True)
+                if attempt >= max_attempts or not (idempotent or self._is_connect_error(e)) \
+                        or not retry.acquire(action):
+                    retry.finish(attempt, False)
+                    raise
+                time.sleep(retry.delay(attempt))
+                attempt += 1
+                if event is not None:
+                    event["retries"] = attempt - 1
+                continue
+            except BaseException:
+                if limiter is not None:
+                    limiter.release(time.monotonic() - started)
+                raise
+            status = response.status_code
+            if limiter is not None:
+                limiter.release(time.monotonic() - started, status == 429 or status >= 500)
+            if status not in retry.retry_statuses or attempt >= max_attempts \
+                    or not (idempotent or status == 429) or not retry.acquire(action):
+                retry.finish(attempt, status not in retry.retry_statuses)
+                return response
+            if kwargs.get("stream"):
+                response.close()
+            time.sleep(retry.delay(attempt, response.headers.get("Retry-After")))
+            attempt += 1
+            if event is not None:
+                event["retries"] = attempt - 1
+    #------------------------------------------------------------
+    def _after_write(self,tablename:str,dbname:str="",token:str=""):
+        """
+        Called after every successful write (``save_record``, ``save_records``,
+        ``save_records_batch``, ``detail_delete``, write-behind flushes, and
+        the ``AsyncNios4`` coroutines) on ``tablename``. ``dbname``/``token``
+        default to the client ones.
+        """
+        dbname = dbname or self.dbname
+        token = token or self.token
+        if self.query_cache is not None:
+            self.query_cache.invalidate(dbname, tablename)
+        if self.sync_scheduler is not None:
+            self.sync_scheduler.mark_dirty(dbname, token)
+    #------------------------------------------------------------
+    def _flush_write_behind(self,tablename:str):
+        """
+        Flush the write-behind buffer of ``tablename`` (if any) so that a
+        direct write cannot be overtaken by older buffered records.
+        """
+        buffer = self.write_behind.get((self.dbname, tablename))
+        if buffer is not None:
+            buffer.flush()
+    #------------------------------------------------------------
+    def enable_write_behind(self,tablename:str,dbname:str="",token:str="",max_rows:int=500,
+                            max_delay:float=1.0) -> "WriteBehindBuffer":
+        """
+        Buffer the ``save_record`` calls of a table into ``table_save`` batches.
+
+        Once enabled, ``save_record`` on ``tablename`` (in ``dbname``) does not
+        send a request: the record is added to a ``WriteBehindBuffer`` and a
+        ``concurrent.futures.Future`` is returned instead of the response. The
+        buffer is flushed as a single ``table_save`` request when it holds
+        ``max_rows`` records, ``max_delay`` seconds after its oldest record,
+        on ``flush()``, on ``close()`` and at interpreter exit. Deletes and
+        direct writes on the table flush the buffer first.
+
+        Parameters
+        ----------
+        tablename : str
+            Name of the table.
+        dbname : str, optional
+            Database name. If provided, overrides the stored value. Default ``""``.
+        token : str, optional
+            Authentication token. If provided, overrides the stored value. Default ``""``.
+        max_rows : int, optional
+            Number of buffered records triggering a flush. Default 500.
+        max_delay : float, optional
+            Maximum time in seconds a record waits in the buffer. Default 1.0.
+
+        Returns
+        -------
+        WriteBehindBuffer
+            The buffer of the table.
+
+        Examples
+        --------
+        >>> client.enable_write_behind("events", "mydb", max_rows=200, max_delay=0.5)
+        >>> future = client.save_record("events", {"gguid": str(uuid.uuid4()), "kind": "click"})
+        >>> future.result()["error"]
+        False
+        """
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+        key = (self.dbname, tablename)
+        if key not in self.write_behind:
+            self.write_behind[key] = WriteBehindBuffer(self, tablename, self.dbname, self.token, max_rows, max_delay)
+        return self.write_behind[key]
+    #------------------------------------------------------------
+    def flush(self):
+        """
+        Flush every write-behind buffer of the client.
+        """
+        for buffer in list(self.write_behind.values()):
+            buffer.flush()
+    #------------------------------------------------------------
+    def _fuzzy_payload(self,fields_search: List[str],fields_return: List[str],query:str,
+                       threshold:Decimal=0.5,search_by:Dict[str, Any] | None = None,
+                       conditions:Dict[str, Any] | None = None,iduser:str = "") -> dict:
+        """
+        Build the request body of the ``model_fuzzy`` endpoint.
+        """
+        payload = {}
+        payload['fields'] = fields_return
+        fuzzy = {}
+        fuzzy['fields'] = fields_search
+        fuzzy['query'] = query
+        fuzzy['threshold'] = float(threshold)
+        payload['fuzzy'] = fuzzy
+        if search_by:
+            payload['search_by'] = search_by
+        if conditions:
+            payload['conditions'] = conditions
+        if iduser != "":
+            payload['uta'] = iduser
+        return payload
+    #------------------------------------------------------------
+    def _find_payload(self,fields_search: List[str] = None,value_search: str = "",
+                      search_by:Dict[str, Any] | None = None,
+                      conditions:Dict[str, Any] | None = None,order_info:List[Any]= None,
+                      iduser:str = "") -> dict:
+        """
+        Build the request body of the ``model`` endpoint.
+        """
+        payload = {}
+        if fields_search != None and value_search != "":
+            payload["search"] = {
+                "fields": fields_search,
+                "query": value_search
+            }
+        if search_by:
+            payload['search_by'] = search_by
+        if conditions:
+            payload['conditions'] = conditions
+        if order_info:
+            payload['order_info'] = order_info
+        if iduser != "":
+            payload['uta'] = iduser
+        return payload
+    #------------------------------------------------------------
+    def _fetch(self,method:str,url:str,error_code:str,key:str = "",payload:Any=None,**kwargs) -> tuple[Any, str, str]:
+        """
+        Send a request and parse the standard ``{"error": ...}`` envelope
+        without touching the error state of the client.
+
+        Used by the concurrent helpers, whose workers must not overwrite
+        ``self.error_code``/``self.error_message`` of each other.
+
+        Returns
+        -------
+        tuple of (Any, str, str)
+            ``(values[key], "", "")`` on success (the whole response if ``key``
+            is empty), ``(None, error_code, error_message)`` on failure.
+        """
+        if payload is not None:
+            kwargs["json"] = payload
+        response = self._request(method, url, **kwargs)
+        if response.status_code != 200:
+            return None, error_code, response.text
+        values = self.codec.loads(response.content)
+        if values["error"] == True:
+            return None, values["error_code"], values["error_message"]
+        return (values[key] if key != "" else values), "", ""
+    #------------------------------------------------------------
+    def _iter_json_array(self,chunks:Iterator[bytes],key:str,envelope:dict) -> Iterator[Any]:
+        """
+        Incrementally decode a JSON object read from ``chunks`` and yield the
+        items of its ``key`` array as soon as each one is complete.
+
+        The other top-level members are decoded normally and stored in
+        ``envelope``. Only the item being decoded is kept in memory.
+        """
+        decoder = json.JSONDecoder()
+        utf8 = codecs.getincrementaldecoder("utf-8")()
+        chunks = iter(chunks)
+        buf = ""
+        pos = 0
+        eof = False
+
+        def more() -> bool:
+            nonlocal buf, pos, eof
+            if eof:
+                return False
+            for chunk in chunks:
+                if chunk:
+                    buf = buf[pos:] + utf8.decode(chunk)
+                    pos = 0
+                    return True
+            buf = buf[pos:] + utf8.decode(b"", final=True)
+            pos = 0
+            eof = True
+            return False
+
+        def skip(separators:str = "") -> str:
+            #skip whitespace (and the given separators), return the next char
+            nonlocal pos
+            while True:
+                while pos < len(buf) and (buf[pos].isspace() or buf[pos] in separators):
+                    pos += 1
+                if pos < len(buf):
+                    return buf[pos]
+                if not more():
+                    raise ValueError("Unexpected end of JSON response")
+
+        def value() -> Any:
+            #decode the next complete value, reading more data if it is truncated
+            nonlocal pos
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if not more():
+                        raise
+                    continue
+                #a number ending with the buffer may continue in the next chunk
+                if end == len(buf) and not eof:
+                    more()
+                    continue
+                pos = end
+                return item
+
+        if skip() != "{":
+            raise ValueError("JSON response is not an object")
+        pos += 1
+        while True:
+            if skip(",") == "}":
+                return
+            name = value()
+            if skip() != ":":
+                raise ValueError("Invalid JSON response")
+            pos += 1
+            if skip() == "[" and name == key:
+                pos += 1
+                while skip(",") != "]":
+                    yield value()
+                pos += 1
+            else:
+                envelope[name] = value()
+    #------------------------------------------------------------
+    def _stream_array(self,url:str,payload:Any,key:str,error_code:str) -> Iterator[Any]:
+        """
+        Send a streamed POST request and yield the items of the ``key`` array
+        of the response as they are decoded. Sets the error state if the
+        request fails or the server reports an error.
+        """
+        response = self._request("POST", url, json=payload, stream=True)
+        try:
+            if response.status_code != 200:
+                self.error_code = error_code
+                self.error_message = response.text
+                return
+            envelope = {}
+            yield from self._iter_json_array(response.iter_content(chunk_size=65536), key, envelope)
+            if envelope.get("error") == True:
+                self.error_code = envelope.get("error_code", error_code)
+                self.error_message = envelope.get("error_message", "")
+        finally:
+            response.close()
+    #------------------------------------------------------------
+    def login(self, token: str = "") -> bool:
+        """
+        Authenticate the user and start a session with the web service.
+
+        The function performs login either using username/password or
+        an authentication token. If a token is passed, it overrides the
+        username/password method. The client state is updated with user
+        information and authentication details after a successful login.
+
+        Parameters
+        ----------
+        token : str, optional
+            Authentication token. If provided, it will be used instead of
+            username and password. Default is an empty string.
+
+        Returns
+        -------
+        bool
+            True if the login is successful, False otherwise.
+
+        Side Effects
+        ------------
+        - Updates ``self.token`` if a new token is obtained.
+        - Updates ``self.id_user`` and ``self.email_user`` on successful login.
+        - Updates ``self.error_code`` and ``self.error_message`` if login fails.
+
+        Raises
+        ------
+        None directly, but sets error state in attributes if login fails.
+
+        Examples
+        --------
+        >>> client = MyClient(username="john", password="secret")
+        >>> client.login()
+        True
+
+        >>> client = MyClient()
+        >>> client.login(token="abc123")
+        True
+
+        >>> client.login("wrongtoken")
+        False
+        """
+        self.reset_error()
+
+        if token != "":
+            self.token = token
+
+        url = self.base_url + f'?action=user_login&email={self.username}&password={self.password}'
+        if self.token != "":
+            url = self.base_url + f'?action=user_login&token={self.token}'
+               
+        response= self._request("GET", url)
+        if response.status_code == 200:
+            values= self.codec.loads(response.content)
+            if values["error"] == True:
+                self.error_code = values["error_code"]
+                self.error_message = values["error_message"]
+                return False
+            else:
+                user = values['user']
+                self.id_user = user['id']
+                self.email_user = user['email']
+                if self.token == "":
+                    self.token = user['token']
+                    if self._token == "":
+                        #thread-safe mode: the first token obtained becomes the client-wide one
+                        self.set_defaults(token=user['token'])
+                if self.auth is not None and self.token == self._token:
+                    self.auth.obtained_at = time.monotonic()
+                return True
+        else:
+            self.error_code = "E1"
+            self.error_message = response.text
+            return False
+    #------------------------------------------------------------
+    def database_list(self, token: str = "") -> Optional[list]:
+        """
+        Retrieve the list of databases available for the authenticated user.
+
+        The function sends a request to the web service using the current
+        authentication token. If a token is passed as argument, it overrides
+        the stored token. If no valid token is available, the function sets
+        an error state and returns ``None``.
+
+        Parameters
+        ----------
+        token : str, optional
+            Authentication token. If provided, it will be used instead of
+            the stored token. Default is an empty string.
+
+        Returns
+        -------
+        list of dict or None
+            A list of databases (as dictionaries) if the request is successful.
+            Returns ``None`` if authentication fails, the request fails, or
+            an error occurs.
+
+        Side Effects
+        ------------
+        - Updates ``self.token`` if a new token is provided.
+        - Updates ``self.error_code`` and ``self.error_message`` if the request fails.
+
+        Raises
+        ------
+        None directly, but sets error state in attributes if login fails.
+
+        Examples
+        --------
+        >>> client = MyClient(token="abc123")
+        >>> dbs = client.database_list()
+        >>> isinstance(dbs, list)
+        True
+
+        >>> client = MyClient()
+        >>> client.database_list("wrongtoken")
+        None
+        """
+        self.reset_error()
+
+        if token != "":
+            self.token = token
+ 
+        if self.token != "":
+            url = self.base_url + f'?action=database_list&token={self.token}'
+        else:
+            self.error_code = "TK1"
+            self.errormessage = "Token missing"
+            return None
+        
+        response= self._request("GET", url)
+        if response.status_code == 200:
+            values= self.codec.loads(response.content)
+            if values["error"] == True:
+                self.error_code = values["error_code"]
+                self.error_message = values["error_message"]
+                return None
+            else:
+                return values['db']
+        else:
+            self.error_code = "E2"
+            self.error_message = response.text
+            return None     
+    #------------------------------------------------------------
+    def users_list(self,dbname:str="",token:str="") -> Optional[list]:
+        """
+        Retrieve the list of users for the specified database.
+
+        The function queries the web service to fetch users associated with
+        a given database. If a token or database name is provided as arguments,
+        they override the stored values. If no valid token is available, the
+        function sets an error state and returns ``None``.
+
+        Parameters
+        ----------
+        dbname : str, optional
+            The name of the database to query. If provided, it overrides the
+            stored database name. Default is an empty string.
+        token : str, optional
+            Authentication token. If provided, it overrides the stored token.
+            Default is an empty string.
+
+        Returns
+        -------
+        list of dict or None
+            A list of users (as dictionaries) if the request is successful.
+            Returns ``None`` if authentication fails, the request fails,
+            or an error occurs.
+
+        Side Effects
+        ------------
+        - Updates ``self.dbname`` if a new database name is provided.
+        - Updates ``self.token`` if a new token is provided.
+        - Updates ``self.error_code`` and ``self.error_message`` if the request fails.
+
+        Raises
+        ------
+        None directly, but sets error state in attributes if login fails.
+
+        Examples
+        --------
+        >>> client = MyClient(token="abc123", dbname="mydb")
+        >>> users = client.users_list()
+        >>> isinstance(users, list)
+        True
+
+        >>> client = MyClient()
+        >>> client.users_list("mydb", "wrongtoken")
+        None
+        """
+        self.reset_error()
+
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+
+        if self.token != "":
+            url = self.base_url + f'?action=users&token={self.token}&db={self.dbname}'
+        else:
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+        
+        response= self._request("GET", url)
+        if response.status_code == 200:
+            values= self.codec.loads(response.content)
+            if values["error"] == True:
+                self.error_code = values["error_code"]
+                self.error_message = values["error_message"]
+                return None
+            else:
+                return values['users']
+        else:
+            self.error_code = "E3"
+            self.error_message = response.text
+            return None     
+    #------------------------------------------------------------
+    def table_list(self,dbname:str="",token:str="") -> Optional[list]:
+        """
+        Retrieve the list of tables available in the specified database.
+
+        The function queries the web service to fetch all tables associated
+        with a given database. If a token or database name is provided as
+        arguments, they override the stored values. If no valid token is
+        available, the function sets an error state and returns ``None``.
+
+        Parameters
+        ----------
+        dbname : str, optional
+            The name of the database to query. If provided, it overrides the
+            stored database name. Default is an empty string.
+        token : str, optional
+            Authentication token. If provided, it overrides the stored token.
+            Default is an empty string.
+
+        Returns
+        -------
+        list of dict or None
+            A list of tables (as dictionaries) if the request is successful.
+            Returns ``None`` if authentication fails, the request fails,
+            or an error occurs.
+
+        Side Effects
+        ------------
+        - Updates ``self.dbname`` if a new database name is provided.
+        - Updates ``self.token`` if a new token is provided.
+        - Updates ``self.error_code`` and ``self.error_message`` if the request fails.
+
+        Raises
+        ------
+        None directly, but sets error state in attributes if login fails.
+
+        Examples
+        --------
+        >>> client = MyClient(token="abc123", dbname="mydb")
+        >>> tables = client.table_list()
+        >>> isinstance(tables, list)
+        True
+
+        >>> client = MyClient()
+        >>> client.table_list("mydb", "wrongtoken")
+        None
+        """
+        self.reset_error()
+
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+
+        if self.token != "":
+            url = self.base_url + f'?action=table_list&token={self.token}&db={self.dbname}'
+        else:
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+        
+        if self.metadata_cache is not None:
+            values = self.metadata_cache.get((self.dbname, None, MetadataCache.user_key(self.token)))
+            if values is not None:
+                return values['tables']
+
+        response= self._request("GET", url)
+        if response.status_code == 200:
+            values= self.codec.loads(response.content)
+            if values["error"] == True:
+                self.error_code = values["error_code"]
+                self.error_message = values["error_message"]
+                return None
+            else:
+                if self.metadata_cache is not None:
+                    self.metadata_cache.set((self.dbname, None, MetadataCache.user_key(self.token)), values)
+                return values['tables']
+        else:
+            self.error_code = "E4"
+            self.error_message = response.text
+            return None     
+    #------------------------------------------------------------
+    def table_info(self,tablename:str,dbname:str="",token:str="") -> Optional[dict]:
+        """
+        Retrieve detailed information about a specific table.
+
+        The function queries the web service to fetch metadata of a given table,
+        including parameters, expressions, and applied styles. If a token or
+        database name is provided as arguments, they override the stored values.
+        If no valid token is available, the function sets an error state and
+        returns ``None``.
+
+        Parameters
+        ----------
+        tablename : str
+            The name of the table to query.
+        dbname : str, optional
+            The name of the database containing the table. If provided, it
+            overrides the stored database name. Default is an empty string.
+        token : str, optional
+            Authentication token. If provided, it overrides the stored token.
+            Default is an empty string.
+
+        Returns
+        -------
+        dict or None
+            A dictionary containing the table's metadata (parameters,
+            expressions, styles) if the request is successful.
+            Returns ``None`` if authentication fails, the request fails,
+            or an error occurs.
+
+        Side Effects
+        ------------
+        - Updates ``self.dbname`` if a new database name is provided.
+        - Updates ``self.token`` if a new token is provided.
+        - Updates ``self.error_code`` and ``self.error_message`` if the request fails.
+
+        Raises
+        ------
+        None directly, but sets error state in attributes if the request fails.
+
+        Examples
+        --------
+        >>> client = MyClient(token="abc123", dbname="mydb")
+        >>> info = client.table_info("customers")
+        >>> isinstance(info, dict)
+        True
+
+        >>> client = MyClient()
+        >>> client.table_info("orders", "mydb", "wrongtoken")
+        None
+        """
+        self.reset_error()
+
+        if dbname != "":
+            self.dbname = dbname        
+        if token != "":
+            self.token = token
+
+        if self.token != "":
+            url = self.base_url + f'?action=table_info&token={self.token}&db={self.dbname}&tablename={tablename}'
+        else:
+            self.errorcode = "TK1"
+            self.errormessage = "Token missing"
+            return None
+        
+        if self.metadata_cache is not None:
+            values = self.metadata_cache.get((self.dbname, tablename, MetadataCache.user_key(self.token)))
+            if values is not None:
+                return values['table']
+
+        response= self._request("GET", url)
+        if response.status_code == 200:
+            values= self.codec.loads(response.content)
+            if values["error"] == True:
+                self.error_code = values["error_code"]
+                self.error_message = values["error_message"]
+                return None
+            else:
+                if self.metadata_cache is not None:
+                    self.metadata_cache.set((self.dbname, tablename, MetadataCache.user_key(self.token)), values)
+                return values['table']
+        else:
+            self.error_code = "E5"
+            self.error_message = response.text
+            return None     
+    #------------------------------------------------------------
+    def fields_info(self,tablename:str,dbname:str="",token:str="") -> Optional[list]:
+        """
+        Retrieve the fields and their parameters for a specific table.
+
+        The function queries the web service to fetch the fields that compose
+        a given table, along with all their parameters and metadata. If a token
+        or database name is provided as arguments, they override the stored
+        values. If no valid token is available, the function sets an error state
+        and returns ``None``.
+
+        Parameters
+        ----------
+        tablename : str
+            The name of the table to query.
+        dbname : str, optional
+            The name of the database containing the table. If provided, it
+            overrides the stored database name. Default is an empty string.
+        token : str, optional
+            Authentication token. If provided, it overrides the stored token.
+            Default is an empty string.
+
+        Returns
+        -------
+        list of dict or None
+            A list of fields (as dictionaries with parameters and metadata)
+            if the request is successful. Returns ``None`` if authentication
+            fails, the request fails, or an error occurs.
+
+        Side Effects
+        ------------
+        - Updates ``self.dbname`` if a new database name is provided.
+        - Updates ``self.token`` if a new token is provided.
+        - Updates ``self.error_code`` and ``self.error_message`` if the request fails.
+
+        Raises
+        ------
+        None directly, but sets error state in attributes if the request fails.
+
+        Examples
+        --------
+        >>> client = MyClient(token="abc123", dbname="mydb")
+        >>> fields = client.fields_info("customers")
+        >>> isinstance(fields, list)
+        True
+
+        >>> client = MyClient()
+        >>> client.fields_info("orders", "mydb", "wrongtoken")
+        None
+        """
+        self.reset_error()
+
+        if dbname != "":
+            self.dbname = dbname        
+        if token != "":
+            self.token = token
+
+        if self.token != "":
+            url = self.base_url + f'?action=table_info&token={self.token}&db={self.dbname}&tablename={tablename}'
+        else:
+            self.errorcode = "TK1"
+            self.errormessage = "Token missing"
+            return None
+        
+        if self.metadata_cache is not None:
+            values = self.metadata_cache.get((self.dbname, tablename, MetadataCache.user_key(self.token)))
+            if values is not None:
+                return values['fields']
+
+        response= self._request("GET", url)
+        if response.status_code == 200:
+            values= self.codec.loads(response.content)
+            if values["error"] == True:
+                self.error_code = values["error_code"]
+                self.error_message = values["error_message"]
+                return None
+            else:
+                if self.metadata_cache is not None:
+                    self.metadata_cache.set((self.dbname, tablename, MetadataCache.user_key(self.token)), values)
+                return values['fields']
+        else:
+            self.error_code = "E6"
+            self.error_message = response.text
+            return None     
+    #------------------------------------------------------------
+    def record_coercer(self,tablename:str,dbname:str="",token:str="",**kwargs) -> Optional[RecordCoercer]:
+        """
+        Build a ``RecordCoercer`` for a table from its ``fields_info``.
+
+        Parameters
+        ----------
+        tablename : str
+            The name of the table.
+        dbname : str, optional
+            Database name. If provided, overrides the stored value. Default ``""``.
+        token : str, optional
+            Authentication token. If provided, overrides the stored value. Default ``""``.
+        **kwargs
+            Extra arguments of ``RecordCoercer`` (``name_key``, ``type_key``, ``type_map``).
+
+        Returns
+        -------
+        RecordCoercer or None
+            The compiled coercer, or ``None`` if ``fields_info`` fails.
+
+        Examples
+        --------
+        >>> coercer = client.record_coercer("customers", "mydb")
+        >>> client.save_records("customers", coercer.coerce_rows(rows))
+        """
+        fields = self.fields_info(tablename, dbname, token)
+        if fields is None:
+            return None
+        return RecordCoercer(self, fields, **kwargs)
+    #------------------------------------------------------------
+    def _schema_snapshot_path(self,dbname:str,path:str="") -> str:
+        """
+        Return the snapshot file of a database.
+        """
+        if path != "":
+            return path
+        return os.path.join(self.snapshot_dir, f"{dbname}.schema.json")
+    #------------------------------------------------------------
+    def _write_schema_snapshot(self,dbname:str,token:str,tablenames:List[str],path:str,refresh:bool) -> tuple[bool, str, str]:
+        """
+        Collect the schema of ``dbname`` (from the metadata cache, or from the
+        server when ``refresh`` is set or an entry is missing), store it in the
+        cache and write it atomically to the snapshot file.
+
+        Returns ``(ok, error_code, error_message)``: the refresh started by
+        ``load_schema_snapshot`` runs in a background thread, so no exception
+        is let out.
+        """
+        user = MetadataCache.user_key(token)
+        cached = self.metadata_cache.entries(dbname, user)
+        names = [None] + sorted({t for t in cached if t is not None} | set(tablenames or []))
+
+        def fetch(tablename):
+            if not refresh and tablename in cached:
+                return cached[tablename], "", ""
+            if tablename is None:
+                url = self.base_url + f'?action=table_list&token={token}&db={dbname}'
+                return self._fetch("GET", url, "E4")
+            url = self.base_url + f'?action=table_info&token={token}&db={dbname}&tablename={tablename}'
+            return self._fetch("GET", url, "E5")
+
+        schema = {}
+        try:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                for tablename, (values, code, message) in zip(names, executor.map(fetch, names)):
+                    if values is None:
+                        return False, code, message
+                    self.metadata_cache.set((dbname, tablename, user), values)
+                    schema[tablename] = values
+        except requests.RequestException as e:
+            return False, "F1", str(e)
+        except Exception as e:
+            return False, "SS3", f"{e.__class__.__name__}: {e}"
+
+        snapshot = {
+            "version": SCHEMA_SNAPSHOT_VERSION,
+            "base_url": self.base_url,
+            "dbname": dbname,
+            "created": time.time(),
+            "table_list": schema.pop(None),
+            "tables": schema,
+        }
+        path = self._schema_snapshot_path(dbname, path)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            return False, "SS2", str(e)
+        return True, "", ""
+    #------------------------------------------------------------
+    def save_schema_snapshot(self,tablenames:List[str]=None,dbname:str="",token:str="",path:str="",refresh:bool=False) -> bool:
+        """
+        Persist the schema of a database to a local snapshot file.
+
+        The snapshot holds the table list and the ``table_info`` response of
+        every table already in the metadata cache plus ``tablenames``. Entries
+        missing from the cache (or all of them if ``refresh`` is set) are read
+        from the server concurrently. A metadata cache is created if the
+        client has none.
+
+        Parameters
+        ----------
+        tablenames : list of str, optional
+            Extra tables to include in the snapshot.
+        dbname : str, optional
+            Database name. If provided, overrides the stored value. Default ``""``.
+        token : str, optional
+            Authentication token. If provided, overrides the stored value. Default ``""``.
+        path : str, optional
+            Snapshot file. Default ``<snapshot_dir>/<dbname>.schema.json``.
+        refresh : bool, optional
+            Read every entry from the server even if cached. Default ``False``.
+
+        Returns
+        -------
+        bool
+            ``True`` if the snapshot was written, ``False`` otherwise.
+
+        Side Effects
+        ------------
+        - Updates ``self.dbname`` and/or ``self.token`` if provided.
+        - Updates ``self.error_code`` and ``self.error_message`` on failure.
+
+        Examples
+        --------
+        >>> client = MyClient(token="abc123", dbname="mydb", snapshot_dir="/var/cache/nios4")
+        >>> client.save_schema_snapshot(["customers", "orders"])
+        True
+        """
+        self.reset_error()
+
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+
+        if self.token == "":
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return False
+        if self.metadata_cache is None:
+            self.metadata_cache = MetadataCache()
+
+        ok, self.error_code, self.error_message = self._write_schema_snapshot(self.dbname, self.token, tablenames, path, refresh)
+        return ok
+    #------------------------------------------------------------
+    def load_schema_snapshot(self,dbname:str="",token:str="",path:str="",max_age:float=3600,refresh:bool=True) -> bool:
+        """
+        Load a schema snapshot into the metadata cache for a fast warm start.
+
+        After loading, ``table_list``, ``table_info`` and ``fields_info`` for
+        the tables in the snapshot are served from memory. If the snapshot is
+        older than ``max_age`` seconds and ``refresh`` is set, it is refreshed
+        from the server in a background thread (``self.snapshot_thread``) while
+        the loaded data is already in use; its outcome is stored in
+        ``self.snapshot_result`` as ``(ok, error_code, error_message)``. A
+        metadata cache is created if the client has none.
+
+        Parameters
+        ----------
+        dbname : str, optional
+            Database name. If provided, overrides the stored value. Default ``""``.
+        token : str, optional
+            Authentication token. If provided, overrides the stored value. Default ``""``.
+        path : str, optional
+            Snapshot file. Default ``<snapshot_dir>/<dbname>.schema.json``.
+        max_age : float, optional
+            Age in seconds after which the snapshot is refreshed. Default 3600.
+        refresh : bool, optional
+            Whether to refresh a stale snapshot in the background. Default ``True``.
+
+        Returns
+        -------
+        bool
+            ``True`` if the snapshot was loaded, ``False`` if it is missing,
+            unreadable, of another version or of another server.
+
+        Side Effects
+        ------------
+        - Updates ``self.dbname`` and/or ``self.token`` if provided.
+        - Updates ``self.error_code`` and ``self.error_message`` on failure.
+
+        Examples
+        --------
+        >>> client = MyClient(token="abc123", snapshot_dir="/var/cache/nios4")
+        >>> if not client.load_schema_snapshot("mydb"):
+        ...     client.fields_info("customers", "mydb")
+        ...     client.save_schema_snapshot()
+        """
+        self.reset_error()
+
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+
+        path = self._schema_snapshot_path(self.dbname, path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            self.error_code = "SS1"
+            self.error_message = str(e)
+            return False
+        if snapshot.get("version") != SCHEMA_SNAPSHOT_VERSION or snapshot.get("base_url") != self.base_url \
+                or snapshot.get("dbname") != self.dbname:
+            self.error_code = "SS1"
+            self.error_message = "Schema snapshot not compatible"
+            return False
+
+        if self.metadata_cache is None:
+            self.metadata_cache = MetadataCache()
+        user = MetadataCache.user_key(self.token)
+        self.metadata_cache.set((self.dbname, None, user), snapshot["table_list"])
+        for tablename, values in snapshot["tables"].items():
+            self.metadata_cache.set((self.dbname, tablename, user), values)
+
+        if refresh and self.token != "" and time.time() - snapshot["created"] > max_age:
+            def run(dbname, token, tablenames):
+                self.snapshot_result = self._write_schema_snapshot(dbname, token, tablenames, path, True)
+            self.snapshot_result = None
+            self.snapshot_thread = threading.Thread(target=run, args=(self.dbname, self.token, list(snapshot["tables"])),
+                                                    daemon=True)
+            self.snapshot_thread.start()
+        return True
+    #------------------------------------------------------------
+    def get_record(self,tablename:str,gguid:str,dbname:str="",token:str="") -> Optional[list]:
+        """
+        Retrieve a specific record from a table by its unique identifier (gguid).
+
+        The function queries the web service to fetch a single record from
+        the specified table using its unique global identifier (gguid).
+        If a token or database name is provided as arguments, they override
+        the stored values. If no valid token is available, the function sets
+        an error state and returns ``None``.
+
+        Parameters
+        ----------
+        tablename : str
+            The name of the table containing the record.
+        gguid : str
+            The unique global identifier of the record to retrieve.
+        dbname : str, optional
+            The name of the database containing the table. If provided, it
+            overrides the stored database name. Default is an empty string.
+        token : str, optional
+            Authentication token. If provided, it overrides the stored token.
+            Default is an empty string.
+
+        Returns
+        -------
+        list of dict or None
+            The record data as a list of dictionaries if the request is successful.
+            Returns ``None`` if authentication fails, the request fails,
+            or an error occurs.
+
+        Side Effects
+        ------------
+        - Updates ``self.dbname`` if a new database name is provided.
+        - Updates ``self.token`` if a new token is provided.
+        - Updates ``self.error_code`` and ``self.error_message`` if the request fails.
+
+        Raises
+        ------
+        None directly, but sets error state in attributes if the request fails.
+
+        Examples
+        --------
+        >>> client = MyClient(token="abc123", dbname="mydb")
+        >>> record = client.get_record("customers", "gguid-12345")
+        >>> isinstance(record, list)
+        True
+
+        >>> client = MyClient()
+        >>> client.get_record("orders", "gguid-00000", "mydb", "wrongtoken")
+        None
+        """
+        self.reset_error()
+        if dbname != "":
+            self.dbname = dbname        
+        if token != "":
+            self.token = token
+        if self.token != "":
+            url = self.base_url + f'?action=model&token={self.token}&db={self.dbname}&tablename={tablename}&gguid={gguid}'
+        else:
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+        response= self._request("GET", url)
+        if response.status_code == 200:
+            values= self.codec.loads(response.content)
+            if values["error"] == True:
+                self.error_code = values["error_code"]
+                self.error_message = values["error_message"]
+                return None
+            else:
+                return values['records']
+        else:
+            self.error_code = "E7"
+            self.error_message = response.text
+            return None
+    #------------------------------------------------------------
+    def detail_delete(self,tablename:str,gguid:str,dbname:str ="",token:str="")-> Optional[dict]:
+        """
+        Delete a specific record and its related details from a table.
+
+        The function sends a request to the web service to delete a record
+        identified by its unique global identifier (gguid) from the specified
+        table. Related data in linked tables is also removed. If a token or
+        database name is provided as arguments, they override the stored values.
+        If no valid token is available, the function sets an error state and
+        returns ``None``.
+
+        Parameters
+        ----------
+        tablename : str
+            The name of the table from which to delete the record.
+        gguid : str
+            The unique global identifier of the record to delete.
+        dbname : str, optional
+            The name of the database containing the table. If provided, it
+            overrides the stored database name. Default is an empty string.
+        token : str, optional
+            Authentication token. If provided, it overrides the stored token.
+            Default is an empty string.
+
+        Returns
+        -------
+        dict or None
+            A dictionary with the deletion result if successful.
+            Returns ``None`` if authentication fails, the request fails,
+            or an error occurs.
+
+        Side Effects
+        ------------
+        - Updates ``self.dbname`` if a new database name is provided.
+        - Updates ``self.token`` if a new token is provided.
+        - Updates ``self.error_code`` and ``self.error_message`` if the request fails.
+
+        Raises
+        ------
+        None directly, but sets error state in attributes if the request fails.
+
+        Examples
+        --------
+        >>> client = MyClient(token="abc123", dbname="mydb")
+        >>> result = client.detail_delete("customers", "gguid-12345")
+        >>> isinstance(result, dict)
+        True
+
+        >>> client = MyClient()
+        >>> client.detail_delete("orders", "gguid-00000", "mydb", "wrongtoken")
+        None
+        """
+        self.reset_error()
+
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+
+        if gguid == "":
+            return None
+        self._flush_write_behind(tablename)
+
+        payload = {}
+        payload['tablename'] = tablename
+        payload['gguid'] = gguid
+
+        url = ""
+        if self.token != "":
+            url = self.base_url + f'?action=detail_delete&token={self.token}&db={self.dbname}&tablename={tablename}'
+        else:
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+        response= self._request("POST", url, json=payload)
+        if response.status_code == 200:
+            values= self.codec.loads(response.content)
+            if values["error"] == True:
+                self.error_code = values["error_code"]
+                self.error_message = values["error_message"]
+                return None
+            else:
+                self._after_write(tablename)
+                return values
+        else:
+            self.error_code = "E8"
+            self.error_message = response.text
+            return None   
+    #------------------------------------------------------------
+    def detail_resolve(self,tablename:str,gguid:str,dbname:str ="",token:str=""):
+        """
+        Force the server to recalculate a record and its related data.
+
+        The function sends a request to the web service to trigger a recalculation
+        of a specific record. This process executes all expressions defined in the
+        table and related tables, and also recalculates any value distributors.
+        If a token or database name is provided as arguments, they override the
+        stored values. If no valid token is available, the function sets an error
+        state and returns ``None``.
+
+        Parameters
+        ----------
+        tablename : str
+            The name of the table containing the record.
+        gguid : str
+            The unique global identifier of the record to recalculate.
+        dbname : str, optional
+            The name of the database containing the table. If provided, it
+            overrides the stored database name. Default is an empty string.
+        token : str, optional
+            Authentication token. If provided, it overrides the stored token.
+            Default is an empty string.
+
+        Returns
+        -------
+        dict or None
+            A dictionary with the recalculation result if successful.
+            Returns ``None`` if authentication fails, the request fails,
+            or an error occurs.
+
+        Side Effects
+        ------------
+        - Updates ``self.dbname`` if a new database name is provided.
+        - Updates ``self.token`` if a new token is provided.
+        - Updates ``self.error_code`` and ``self.error_message`` if the request fails.
+        - Invalidates the ``query_cache`` entries of the table.
+
+        Raises
+        ------
+        None directly, but sets error state in attributes if the request fails.
+
+        Examples
+        --------
+        >>> client = MyClient(token="abc123", dbname="mydb")
+        >>> result = client.detail_resolve("orders", "gguid-98765")
+        >>> isinstance(result, dict)
+        True
+
+        >>> client = MyClient()
+        >>> client.detail_resolve("orders", "gguid-00000", "mydb", "wrongtoken")
+        None
+        """        
+        self.reset_error()
+
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+
+        payload = {}
+        payload['tablename'] = tablename
+        payload['gguid'] = gguid
+
+        url = ""
+        if self.token != "":
+            url = self.base_url + f'?action=detail_resolve&token={self.token}&db={self.dbname}&tablename={tablename}'
+        else:
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+        response= self._request("POST", url, json=payload)
+        if response.status_code == 200:
+            values= self.codec.loads(response.content)
+            if values["error"] == True:
+                self.error_code = values["error_code"]
+                self.error_message = values["error_message"]
+                return None
+            else:
+                if self.query_cache is not None:
+                    self.query_cache.invalidate(self.dbname, tablename)
+                return values
+        else:
+            self.error_code = "E9"
+            self.error_message = response.text
+            return None   
+
+    #------------------------------------------------------------
+    def fuzzy_records(self,tablename:str,fields_search: List[str],fields_return: List[str],
+                      query:str,dbname:str ="",token:str="",threshold:Decimal=0.5,
+                      search_by:Dict[str, Any] | None = None,
+                      conditions:Dict[str, Any] | None = None,
+                      iduser:str = "",stream:bool=False)-> Optional[list]:
+        """
+        Perform a fuzzy semantic search on records in a table.
+
+        The function sends a request to the ``model_fuzzy`` API endpoint, which
+        searches for records in the specified table matching a query string
+        against one or more fields using fuzzy matching. Additional filters
+        such as field conditions, search criteria, and user-specific filters
+        can be applied.
+
+        Parameters
+        ----------
+        tablename : str
+            The name of the table to query.
+        fields_search : list of str
+            The list of fields to apply the fuzzy search on.
+        fields_return : list of str
+            The list of fields to return in the result. If empty, all fields
+            are returned by default.
+        query : str
+            The string to search for in the specified fields.
+        dbname : str, optional
+            The name of the database containing the table. Overrides the stored
+            database name if provided. Default is an empty string.
+        token : str, optional
+            Authentication token. Overrides the stored token if provided.
+            Default is an empty string.
+        threshold : Decimal, optional
+            Minimum match threshold for fuzzy search, between 0.0 and 1.0.
+            Default is 0.5. A value of 0.0 matches everything, while 1.0
+            requires an exact match.
+        search_by : dict of {str: Any}, optional
+            Dictionary of field/value pairs to filter records with ``LIKE`` in
+            logical AND.
+        conditions : dict of {str: Any}, optional
+            Dictionary of field/value pairs to filter records with equality in
+            logical AND.
+        iduser : str, optional
+            User ID (UTA) to filter results by user-specific access. Default is
+            an empty string.
+        stream : bool, optional
+            If ``True``, return an iterator that decodes the ``results`` array
+            incrementally from the socket and yields each record as soon as it
+            is complete, instead of a fully materialized list. Default ``False``.
+
+        Returns
+        -------
+        list of dict or None
+            A list of matching records as dictionaries if the request succeeds.
+            Returns ``None`` if authentication fails, the request fails,
+            or an error occurs.
+
+        Side Effects
+        ------------
+        - Updates ``self.dbname`` if a new database name is provided.
+        - Updates ``self.token`` if a new token is provided.
+        - Updates ``self.error_code`` and ``self.error_message`` if the request fails.
+        - With a ``query_cache`` (and ``stream=False``), repeated queries are
+          answered from memory.
+
+        Raises
+        ------
+        None directly, but sets error state in attributes if the request fails.
+
+        Examples
+        --------
+        >>> client = MyClient(token="abc123", dbname="mydb")
+        >>> results = client.fuzzy_records(
+        ...     tablename="customers",
+        ...     fields_search=["name", "surname"],
+        ...     fields_return=["id", "name", "surname", "email"],
+        ...     query="Jon",
+        ...     threshold=0.7
+        ... )
+        >>> isinstance(results, list)
+        True
+
+        >>> client.fuzzy_records("orders", ["description"], ["id", "description"], "laptop", "mydb", "wrongtoken")
+        None
+        """
+        self.reset_error()
+
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+
+        payload = self._fuzzy_payload(fields_search,fields_return,query,threshold,search_by,conditions,iduser)
+
+        url = ""
+        if self.token != "":
+            url = self.base_url + f'?action=model_fuzzy&token={self.token}&db={self.dbname}&tablename={tablename}'
+        else:
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+
+        if stream:
+            return self._stream_array(url, payload, "results", "E10")
+
+        cache = self.query_cache
+        if cache is not None:
+            cache_key = cache.key(self.dbname, tablename, "model_fuzzy", payload, self.token)
+            content = cache.get(cache_key)
+            if content is not None:
+                return self.codec.loads(content)['results']
+            generation = cache.generation(self.dbname, tablename)
+
+        response= self._request("POST", url, json=payload)
+        if response.status_code == 200:
+            values= self.codec.loads(response.content)
+            if values["error"] == True:
+                self.error_code = values["error_code"]
+                self.error_message = values["error_message"]
+                return None
+            else:
+                if cache is not None:
+                    cache.set(cache_key, response.content, generation)
+                return values['results']
+        else:
+            self.error_code = "E10"
+            self.error_message = response.text
+            return None   
+    #------------------------------------------------------------
+    def find_records(self,tablename:str,dbname:str="",token:str="",fields_search: List[str] = None,value_search: str = "",
+                    search_by:Dict[str, Any] | None = None,
+                    conditions:Dict[str, Any] | None = None,order_info:List[Any]= None,
+                    iduser:str = "",stream:bool=False)-> Optional[list]:
+        """
+        Query records from a table with textual search, filters, and ordering.
+
+        This function calls the ``model`` endpoint to read records from a table,
+        applying (optionally) a text search over one or more fields, additional
+        LIKE/equality filters, ordering, and user-based filtering (UTA). Results
+        are subject to the user's permissions.
+
+        Parameters
+        ----------
+        tablename : str
+            Name of the table to read.
+        dbname : str, optional
+            Database name. If provided, overrides the stored value. Default ``""``.
+        token : str, optional
+            Authentication token. If provided, overrides the stored value. Default ``""``.
+        fields_search : list of str, optional
+            Fields to apply the textual search on (body ``search.fields``). If omitted
+            or empty, no textual search clause is added.
+        value_search : str, optional
+            Query string to search within ``fields_search`` (body ``search.query``).
+            Effective only if both ``fields_search`` and ``value_search`` are provided.
+            Default ``""``.
+        search_by : dict of {str: Any}, optional
+            Field/value pairs filtered with ``LIKE`` in logical AND (body ``search_by``).
+        conditions : dict of {str: Any}, optional
+            Field/value pairs filtered with equality in logical AND (body ``conditions``).
+            Values can be a scalar (matched as string) or an array of scalars (matched
+            with SQL ``IN`` semantics).
+        order_info : list, optional
+            Ordering specification (body ``order_info``) as
+            ``[["field_name", True_for_ASC], ...]``. Example: ``[["name", True], ["id", False]]``.
+        iduser : str, optional
+            Single user ID to filter by UTA (body ``uta``). Default ``""``.
+        stream : bool, optional
+            If ``True``, return an iterator that decodes the ``records`` array
+            incrementally from the socket and yields each record as soon as it
+            is complete, instead of a fully materialized list. Errors are
+            reported in ``self.error_code`` when the iteration ends. Default ``False``.
+
+        Returns
+        -------
+        list of dict or None
+            The list of records (``records``) if the request is successful.
+            Returns ``None`` if authentication fails, the request fails, or an error occurs.
+
+        Notes
+        -----
+        - Additional optional capabilities of the ``model`` endpoint (not used here)
+        include: pagination (``page``, ``perpage``), specific record by ``gguid``,
+        time-range filters for calendars (``timerange``), multi-``gguids`` filter,
+        grouping (``group_by``), and summary totals (``totals``).
+        - The server response may also include ``total`` (for pagination) and ``totals``
+        if requested; this function returns only ``records``.
+
+        Side Effects
+        ------------
+        - Updates ``self.dbname`` and/or ``self.token`` if provided.
+        - Updates ``self.error_code`` and ``self.error_message`` on failure.
+        - With a ``query_cache`` (and ``stream=False``), repeated queries are
+          answered from memory.
+
+        Examples
+        --------
+        Basic text search on two fields:
+        >>> client = MyClient(token="abc123", dbname="mydb")
+        >>> rows = client.find_records(
+        ...     tablename="customers",
+        ...     fields_search=["name", "surname"],
+        ...     value_search="jon"
+        ... )
+        >>> isinstance(rows, list)
+        True
+
+        Filters with LIKE and equality, plus ordering:
+        >>> rows = client.find_records(
+        ...     tablename="orders",
+        ...     search_by={"customer_name": "doe"},
+        ...     conditions={"status": ["open", "pending"]},
+        ...     order_info=[["created_at", True]]
+        ... )
+        >>> rows is None or isinstance(rows, list)
+        True
+        """
+        self.reset_error()
+
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+        
+        payload = self._find_payload(fields_search,value_search,search_by,conditions,order_info,iduser)
+
+        url = ""
+        if self.token != "":
+            url = self.base_url + f'?action=model&token={self.token}&db={self.dbname}&tablename={tablename}'
+        else:
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+
+        if stream:
+            return self._stream_array(url, payload, "records", "E11")
+
+        cache = self.query_cache
+        if cache is not None:
+            cache_key = cache.key(self.dbname, tablename, "model", payload, self.token)
+            content = cache.get(cache_key)
+            if content is not None:
+                return self.codec.loads(content)['records']
+            generation = cache.generation(self.dbname, tablename)
+
+        response= self._request("POST", url, json=payload)
+        if response.status_code == 200:
+            values= self.codec.loads(response.content)
+            if values["error"] == True:
+                self.error_code = values["error_code"]
+                self.error_message = values["error_message"]
+                return None
+            else:
+                if cache is not None:
+                    cache.set(cache_key, response.content, generation)
+                return values['records']
+        else:
+            self.error_code = "E11"
+            self.error_message = response.text
+            return None        
+    #------------------------------------------------------------
+    def iter_records(self,tablename:str,dbname:str="",token:str="",fields_search: List[str] = None,value_search: str = "",
+                     search_by:Dict[str, Any] | None = None,
+                     conditions:Dict[str, Any] | None = None,order_info:List[Any]= None,
+                     iduser:str = "",page_size:int=500) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the records of a query one page at a time.
+
+        Same filters as ``find_records``, but the ``model`` endpoint is called
+        with ``page``/``perpage`` and records are yielded as each page arrives,
+        so memory stays bounded by ``page_size`` whatever the size of the
+        table. ``gguid`` is appended to the ordering so that pages are stable.
+
+        Parameters
+        ----------
+        tablename : str
+            Name of the table to read.
+        dbname : str, optional
+            Database name. If provided, overrides the stored value. Default ``""``.
+        token : str, optional
+            Authentication token. If provided, overrides the stored value. Default ``""``.
+        fields_search, value_search, search_by, conditions, order_info, iduser
+            Same as ``find_records``.
+        page_size : int, optional
+            Number of records requested per page. Default 500.
+
+        Yields
+        ------
+        dict
+            One record at a time.
+
+        Side Effects
+        ------------
+        - Updates ``self.dbname`` and/or ``self.token`` if provided.
+        - Updates ``self.error_code`` and ``self.error_message`` if a page
+          fails; the iteration then stops.
+
+        Examples
+        --------
+        >>> client = MyClient(token="abc123", dbname="mydb")
+        >>> for row in client.iter_records("orders", conditions={"status": "open"}, page_size=1000):
+        ...     process(row)
+        >>> client.error_code
+        ''
+        """
+        self.reset_error()
+
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+
+        if self.token != "":
+            url = self.base_url + f'?action=model&token={self.token}&db={self.dbname}&tablename={tablename}'
+        else:
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return
+
+        order_info = list(order_info or [])
+        if not any(order[0] == "gguid" for order in order_info):
+            order_info.append(["gguid", True])
+        payload = self._find_payload(fields_search,value_search,search_by,conditions,order_info,iduser)
+        payload['perpage'] = page_size
+
+        page = 1
+        read = 0
+        while True:
+            payload['page'] = page
+            response = self._request("POST", url, json=payload)
+            if response.status_code != 200:
+                self.error_code = "E11"
+                self.error_message = response.text
+                return
+            values = self.codec.loads(response.content)
+            if values["error"] == True:
+                self.error_code = values["error_code"]
+                self.error_message = values["error_message"]
+                return
+            records = values['records']
+            total = values.get('total')
+            del values
+            yield from records
+            read += len(records)
+            if len(records) < page_size or (total is not None and read >= total):
+                return
+            page += 1
+    #------------------------------------------------------------
+    def get_records(self,tablename:str,gguids:List[str],dbname:str="",token:str="",
+                    chunk_size:int=200,max_workers:int=4) -> Optional[dict]:
+        """
+        Retrieve many records of a table by their gguids.
+
+        The gguids are split in chunks of ``chunk_size``; each chunk is read
+        with a single ``model`` request filtering ``gguid`` with ``IN``
+        semantics, and the chunks are sent concurrently on a pool of
+        ``max_workers`` threads. The records are returned in the same order
+        as ``gguids`` and failures are reported per gguid.
+
+        Parameters
+        ----------
+        tablename : str
+            Name of the table to read.
+        gguids : list of str
+            The gguids of the records to retrieve.
+        dbname : str, optional
+            Database name. If provided, overrides the stored value. Default ``""``.
+        token : str, optional
+            Authentication token. If provided, overrides the stored value. Default ``""``.
+        chunk_size : int, optional
+            Maximum number of gguids per request. Default 200.
+        max_workers : int, optional
+            Maximum number of requests in flight. Default 4.
+
+        Returns
+        -------
+        dict or None
+            A dictionary with:
+            - ``records`` (list): one entry per distinct input gguid (duplicates
+              are dropped, keeping the first occurrence), the record dict or
+              ``None`` if it could not be retrieved.
+            - ``errors`` (dict): ``{gguid: {"error_code": ..., "error_message": ...}}``
+              for every gguid not retrieved. Records missing from the table are
+              reported with error code ``NF``, those of a chunk whose response
+              could not be decoded with ``E12``.
+            Returns ``None`` if the token is missing.
+
+        Side Effects
+        ------------
+        - Updates ``self.dbname`` and/or ``self.token`` if provided.
+        - Sets ``self.error_code`` to ``E12`` if at least one gguid failed.
+
+        Examples
+        --------
+        >>> client = MyClient(token="abc123", dbname="mydb")
+        >>> result = client.get_records("customers", ["gguid-1", "gguid-2"])
+        >>> [r["gguid"] for r in result["records"] if r]
+        ['gguid-1', 'gguid-2']
+        """
+        self.reset_error()
+
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+
+        if self.token != "":
+            url = self.base_url + f'?action=model&token={self.token}&db={self.dbname}&tablename={tablename}'
+        else:
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+
+        gguids = list(dict.fromkeys(gguids))
+        unique = [g for g in gguids if g]
+        chunks = [unique[i:i + chunk_size] for i in range(0, len(unique), chunk_size)]
+
+        def fetch_chunk(chunk):
+            try:
+                records, code, message = self._fetch("POST", url, "E11", "records", {"conditions": {"gguid": chunk}})
+                if records is None:
+                    return None, code, message
+                return {record.get("gguid"): record for record in records}, "", ""
+            except requests.RequestException as e:
+                return None, "F1", str(e)
+            except Exception as e:
+                #malformed chunk (non-JSON body, unexpected envelope): the other chunks are kept
+                return None, "E12", f"Invalid response: {e.__class__.__name__}: {e}"
+
+        found = {}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            for chunk, (records, code, message) in zip(chunks, executor.map(fetch_chunk, chunks)):
+                if records is None:
+                    for g in chunk:
+                        errors[g] = {"error_code": code, "error_message": message}
+                    continue
+                found.update(records)
+
+        result = []
+        for g in gguids:
+            record = found.get(g)
+            if record is None and g not in errors:
+                errors[g] = {"error_code": "NF", "error_message": "Record not found"}
+            result.append(record)
+
+        if errors:
+            self.error_code = "E12"
+            self.error_message = f"{len(errors)} of {len(gguids)} records could not be retrieved"
+        return {"records": result, "errors": errors}
+    #------------------------------------------------------------
+    def save_record(self,tablename: str,values: Dict[str, Any],dbname: str ="",token:str="",is_new:bool=True,delete:bool=False)-> Optional[dict]:
+        """
+        Save or delete a record in a table.
+
+        This function calls the ``detail_save`` endpoint to persist a record
+        in the specified table. Depending on the flags, it can save a new record,
+        update an existing one, or delete a record entirely (including related data
+        in linked subtables). A valid ``gguid`` must always be provided in
+        ``values``.
+
+        Parameters
+        ----------
+        tablename : str
+            Name of the table where the record belongs.
+        values : dict
+            Dictionary containing the record values. Must include a non-empty
+            ``gguid`` key.
+        dbname : str, optional
+            Database name. If provided, overrides the stored value. Default ``""``.
+        token : str, optional
+            Authentication token. If provided, overrides the stored value. Default ``""``.
+        is_new : bool, optional
+            Whether the record is new (``True``) or an update to an existing record (``False``).
+            Default is ``True``.
+        delete : bool, optional
+            If ``True``, the record is deleted instead of saved. Default is ``False``.
+
+        Returns
+        -------
+        dict or None
+            The server response containing the updated record values if successful.
+            This may include auto-assigned fields such as ``ind`` (record index),
+            counters, or timestamps. Returns ``None`` if the request fails or an
+            error occurs. If write-behind is enabled for the table (see
+            ``enable_write_behind``), a ``Future`` resolving to the response of
+            the batch is returned instead.
+
+        Side Effects
+        ------------
+        - Updates ``self.dbname`` and/or ``self.token`` if provided.
+        - Updates ``self.error_code`` and ``self.error_message`` on failure.
+
+        Raises
+        ------
+        None directly, but sets error state in attributes if:
+        - ``values`` does not include a valid ``gguid``.
+        - Authentication or permissions fail.
+        - The server reports an error.
+
+        Examples
+        --------
+        Save a new record:
+        >>> client = MyClient(token="abc123", dbname="mydb")
+        >>> record = {"gguid": "gguid-12345", "name": "Alice"}
+        >>> result = client.save_record("customers", record, is_new=True)
+        >>> isinstance(result, dict)
+        True
+
+        Update an existing record:
+        >>> record = {"gguid": "gguid-12345", "name": "Alice Updated"}
+        >>> result = client.save_record("customers", record, is_new=False)
+
+        Delete a record:
+        >>> record = {"gguid": "gguid-12345"}
+        >>> result = client.save_record("customers", record, delete=True)
+        """
+        self.reset_error()
+
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+        
+        if values["gguid"] == "" or values["gguid"] == None:
+            self.error_code = "E1" 
+            self.error_message = "The record's gguid is not defined"
+            return None
+
+        buffer = self.write_behind.get((self.dbname, tablename))
+        if buffer is not None:
+            if not delete:
+                return buffer.add(values)
+            buffer.flush()
+        
+        payload = {
+            "is_new": is_new,
+            "values": values,
+            "delete": delete,
+        }
+        #procedo a inviare il record
+        url = ""
+        if self.token != "":
+            url = self.base_url + f'?action=detail_save&token={self.token}&db={self.dbname}&tablename={tablename}'
+        else:
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+        response= self._request("POST", url, json=payload, idempotent=not is_new and not delete)
+        if response.status_code == 200:
+            values= self.codec.loads(response.content)
+            if values["error"] == True:
+                self.error_code = values["error_code"]
+                self.error_message = values["error_message"]
+                return None
+            else:
+                self._after_write(tablename)
+                return values
+    #------------------------------------------------------------
+    def save_records(self,tablename: str,values: List[Dict[str, Any]],dbname: str ="",token:str="") -> Optional[dict]:
+        """
+        Save multiple records in a table.
+
+        This function calls the ``table_save`` endpoint to persist multiple
+        rows in the specified table. Each record must include a valid ``gguid``.
+        The function supports inserting or updating records; deletions are
+        possible by specifying the ``delete`` field in the payload (not
+        currently exposed in this wrapper).
+
+        Parameters
+        ----------
+        tablename : str
+            Name of the table where the records belong.
+        values : list of dict
+            A list of dictionaries representing the records to save.
+            Each dictionary must include a non-empty ``gguid``.
+        dbname : str, optional
+            Database name. If provided, overrides the stored value.
+            Default is ``""``.
+        token : str, optional
+            Authentication token. If provided, overrides the stored value.
+            Default is ``""``.
+
+        Returns
+        -------
+        dict or None
+            The server response containing the saved records if successful.
+            Returns ``None`` if authentication fails, the request fails,
+            or an error occurs.
+
+        Side Effects
+        ------------
+        - Updates ``self.dbname`` and/or ``self.token`` if provided.
+        - Updates ``self.error_code`` and ``self.error_message`` on failure.
+
+        Raises
+        ------
+        None directly, but sets error state in attributes if:
+        - Any record does not include a valid ``gguid``.
+        - Authentication or permissions fail.
+        - The server reports an error.
+
+        Examples
+        --------
+        Save multiple records:
+        >>> client = MyClient(token="abc123", dbname="mydb")
+        >>> rows = [
+        ...     {"gguid": "gguid-1", "name": "Alice"},
+        ...     {"gguid": "gguid-2", "name": "Bob"}
+        ... ]
+        >>> result = client.save_records("customers", rows)
+        >>> isinstance(result, dict)
+        True
+
+        Attempt to save without gguid:
+        >>> rows = [{"gguid": "", "name": "Invalid"}]
+        >>> result = client.save_records("customers", rows)
+        None
+        """
+        self.reset_error()
+
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+        #se il gguid di una riga è vuoto non salvo i record
+        for row in values:
+            if row.get("gguid") == "" or row.get("gguid") == None:
+                self.error_code = "E1" 
+                self.error_message = "The record's gguid is not defined"
+                return None
+        self._flush_write_behind(tablename)
+        payload = {
+            "rows": values
+        }
+        url = ""
+        if self.token != "":
+            url = self.base_url + f'?action=table_save&token={self.token}&db={self.dbname}&tablename={tablename}'
+        else:
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+        response= self._request("POST", url, json=payload)
+        if response.status_code == 200:
+            values= self.codec.loads(response.content)
+            if values["error"] == True:
+                self.error_code = values["error_code"]
+                self.error_message = values["error_message"]
+                return None
+            else:
+                self._after_write(tablename)
+                return values
+    #------------------------------------------------------------
+    def save_records_batch(self,tablename: str,rows: List[Dict[str, Any]],dbname: str ="",token:str="",
+                           chunk_size:int=500,max_bytes:int=1048576,max_workers:int=4) -> Optional[dict]:
+        """
+        Save a large number of records in concurrent ``table_save`` batches.
+
+        Every row is validated (it must include a non-empty ``gguid``) and
+        serialized once; valid rows are then grouped in chunks holding at
+        most ``chunk_size`` rows and ``max_bytes`` bytes of JSON body, and
+        the chunks are sent concurrently on ``max_workers`` threads.
+
+        Parameters
+        ----------
+        tablename : str
+            Name of the table where the records belong.
+        rows : list of dict
+            The records to save. Each dictionary must include a non-empty ``gguid``.
+        dbname : str, optional
+            Database name. If provided, overrides the stored value. Default ``""``.
+        token : str, optional
+            Authentication token. If provided, overrides the stored value. Default ``""``.
+        chunk_size : int, optional
+            Maximum number of rows per request. Default 500.
+        max_bytes : int, optional
+            Maximum size in bytes of the JSON body of a request. A single row
+            bigger than this limit is sent alone. Default 1 MiB.
+        max_workers : int, optional
+            Maximum number of requests in flight. Default 4.
+
+        Returns
+        -------
+        dict or None
+            A summary dictionary with:
+            - ``saved`` (int): number of rows saved.
+            - ``failed`` (int): number of rows not saved.
+            - ``chunks`` (list of dict): one entry per request with ``index``,
+              ``rows`` (indexes in ``rows``), ``ok``, ``error_code``,
+              ``error_message`` and the server ``result``. A chunk whose
+              response cannot be decoded fails with ``E13``: its rows may
+              have been saved by the server.
+            - ``errors`` (dict): ``{row_index: {"error_code": ..., "error_message": ...}}``
+              for every row not saved.
+            Returns ``None`` if the token is missing.
+
+        Side Effects
+        ------------
+        - Updates ``self.dbname`` and/or ``self.token`` if provided.
+        - Sets ``self.error_code`` to ``E14`` if at least one row failed; the
+          message lists the failed chunks.
+
+        Examples
+        --------
+        >>> client = MyClient(token="abc123", dbname="mydb")
+        >>> rows = [{"gguid": str(uuid.uuid4()), "name": f"row {i}"} for i in range(100000)]
+        >>> summary = client.save_records_batch("customers", rows, chunk_size=1000, max_workers=8)
+        >>> summary["saved"], summary["failed"]
+        (100000, 0)
+        """
+        self.reset_error()
+
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+
+        if self.token != "":
+            url = self.base_url + f'?action=table_save&token={self.token}&db={self.dbname}&tablename={tablename}'
+        else:
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+        self._flush_write_behind(tablename)
+
+        errors = {}
+        chunks = []
+        indexes = []
+        parts = []
+        envelope = len(b'{"rows":[]}')
+        size = envelope
+        for i, row in enumerate(rows):
+            if row.get("gguid") == "" or row.get("gguid") == None:
+                errors[i] = {"error_code": "E1", "error_message": "The record's gguid is not defined"}
+                continue
+            part = self.codec.dumps(row)
+            if indexes and (len(indexes) >= chunk_size or size + len(part) + 1 > max_bytes):
+                chunks.append((indexes, parts))
+                indexes = []
+                parts = []
+                size = envelope
+            indexes.append(i)
+            parts.append(part)
+            size += len(part) + 1
+        if indexes:
+            chunks.append((indexes, parts))
+
+        def send_chunk(chunk):
+            body = b'{"rows":[' + b",".join(chunk[1]) + b']}'
+            try:
+                return self._fetch("POST", url, "E13", data=body, headers={"Content-Type": "application/json"})
+            except requests.RequestException as e:
+                return None, "F1", str(e)
+            except Exception as e:
+                #malformed response (non-JSON body, unexpected envelope): only this chunk fails
+                return None, "E13", f"Invalid response: {e.__class__.__name__}: {e}"
+
+        summary = []
+        saved = 0
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            for n, (chunk, (result, code, message)) in enumerate(zip(chunks, executor.map(send_chunk, chunks))):
+                summary.append({"index": n, "rows": chunk[0], "ok": result is not None,
+                                "error_code": code, "error_message": message, "result": result})
+                if result is None:
+                    for i in chunk[0]:
+                        errors[i] = {"error_code": code, "error_message": message}
+                else:
+                    saved += len(chunk[0])
+
+        if saved > 0:
+            self._after_write(tablename)
+        if errors:
+            failed = [str(chunk["index"]) for chunk in summary if not chunk["ok"]]
+            self.error_code = "E14"
+            self.error_message = f"{len(errors)} of {len(rows)} records could not be saved"
+            if failed:
+                self.error_message += f" (failed chunks: {', '.join(failed)})"
+        return {"saved": saved, "failed": len(errors), "chunks": summary, "errors": errors}
+    #------------------------------------------------------------
+    def create_data_file(self,filename:str,gguidrif:str="") -> tuple[str, str]:
+        """
+        Create the JSON payload for saving file metadata.
+
+        This function prepares the data structure needed to register a file
+        in the system. It normalizes the file name (removing any directory path),
+        ensures a unique identifier (``gguidfile``) is set, and returns both
+        the identifier and the serialized JSON body.
+
+        Parameters
+        ----------
+        filename : str
+            The full path or name of the file. The path will be stripped and only
+            the base filename will be used.
+        gguidrif : str, optional
+            The unique identifier for the file. If not provided, a new UUID
+            will be generated. Default is an empty string.
+
+        Returns
+        -------
+        tuple of (str, str)
+            A tuple containing:
+            - ``gguidfile`` (str): The file's unique identifier.
+            - ``body`` (str): The JSON string with the file metadata, including
+            ``gguidfile`` and ``nomefile``.
+
+        Examples
+        --------
+        Generate a payload for a new file:
+        >>> gguid, body = client.create_data_file("C:/docs/report.pdf")
+        >>> gguid
+        '550e8400-e29b-41d4-a716-446655440000'
+        >>> body
+        '{"gguidfile": "550e8400-e29b-41d4-a716-446655440000", "nomefile": "report.pdf"}'
+
+        Use an existing gguid:
+        >>> gguid, body = client.create_data_file("image.png", gguidrif="custom-123")
+        >>> gguid
+        'custom-123'
+        >>> body
+        '{"gguidfile": "custom-123", "nomefile": "image.png"}'
+        """
+        onlyfilename = os.path.basename(filename)
+        if gguidrif == "":
+            gguidrif = str(uuid.uuid4())
+        d1 = {
+            "gguidfile": gguidrif,
+            "nomefile": onlyfilename
+        }        
+        body = json.dumps(d1)
+        return gguidrif,body
+    #------------------------------------------------------------
+    def download_file(self,path:str,gguidrif:str,tablename:str, dbname: str ="",token:str="",
+                      chunk_size:int=1048576,checksum:str="",resume_attempts:int=3,progress:Any=None,
+                      throttle:Any=None) -> bool:
+        """
+        Download a file from the server and save it locally.
+
+        This function calls the ``file_download`` endpoint to retrieve the content
+        of a file associated with a record (e.g., FILE or IMAGE fields) and writes
+        it to the specified local path. The server returns the raw file content,
+        not JSON.
+
+        The content is written to ``<path>.part`` and renamed to ``path`` only
+        once complete and verified, so ``path`` never holds a partial file or
+        an error page. If the connection drops, the download resumes with an
+        HTTP ``Range`` request from the bytes already received (also across
+        calls, from a leftover ``.part`` file). Resuming requires the ``ETag``
+        or ``Last-Modified`` of the first response, kept in
+        ``<path>.part.validator`` and sent as ``If-Range``: when the file
+        changed on the server, the server answers with the whole content and
+        the download starts over instead of splicing two versions together.
+
+        Parameters
+        ----------
+        path : str
+            Local path where the downloaded file will be saved.
+        gguidrif : str
+            The unique identifier (gguid) of the file to download.
+        tablename : str
+            The name of the table containing the file reference.
+        dbname : str, optional
+            The name of the database containing the table. If provided, it overrides
+            the stored value. Default is ``""``.
+        token : str, optional
+            Authentication token. If provided, it overrides the stored value.
+            Default is ``""``.
+        chunk_size : int, optional
+            Size in bytes of the chunks read from the connection. Default 1 MiB.
+        checksum : str, optional
+            Expected checksum as ``"<algorithm>:<hex digest>"`` (e.g.
+            ``"sha256:9f86d0..."``), with an algorithm of ``hashlib``. If
+            omitted, a ``Content-MD5`` or ``Digest`` header sent by the server
+            is verified when present.
+        resume_attempts : int, optional
+            Number of times an interrupted download is resumed. Default 3.
+        progress : callable, optional
+            Called after every chunk as ``progress(received_bytes, total_bytes)``;
+            ``total_bytes`` is ``None`` if unknown.
+        throttle : callable, optional
+            Called as ``throttle(chunk_size)`` before every chunk is read, and
+            with the negative difference when a shorter chunk arrives; it may
+            block to pace the download.
+
+        Returns
+        -------
+        bool
+            ``True`` if the file was downloaded and saved successfully,
+            ``False`` otherwise.
+
+        Side Effects
+        ------------
+        - Updates ``self.dbname`` and/or ``self.token`` if provided.
+        - Updates ``self.error_code`` and ``self.error_message`` on failure.
+        - Writes the file to disk at the specified ``path``.
+        - Sets ``self.last_transfer`` to ``{"bytes", "seconds", "bytes_per_second",
+          "resumed_from", "cached"}`` after a successful download.
+        - With a ``file_cache``, serves the file from the cache when present and
+          stores it there after a download.
+
+        Raises
+        ------
+        None directly, but sets error state in attributes if:
+        - Token is missing.
+        - ``checksum`` is malformed or names an unknown algorithm (``F6``).
+        - The request fails (``F1``) or the server answers with an HTTP
+          status other than 200/206 (``F3``).
+        - The size or the checksum of the file does not match (``F4``).
+        - The file cannot be saved (``F2``).
+
+        Notes
+        -----
+        The endpoint also supports optional parameters not used here:
+        - ``thumb``: if set to 1, downloads the image thumbnail.
+        - ``filename``: optional name to assign to the downloaded file.
+        - ``exiftran``: if set to 1, applies lossless EXIF-based rotation.
+
+        Examples
+        --------
+        Download a file and save it locally:
+        >>> client = MyClient(token="abc123", dbname="mydb")
+        >>> success = client.download_file("report.pdf", "gguid-12345", "documents")
+        >>> success
+        True
+
+        Attempt without token:
+        >>> client = MyClient()
+        >>> success = client.download_file("output.png", "gguid-67890", "images")
+        >>> success
+        False
+        """
+        self.reset_error()
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token        
+
+        url = ""
+        if self.token != "":
+            url = self.file_url + f'?action=file_download&token={self.token}&db={self.dbname}&tablename={tablename}&gguid={gguidrif}'
+        else:
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return False
+        algorithm, expected = "", ""
+        if checksum != "":
+            algorithm, _, expected = checksum.partition(":")
+            algorithm = algorithm.lower()
+            try:
+                valid = not algorithm.startswith("shake") and len(bytes.fromhex(expected)) == hashlib.new(algorithm).digest_size
+            except ValueError:
+                valid = False
+            if not valid:
+                self.error_code = "F6"
+                self.error_message = f"Invalid checksum {checksum!r}: expected '<algorithm>:<hex digest>'"
+                return False
+        started = time.monotonic()
+        if self.file_cache is not None and self.file_cache.get(self.dbname, tablename, gguidrif, path, checksum):
+            self.last_transfer = {"bytes": 0, "seconds": time.monotonic() - started,
+                                  "bytes_per_second": 0.0, "resumed_from": 0, "cached": True}
+            return True
+        part = f"{path}.part"
+        #ETag or Last-Modified of the content in the .part file, sent as If-Range
+        tag = f"{part}.validator"
+        validator = ""
+        received = 0
+        if os.path.exists(part):
+            try:
+                with open(tag, "r", encoding="utf-8") as f:
+                    validator = f.read().strip()
+            except OSError:
+                validator = ""
+            #without a validator the leftover content may belong to another version
+            received = os.path.getsize(part) if validator != "" else 0
+        resumed_from = received
+        digest = None
+        total = None
+        attempts = 0
+        try:
+            while True:
+                headers = {"Accept-Encoding": "identity"}
+                if received > 0:
+                    headers["Range"] = f"bytes={received}-"
+                    headers["If-Range"] = validator
+                try:
+                    response = self._request("GET", url, stream=True, headers=headers)
+                    status = response.status_code
+                    content_range = response.headers.get("Content-Range", "")
+                    if status == 416 and received > 0:
+                        #nothing after the bytes already received: complete if the size matches
+                        response.close()
+                        size = content_range.rpartition("/")[2]
+                        if size.isdigit() and int(size) == received:
+                            total = received
+                            break
+                        received = resumed_from = 0
+                        digest = None
+                        continue
+                    if status == 206 and content_range[6:].partition("-")[0] != str(received):
+                        #not the range asked for: start over
+                        response.close()
+                        received = resumed_from = 0
+                        digest = None
+                        continue
+                    if status not in (200, 206):
+                        self.error_code = "F3"
+                        self.error_message = f"HTTP {status}: {response.text[:500]}"
+                        response.close()
+                        return False
+                    #sizes and ranges of an encoded body do not match the decoded bytes written
+                    encoded = response.headers.get("Content-Encoding", "identity").lower() not in ("", "identity")
+                    if status == 200:
+                        #full content (first request, or the file changed since the .part was written)
+                        received = resumed_from = 0
+                        digest = None
+                        length = response.headers.get("Content-Length", "")
+                        total = int(length) if length.isdigit() and not encoded else None
+                        etag = response.headers.get("ETag", "")
+                        validator = etag if etag != "" and not etag.startswith("W/") else response.headers.get("Last-Modified", "")
+                        if encoded:
+                            validator = ""
+                        if validator != "":
+                            with open(tag, "w", encoding="utf-8") as f:
+                                f.write(validator)
+                        elif os.path.exists(tag):
+                            os.remove(tag)
+                    elif content_range.rpartition("/")[2].isdigit() and not encoded:
+                        total = int(content_range.rpartition("/")[2])
+                    if digest is None:
+                        if algorithm == "":
+                            try:
+                                if response.headers.get("Content-MD5"):
+                                    expected = base64.b64decode(response.headers["Content-MD5"], validate=True).hex()
+                                    algorithm = "md5"
+                                elif response.headers.get("Digest", "").lower().startswith("sha-256="):
+                                    expected = base64.b64decode(response.headers["Digest"][8:], validate=True).hex()
+                                    algorithm = "sha256"
+                            except ValueError:
+                                #malformed header: nothing to verify against
+                                pass
+                        digest = hashlib.new(algorithm) if algorithm != "" else None
+                        if digest is not None and received > 0:
+                            with open(part, "rb") as f:
+                                for block in iter(lambda: f.read(chunk_size), b""):
+                                    digest.update(block)
+                    with open(part, "ab" if received > 0 else "wb") as f:
+                        chunks = response.iter_content(chunk_size=chunk_size)
+                        while True:
+                            if throttle is not None:
+                                throttle(chunk_size)
+                            chunk = next(chunks, None)
+                            if throttle is not None and len(chunk or b"") < chunk_size:
+                                throttle(len(chunk or b"") - chunk_size)
+                            if chunk is None:
+                                break
+                            if chunk:  # ignora keep-alive chunks
+                                f.write(chunk)
+                                received += len(chunk)
+                                if digest is not None:
+                                    digest.update(chunk)
+                                if progress is not None:
+                                    progress(received, total)
+                    break
+                except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError):
+                    #resume from what was written
+                    attempts += 1
+                    if attempts > resume_attempts:
+                        raise
+                    received = os.path.getsize(part) if validator != "" and os.path.exists(part) else 0
+                    digest = None
+            if total is not None and received != total:
+                self.error_code = "F4"
+                self.error_message = f"Size mismatch: received {received} of {total} bytes"
+                return False
+            if digest is None and algorithm != "":
+                #completed by a previous call (416): verify what is on disk
+                digest = hashlib.new(algorithm)
+                with open(part, "rb") as f:
+                    for block in iter(lambda: f.read(chunk_size), b""):
+                        digest.update(block)
+            if digest is not None and digest.hexdigest() != expected.lower():
+                os.remove(part)
+                if os.path.exists(tag):
+                    os.remove(tag)
+                self.error_code = "F4"
+                self.error_message = f"Checksum mismatch ({algorithm})"
+                return False
+            os.replace(part, path)
+            if os.path.exists(tag):
+                os.remove(tag)
+            if self.file_cache is not None:
+                try:
+                    self.file_cache.put(self.dbname, tablename, gguidrif, path)
+                except OSError:
+                    pass
+        except requests.RequestException as e:
+            self.error_code = "F1"
+            self.error_message = str(e)
+            return False
+        except OSError as e:
+            self.error_code = "F2"
+            self.error_message = str(e)
+            return False
+        seconds = time.monotonic() - started
+        self.last_transfer = {"bytes": received - resumed_from, "seconds": seconds,
+                              "bytes_per_second": (received - resumed_from) / seconds if seconds > 0 else 0.0,
+                              "resumed_from": resumed_from, "cached": False}
+        return True        
+
+    #------------------------------------------------------------
+    def upload_file(self,path:Any,is_image:bool,gguidrif:str,tablename:str, dbname: str ="",token:str="",
+                    chunk_size:int=1048576,progress:Any=None,timeout:Any=None,throttle:Any=None) -> bool:
+        """
+        Upload a file to the server.
+
+        This function calls the ``file_upload`` endpoint to send a file to the
+        synchronizer. The file can be associated with a record field of type
+        FILE or IMAGE. If a file with the same GGUID already exists, it will be
+        overwritten on the server.
+
+        The content is streamed in chunks of ``chunk_size`` bytes and is never
+        read entirely in memory.
+
+        Parameters
+        ----------
+        path : str, path-like, bytes-like or file object
+            Local path of the file to upload, or the content itself: an
+            in-memory buffer (``bytes``, ``bytearray``, ``memoryview``, sent
+            without copies) or any readable binary stream. Streams of unknown
+            size are sent with chunked transfer encoding and are not retried.
+        is_image : bool
+            Whether the file is an image. If ``True``, the server will attempt
+            to generate a thumbnail. If ``False``, the file is treated as a generic file.
+        gguidrif : str
+            The unique identifier (gguid) of the file, generated by the client.
+        tablename : str
+            The name of the table containing the file reference.
+        dbname : str, optional
+            The name of the database containing the table. If provided, it
+            overrides the stored value. Default is ``""``.
+        token : str, optional
+            Authentication token. If provided, it overrides the stored value.
+            Default is ``""``.
+        chunk_size : int, optional
+            Size in bytes of the chunks read and sent. Default 1 MiB.
+        progress : callable, optional
+            Called after every chunk as ``progress(sent_bytes, total_bytes)``;
+            ``total_bytes`` is ``None`` if the size is unknown.
+        timeout : float or tuple, optional
+            Request timeout. Default ``(10, 30 + size / 256 KiB)`` seconds, so
+            that it grows with the size of the upload.
+        throttle : callable, optional
+            Called as ``throttle(n)`` with the size of every chunk before it is
+            read and sent; it may block to pace the upload.
+
+        Returns
+        -------
+        bool
+            ``True`` if the file was uploaded successfully, ``False`` otherwise.
+
+        Side Effects
+        ------------
+        - Updates ``self.dbname`` and/or ``self.token`` if provided.
+        - Updates ``self.error_code`` and ``self.error_message`` on failure.
+        - Sends the file contents to the server over HTTP.
+        - Removes the record's file from the ``file_cache``, if any.
+
+        Raises
+        ------
+        None directly, but sets error state in attributes if:
+        - Token is missing.
+        - The request fails (HTTP errors, connection issues).
+        - The server rejects the file.
+        - The server answers with a non-JSON body (``F5``).
+
+        Notes
+        -----
+        According to the API:
+        - The request body is sent as multipart form data with keys:
+        ``gguid_X``, ``file_X``, ``type_X``, and optional ``args_X``.
+        - If ``type_X`` is ``image``, the synchronizer may create a thumbnail.
+        - If the file already exists with the same GGUID, it will be overwritten.
+        - Error ``limit_reached`` indicates the database has reached its file limit.
+
+        Examples
+        --------
+        Upload an image:
+        >>> client = MyClient(token="abc123", dbname="mydb")
+        >>> success = client.upload_file("photo.png", is_image=True, gguidrif="gguid-123", tablename="images")
+        >>> success
+        True
+
+        Upload a generic file:
+        >>> success = client.upload_file("document.pdf", is_image=False, gguidrif="gguid-456", tablename="files")
+        >>> success
+        True
+
+        Upload an in-memory buffer with progress reporting:
+        >>> success = client.upload_file(pdf_bytes, False, "gguid-789", "files",
+        ...                               progress=lambda sent, total: print(sent, total))
+        """
+        self.reset_error()
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token        
+
+        type = "image"
+        if is_image == False:
+            type = "file"
+
+        url = ""
+        if self.token != "":
+            url = self.file_url + f'?action=file_upload&token={self.token}&db={self.dbname}&tablename={tablename}&gguid={gguidrif}&type={type}'
+        else:
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return False
+
+        opened = None
+        try:
+            if isinstance(path, (str, os.PathLike)):
+                opened = open(path, "rb")
+                path = opened
+            stream = UploadStream(path, chunk_size=chunk_size, progress=progress, throttle=throttle)
+            data = stream if stream.size is not None else iter(stream)
+            if timeout is None:
+                timeout = (10, 30 + (stream.size or 0) / 262144)
+            resp = self._request("POST", url, data=data, headers={"Content-Type": "application/octet-stream"}, timeout=timeout)
+            resp.raise_for_status()
+
+            valori = self.codec.loads(resp.content)
+            ok = valori.get("result") != "KO"
+            if ok and self.file_cache is not None:
+                self.file_cache.invalidate(self.dbname, tablename, gguidrif)
+            return ok
+        except requests.RequestException as e:
+            self.error_code = "F1"
+            self.error_message = str(e)
+            return False
+        except OSError as e:
+            self.error_code = "F2"
+            self.error_message = str(e)
+            return False
+        except ValueError:
+            # JSON non valido
+            self.error_code = "F5"
+            self.error_message = f"Response non-JSON: {resp.text[:500]}"
+            return False
+        finally:
+            if opened is not None:
+                opened.close()
+        return True
+        
+    #------------------------------------------------------------
+    def sync(self,dbname: str ="",token:str="",partial_from:int=0):
+        """
+        Force synchronization of the database with the Syncone server.
+
+        This function calls the ``sync`` endpoint to synchronize the local
+        database with the remote server. Synchronization may be full or
+        partial, depending on server response. The function returns the
+        synchronization metadata provided by the server.
+
+        Parameters
+        ----------
+        dbname : str, optional
+            Name of the database to synchronize. If provided, overrides the stored
+            value. Default is ``""``.
+        token : str, optional
+            Authentication token. If provided, overrides the stored value.
+            Default is ``""``.
+        partial_from : int, optional
+            Index from which a partial synchronization continues, as returned
+            by the previous call in ``sync.partial_from``. Default ``0``.
+
+        Returns
+        -------
+        dict or None
+            A dictionary containing synchronization metadata if successful:
+            - ``sync`` (dict):
+                - ``partial`` (bool): Whether partial synchronization is required.
+                - ``partial_from`` (int): The next index to use for continuing partial sync (if ``partial`` is True).
+                - ``partial_total`` (int): Total number of records expected in the partial sync (if ``partial`` is True).
+            - ``sync_last_tid`` (int): TID of the last completed synchronization.
+            - ``sync_first`` (bool): Whether this was the first synchronization.
+            Returns ``None`` if authentication fails, the request fails, or an error occurs.
+
+        Side Effects
+        ------------
+        - Updates ``self.dbname`` and/or ``self.token`` if provided.
+        - Updates ``self.error_code`` and ``self.error_message`` on failure.
+
+        Raises
+        ------
+        None directly, but sets error state in attributes if:
+        - Token is missing.
+        - The request fails (HTTP errors, connection issues).
+        - The server reports an error.
+
+        Examples
+        --------
+        Full sync:
+        >>> client = MyClient(token="abc123", dbname="mydb")
+        >>> result = client.sync()
+        >>> isinstance(result, dict)
+        True
+
+        Handling partial sync:
+        >>> sync_info = client.sync("mydb", "abc123")
+        >>> if sync_info and sync_info["sync"].get("partial"):
+        ...     print("Partial sync, continue from:", sync_info["sync"]["partial_from"])
+        """
+        self.reset_error()
+
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+
+        if self.token != "":
+            url = self.base_url + f'?action=sync&token={self.token}&db={self.dbname}'
+        else:
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+        if partial_from > 0:
+            url += f'&partial_from={partial_from}'
+        response= self._request("GET", url)
+        if response.status_code == 200:
+            values= self.codec.loads(response.content)
+            if values["error"] == True:
+                self.error_code = values["error_code"]
+                self.error_message = values["error_message"]
+                return None
+            else:
+                return values
+    #------------------------------------------------------------
+    def _sync_loop(self,dbname:str,token:str,deadline:Optional[float],interval:float,max_backoff:float,
+                   progress:Any,max_stalls:int=10) -> tuple[Optional[dict], str, str]:
+        """
+        Call the sync endpoint until the synchronization is complete and
+        return ``(values, error_code, error_message)``; the caller stores the
+        outcome, as the loop is shared with ``SyncScheduler``.
+        """
+        started = time.monotonic()
+        partial_from = 0
+        delay = interval
+        stalls = 0
+        while True:
+            url = self.base_url + f'?action=sync&token={token}&db={dbname}'
+            if partial_from > 0:
+                url += f'&partial_from={partial_from}'
+            try:
+                values, code, message = self._fetch("GET", url, "E15")
+            except requests.RequestException as e:
+                return None, "F1", str(e)
+            if values is None:
+                return None, code, message
+            info = values.get("sync") or {}
+            if progress is not None:
+                progress(info.get("partial_from", 0), info.get("partial_total", 0), values)
+            if not info.get("partial"):
+                return values, "", ""
+            #no progress since the last call: back off, otherwise continue at the base interval
+            if info.get("partial_from", 0) > partial_from:
+                delay = interval
+                stalls = 0
+            else:
+                delay = min(max_backoff, max(delay * 2, 0.5))
+                stalls += 1
+                if max_stalls > 0 and stalls >= max_stalls:
+                    return values, "SY2", "Sync is not progressing"
+            partial_from = info.get("partial_from", 0)
+            if deadline is not None and time.monotonic() - started + delay > deadline:
+                return values, "SY1", "Sync deadline exceeded"
+            if delay > 0:
+                time.sleep(delay)
+    #------------------------------------------------------------
+    def sync_until_complete(self,dbname: str ="",token:str="",deadline:Optional[float]=None,
+                            interval:float=0,max_backoff:float=30,progress:Any=None,
+                            background:bool=False,max_stalls:int=10) -> Union[Optional[dict], Future]:
+        """
+        Call ``sync`` repeatedly until a partial synchronization is complete.
+
+        While the server answers with ``sync.partial`` set, the endpoint is
+        called again from ``sync.partial_from``. Calls follow each other after
+        ``interval`` seconds while ``partial_from`` advances; when it does not,
+        the delay doubles up to ``max_backoff``, and after ``max_stalls``
+        consecutive calls without progress the loop gives up, so a server
+        repeating the same ``partial_from`` cannot keep it running forever.
+        Transient HTTP failures are retried by the client retry policy.
+
+        Parameters
+        ----------
+        dbname : str, optional
+            Name of the database to synchronize. If provided, overrides the stored
+            value. Default is ``""``.
+        token : str, optional
+            Authentication token. If provided, overrides the stored value.
+            Default is ``""``.
+        deadline : float, optional
+            Maximum duration in seconds. When it would be exceeded the loop stops
+            with error ``SY1`` and the last metadata. Default ``None`` (no limit).
+        interval : float, optional
+            Delay in seconds between calls while the sync progresses. Default 0.
+        max_backoff : float, optional
+            Maximum delay in seconds when the sync does not progress. Default 30.
+        progress : callable, optional
+            Called after every call as ``progress(partial_from, partial_total, values)``.
+        background : bool, optional
+            If ``True``, run the loop in a background thread and return a
+            ``concurrent.futures.Future`` resolving to ``(values, error_code,
+            error_message)``, ``values`` being what the foreground call would
+            return; the client error state is not touched. Default ``False``.
+        max_stalls : int, optional
+            Number of consecutive calls in which ``partial_from`` does not
+            advance after which the loop stops with error ``SY2`` and the last
+            metadata. ``0`` disables the check. Default 10.
+
+        Returns
+        -------
+        dict, None or Future
+            The metadata of the last ``sync`` call once ``partial`` is false
+            (or when ``SY1``/``SY2`` stopped the loop), ``None`` on failure,
+            or a ``Future`` if ``background`` is set.
+
+        Side Effects
+        ------------
+        - Updates ``self.dbname`` and/or ``self.token`` if provided.
+        - Updates ``self.error_code`` and ``self.error_message`` on failure
+          (foreground only).
+
+        Examples
+        --------
+        >>> client = MyClient(token="abc123", dbname="mydb")
+        >>> result = client.sync_until_complete(deadline=600,
+        ...     progress=lambda done, total, values: print(f"{done}/{total}"))
+
+        Without blocking the caller:
+        >>> future = client.sync_until_complete(background=True)
+        >>> save_more_records()
+        >>> values, error_code, error_message = future.result()
+        """
+        self.reset_error()
+
+        if dbname != "":
+            self.dbname = dbname
+        if token != "":
+            self.token = token
+
+        if self.token == "":
+            self.error_code = "TK1"
+            self.error_message = "Token missing"
+            return None
+
+        if background:
+            future = Future()
+            dbname = self.dbname
+            token = self.token
+
+            def run():
+                if future.set_running_or_notify_cancel():
+                    try:
+                        values, code, message = self._sync_loop(dbname, token, deadline, interval, max_backoff,
+                                                                progress, max_stalls)
+                        if code not in ("", "SY1", "SY2"):
+                            values = None
+                        future.set_result((values, code, message))
+                    except BaseException as e:
+                        future.set_exception(e)
+
+            threading.Thread(target=run, daemon=True).start()
+            return future
+
+        values, self.error_code, self.error_message = self._sync_loop(self.dbname, self.token, deadline, interval,
+                                                                      max_backoff, progress, max_stalls)
+        if self.error_code not in ("", "SY1", "SY2"):
+            return None
+        return values
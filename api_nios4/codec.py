@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*- 
+#================================================================================
+#Copyright of Davide Sbreviglieri 2024
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+#DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+#FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+#DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+#SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+#CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+#OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE
+#================================================================================
+#JSON CODEC
+#================================================================================
+from __future__ import annotations
+
+from typing import Any, Union
+from datetime import datetime,date
+from decimal import Decimal
+import json
+import uuid
+import re
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+#Decimal placeholder: the random tag keeps user strings from matching it
+_DECIMAL_TAG = f"decimal-{uuid.uuid4().hex}:"
+_DECIMAL_PLACEHOLDER = re.compile(rb'"\\u0000' + _DECIMAL_TAG.encode("ascii") + rb'(-?[0-9]+(?:\.[0-9]+)?)\\u0000"')
+
+class JsonCodec:
+    #--------------------------------------------------------
+    def __init__(self,backend:str="auto"):
+        """
+        Initialize the JSON codec used for request bodies and responses.
+
+        The fastest installed backend is used (``orjson``, then ``ujson``,
+        then the standard ``json`` module). ``Decimal`` values are encoded as
+        JSON numbers in plain notation, keeping every digit (a float would
+        round amounts such as ``Decimal("0.10000000000000000001")``), and
+        ``datetime``/``date`` values as TIDs (``YYYYMMDDHHMMSS`` integers, as
+        ``normalize_date`` does), so callers do not need to convert them
+        before saving.
+
+        Parameters
+        ----------
+        backend : str, optional
+            ``"auto"``, ``"orjson"``, ``"ujson"`` or ``"json"``. Default ``"auto"``.
+
+        Raises
+        ------
+        ImportError
+            If the requested backend is not installed.
+
+        Examples
+        --------
+        >>> codec = JsonCodec()
+        >>> codec.dumps({"amount": Decimal("12.50"), "day": date(2025, 9, 30)})
+        b'{"amount":12.50,"day":20250930000000}'
+        """
+        if backend == "auto":
+            backend = "orjson" if orjson is not None else "ujson" if ujson is not None else "json"
+        if backend == "orjson" and orjson is None or backend == "ujson" and ujson is None:
+            raise ImportError(f"The {backend} package is not installed")
+        if backend not in ("orjson", "ujson", "json"):
+            raise ValueError(f"Unknown JSON backend {backend!r}")
+        self.backend = backend
+    #--------------------------------------------------------
+    @staticmethod
+    def default(value:Any) -> Any:
+        """
+        Encode the values the JSON backends do not support natively.
+        """
+        if isinstance(value, Decimal):
+            if not value.is_finite():
+                raise ValueError(f"{value} is not a valid JSON number")
+            #placeholder string, replaced by the bare digits in dumps
+            return f"\x00{_DECIMAL_TAG}{value:f}\x00"
+        if isinstance(value, (datetime, date)):
+            return int(value.strftime("%Y%m%d%H%M%S"))
+        if np is not None and isinstance(value, np.generic):
+            return value.item()
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    #--------------------------------------------------------
+    @classmethod
+    def _mark_decimals(cls,value:Any) -> Any:
+        #ujson encodes Decimal as a float by itself, without calling default
+        if isinstance(value, Decimal):
+            return cls.default(value)
+        if isinstance(value, dict):
+            return {k: cls._mark_decimals(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [cls._mark_decimals(v) for v in value]
+        return value
+    #--------------------------------------------------------
+    @staticmethod
+    def _unmark_decimals(data:bytes) -> bytes:
+        #every backend escapes the NUL of the placeholders as \u0000
+        if _DECIMAL_TAG.encode("ascii") not in data:
+            return data
+        return _DECIMAL_PLACEHOLDER.sub(rb"\1", data)
+    #--------------------------------------------------------
+    def dumps(self,value:Any) -> bytes:
+        """
+        Serialize ``value`` to UTF-8 JSON bytes.
+        """
+        if self.backend == "orjson":
+            data = orjson.dumps(value, default=self.default,
+                                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        elif self.backend == "ujson":
+            data = ujson.dumps(self._mark_decimals(value), default=self.default, ensure_ascii=False).encode("utf-8")
+        else:
+            data = json.dumps(value, default=self.default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return self._unmark_decimals(data)
+    #--------------------------------------------------------
+    def loads(self,data:Union[bytes, str]) -> Any:
+        """
+        Deserialize JSON bytes or text.
+        """
+        if self.backend == "orjson":
+            return orjson.loads(data)
+        if self.backend == "ujson":
+            return ujson.loads(data)
+        return json.loads(data)
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*- 
+#================================================================================
+#Copyright of Davide Sbreviglieri 2024
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+#DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+#FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+#DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+#SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+#CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+#OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE
+#================================================================================
+#RECORD COERCION
+#================================================================================
+from __future__ import annotations
+
+from typing import Optional, Dict, Any, List, TYPE_CHECKING
+from decimal import Decimal
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if TYPE_CHECKING:
+    from .client import api_nios4
+
+class RecordCoercer:
+    #--------------------------------------------------------
+    def __init__(self,client:api_nios4,fields:List[Dict[str, Any]],name_key:str="fieldname",
+                 type_key:str="fieldtype",type_map:Optional[Dict[Any, str]]=None):
+        """
+        Compile a per-table converter from the output of ``fields_info``.
+
+        For every field a converter function equivalent to
+        ``client.check_value(value, format)`` is chosen once, so converting a
+        batch costs one function call per cell instead of a chain of format
+        comparisons. Fields whose type is not one of ``text``,
+        ``decimalnumber``, ``integernumber`` or ``date`` (after ``type_map``)
+        and keys not described by ``fields`` are left untouched.
+
+        Parameters
+        ----------
+        client : api_nios4
+            Client providing ``normalize_date``.
+        fields : list of dict
+            Field descriptions as returned by ``fields_info``.
+        name_key : str, optional
+            Key holding the field name. Default ``"fieldname"``.
+        type_key : str, optional
+            Key holding the field type. Default ``"fieldtype"``.
+        type_map : dict, optional
+            Mapping from server field types to ``check_value`` formats, for
+            types whose name differs.
+
+        Examples
+        --------
+        >>> coercer = client.record_coercer("customers")
+        >>> coercer.coerce_rows([{"gguid": "g1", "amount": "12.5", "born": "1990-01-31"}])
+        [{'gguid': 'g1', 'amount': 12.5, 'born': 19900131000000}]
+        """
+        normalize_date = client.normalize_date
+
+        def to_text(value):
+            return "" if value is None else str(value)
+
+        def to_decimal(value):
+            if value is None or value == "":
+                return 0
+            if type(value) is float:
+                return value
+            return float(Decimal(value))
+
+        def to_integer(value):
+            if value is None or value == "":
+                return 0
+            if type(value) is int:
+                return value
+            return int(float(value))
+
+        def to_date(value):
+            if value is None or value == "":
+                return 0
+            return normalize_date(value)
+
+        converters = {"text": to_text, "decimalnumber": to_decimal,
+                      "integernumber": to_integer, "date": to_date}
+        type_map = type_map or {}
+        self.formats = {}
+        self.converters = {}
+        for field in fields:
+            format = type_map.get(field.get(type_key), field.get(type_key))
+            if format in converters:
+                self.formats[field[name_key]] = format
+                self.converters[field[name_key]] = converters[format]
+    #--------------------------------------------------------
+    def coerce_rows(self,rows:List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Convert a list of records, returning new dictionaries.
+        """
+        converters = self.converters
+        result = []
+        for row in rows:
+            out = dict(row)
+            for name, value in row.items():
+                convert = converters.get(name)
+                if convert is not None:
+                    out[name] = convert(value)
+            result.append(out)
+        return result
+    #--------------------------------------------------------
+    def coerce_columns(self,columns:Dict[str, List[Any]],as_numpy:bool=False) -> Dict[str, Any]:
+        """
+        Convert columnar data ``{fieldname: [values...]}``.
+
+        Numeric NumPy arrays in decimal and integer columns are converted in a
+        single vectorized step. With ``as_numpy`` (NumPy required) decimal,
+        integer and date columns are returned as ``float64``/``int64`` arrays;
+        the other columns are returned as lists.
+        """
+        if as_numpy and np is None:
+            raise ImportError("as_numpy requires the numpy package (pip install numpy)")
+        result = {}
+        for name, values in columns.items():
+            convert = self.converters.get(name)
+            if convert is None:
+                result[name] = values
+                continue
+            format = self.formats[name]
+            if np is not None and isinstance(values, np.ndarray) and values.dtype.kind in "fiu":
+                #numeric arrays have no empty values: convert the whole column at once
+                if format == "decimalnumber":
+                    values = values.astype(np.float64)
+                    result[name] = values if as_numpy else values.tolist()
+                    continue
+                if format == "integernumber":
+                    values = values.astype(np.int64)
+                    result[name] = values if as_numpy else values.tolist()
+                    continue
+            converted = [convert(value) for value in values]
+            if as_numpy and format == "decimalnumber":
+                result[name] = np.asarray(converted, dtype=np.float64)
+            elif as_numpy and format in ("integernumber", "date"):
+                result[name] = np.asarray(converted, dtype=np.int64)
+            else:
+                result[name] = converted
+        return result
+    #--------------------------------------------------------
+    def columns_to_rows(self,columns:Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Turn columnar data into a list of records ready for ``save_records``.
+        NumPy arrays are converted back to Python scalars.
+        """
+        names = list(columns)
+        lists = [values.tolist() if np is not None and isinstance(values, np.ndarray) else values
+                 for values in columns.values()]
+        return [dict(zip(names, row)) for row in zip(*lists)]
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*- 
+#================================================================================
+#Copyright of Davide Sbreviglieri 2024
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+#DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+#FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+#DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+#SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+#CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+#OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE
+#================================================================================
+#METRICS
+#================================================================================
+from __future__ import annotations
+
+from typing import Optional
+import threading
+import time
+
+class RequestMetrics:
+    #upper bounds in seconds of the latency histogram buckets
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+    #--------------------------------------------------------
+    def __init__(self,buckets:Optional[tuple]=None,namespace:str="nios4"):
+        """
+        Initialize an in-memory aggregator of request metrics.
+
+        ``record`` is an ``after`` hook (see ``api_nios4.add_hook``): every
+        request updates per-action counters (requests, errors, retries, bytes
+        sent and received) and a latency histogram, from which ``snapshot``
+        estimates p50/p95/p99 and throughput. Memory is constant per action.
+        ``to_prometheus`` and ``to_otlp`` export the same data in the
+        Prometheus text format and the OpenTelemetry OTLP/JSON format. The
+        aggregator is thread-safe and can be shared by several clients.
+
+        Parameters
+        ----------
+        buckets : tuple of float, optional
+            Upper bounds in seconds of the histogram buckets. Default ``BUCKETS``.
+        namespace : str, optional
+            Prefix of the exported metric names. Default ``"nios4"``.
+
+        Examples
+        --------
+        >>> metrics = RequestMetrics()
+        >>> client = api_nios4(token="abc123", metrics=metrics)
+        >>> client.find_records("customers", "mydb")
+        >>> metrics.snapshot()["model"]["p95"]
+        0.182
+        >>> print(metrics.to_prometheus())
+        """
+        self.buckets = tuple(sorted(buckets)) if buckets else self.BUCKETS
+        self.namespace = namespace
+        self._actions = {}
+        self._started = time.time()
+        self._lock = threading.Lock()
+    #--------------------------------------------------------
+    def record(self,event:dict):
+        """
+        Add a finished request (an ``after`` hook event) to the aggregates.
+        """
+        duration = event.get("duration") or 0.0
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if duration <= bound:
+                index = i
+                break
+        status = event.get("status")
+        with self._lock:
+            stats = self._actions.get(event.get("action", ""))
+            if stats is None:
+                stats = {"count": 0, "errors": 0, "retries": 0, "bytes_sent": 0, "bytes_received": 0,
+                         "sum": 0.0, "max": 0.0, "buckets": [0] * (len(self.buckets) + 1)}
+                self._actions[event.get("action", "")] = stats
+            stats["count"] += 1
+            if event.get("error") or status is None or status >= 400:
+                stats["errors"] += 1
+            stats["retries"] += event.get("retries") or 0
+            stats["bytes_sent"] += event.get("bytes_sent") or 0
+            stats["bytes_received"] += event.get("bytes_received") or 0
+            stats["sum"] += duration
+            stats["max"] = max(stats["max"], duration)
+            stats["buckets"][index] += 1
+    #--------------------------------------------------------
+    def _quantile(self,stats:dict,q:float) -> float:
+        #linear interpolation inside the bucket holding the q-th request
+        rank = q * stats["count"]
+        seen = 0
+        lower = 0.0
+        for i, count in enumerate(stats["buckets"]):
+            upper = self.buckets[i] if i < len(self.buckets) else max(stats["max"], lower)
+            if count and seen + count >= rank:
+                return min(lower + (upper - lower) * (rank - seen) / count, stats["max"])
+            seen += count
+            lower = upper
+        return stats["max"]
+    #--------------------------------------------------------
+    def snapshot(self) -> dict:
+        """
+        Return ``{action: {"count", "errors", "retries", "bytes_sent",
+        "bytes_received", "mean", "p50", "p95", "p99", "max",
+        "requests_per_second", "bytes_per_second"}}``. Latencies are in
+        seconds, percentiles are estimated from the histogram and throughput
+        is averaged since the creation (or last ``reset``) of the aggregator.
+        """
+        with self._lock:
+            elapsed = max(time.time() - self._started, 1e-9)
+            result = {}
+            for action, stats in self._actions.items():
+                result[action] = {
+                    "count": stats["count"],
+                    "errors": stats["errors"],
+                    "retries": stats["retries"],
+                    "bytes_sent": stats["bytes_sent"],
+                    "bytes_received": stats["bytes_received"],
+                    "mean": stats["sum"] / stats["count"],
+                    "p50": self._quantile(stats, 0.50),
+                    "p95": self._quantile(stats, 0.95),
+                    "p99": self._quantile(stats, 0.99),
+                    "max": stats["max"],
+                    "requests_per_second": stats["count"] / elapsed,
+                    "bytes_per_second": (stats["bytes_sent"] + stats["bytes_received"]) / elapsed,
+                }
+            return result
+    #--------------------------------------------------------
+    def reset(self):
+        """
+        Clear all the aggregates.
+        """
+        with self._lock:
+            self._actions = {}
+            self._started = time.time()
+    #--------------------------------------------------------
+    def to_prometheus(self) -> str:
+        """
+        Return the metrics in the Prometheus text exposition format.
+        """
+        ns = self.namespace
+        counters = (("requests_total", "count", "Requests sent to the web service."),
+                    ("request_errors_total", "errors", "Requests failed or answered with HTTP >= 400."),
+                    ("request_retries_total", "retries", "Retried attempts."),
+                    ("request_sent_bytes_total", "bytes_sent", "Request body bytes sent."),
+                    ("request_received_bytes_total", "bytes_received", "Response body bytes received."))
+        with self._lock:
+            actions = {action: {**stats, "buckets": list(stats["buckets"])} for action, stats in self._actions.items()}
+        lines = [f"# HELP {ns}_request_duration_seconds Duration of web service requests, retries included.",
+                 f"# TYPE {ns}_request_duration_seconds histogram"]
+        for action, stats in sorted(actions.items()):
+            cumulative = 0
+            for i, count in enumerate(stats["buckets"]):
+                cumulative += count
+                le = repr(float(self.buckets[i])) if i < len(self.buckets) else "+Inf"
+                lines.append(f'{ns}_request_duration_seconds_bucket{{action="{action}",le="{le}"}} {cumulative}')
+            lines.append(f'{ns}_request_duration_seconds_sum{{action="{action}"}} {stats["sum"]}')
+            lines.append(f'{ns}_request_duration_seconds_count{{action="{action}"}} {stats["count"]}')
+        for name, key, text in counters:
+            lines.append(f"# HELP {ns}_{name} {text}")
+            lines.append(f"# TYPE {ns}_{name} counter")
+            for action, stats in sorted(actions.items()):
+                lines.append(f'{ns}_{name}{{action="{action}"}} {stats[key]}')
+        return "\n".join(lines) + "\n"
+    #--------------------------------------------------------
+    def to_otlp(self) -> dict:
+        """
+        Return the metrics as an OpenTelemetry OTLP/JSON ``ExportMetricsServiceRequest``
+        (cumulative temporality), ready to be posted to a collector's
+        ``/v1/metrics`` endpoint.
+        """
+        with self._lock:
+            actions = {action: {**stats, "buckets": list(stats["buckets"])} for action, stats in self._actions.items()}
+            start = str(int(self._started * 1e9))
+        now = str(time.time_ns())
+        def points(key):
+            return [{"attributes": [{"key": "action", "value": {"stringValue": action}}],
+                     "startTimeUnixNano": start, "timeUnixNano": now, "asInt": str(stats[key])}
+                    for action, stats in sorted(actions.items())]
+        histogram = [{"attributes": [{"key": "action", "value": {"stringValue": action}}],
+                      "startTimeUnixNano": start, "timeUnixNano": now,
+                      "count": str(stats["count"]), "sum": stats["sum"], "max": stats["max"],
+                      "bucketCounts": [str(count) for count in stats["buckets"]],
+                      "explicitBounds": list(self.buckets)}
+                     for action, stats in sorted(actions.items())]
+        metrics = [{"name": f"{self.namespace}.request.duration", "unit": "s",
+                    "histogram": {"aggregationTemporality": 2, "dataPoints": histogram}}]
+        for name, key, unit in (("requests", "count", "1"), ("request.errors", "errors", "1"),
+                                ("request.retries", "retries", "1"), ("request.sent", "bytes_sent", "By"),
+                                ("request.received", "bytes_received", "By")):
+            metrics.append({"name": f"{self.namespace}.{name}", "unit": unit,
+                            "sum": {"aggregationTemporality": 2, "isMonotonic": True, "dataPoints": points(key)}})
+        return {"resourceMetrics": [{"resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "api_nios4"}}]},
+                                     "scopeMetrics": [{"scope": {"name": "api_nios4"}, "metrics": metrics}]}]}
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*- 
+#================================================================================
+#Copyright of Davide Sbreviglieri 2024
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+#DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+#FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+#DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+#SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+#CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+#OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE
+#================================================================================
+#CLIENT POOL
+#================================================================================
+from __future__ import annotations
+
+import requests
+from typing import Optional, Any, List
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+from .transport import Nios4Transport
+from .codec import JsonCodec
+from .caches import MetadataCache
+from .retry import RetryPolicy
+from .client import api_nios4
+
+class ClientPool:
+    #--------------------------------------------------------
+    def __init__(self,transport:Any=None,metadata_cache:Optional[MetadataCache]=None,max_workers:int=8,
+                 base_url:str="",file_url:str="",auth_factory:Any=None,**client_kwargs):
+        """
+        Initialize a pool of clients serving many tenant databases.
+
+        Every tenant gets its own ``api_nios4`` client (own token, dbname and
+        error state), but all the clients share one ``Nios4Transport``
+        (connection pool), one ``MetadataCache``, one ``JsonCodec`` and one
+        ``RetryPolicy``. ``fan_out`` runs the same operation on many tenants
+        in parallel and aggregates the results.
+
+        Parameters
+        ----------
+        transport : Nios4Transport, optional
+            Shared transport. Default ``Nios4Transport(pool_maxsize=max_workers)``.
+        metadata_cache : MetadataCache, optional
+            Shared schema cache (entries are keyed by dbname). Default ``MetadataCache()``.
+        max_workers : int, optional
+            Number of tenants processed in parallel by ``fan_out``. Default 8.
+        base_url : str, optional
+            Web service URL of the clients, if not the default one.
+        file_url : str, optional
+            Synchronizer URL of the clients, if not the default one.
+        auth_factory : callable, optional
+            Called without arguments for every tenant to build its own
+            ``TokenManager`` (e.g. ``lambda: TokenManager(ttl=3600)``). A
+            single ``auth`` cannot be shared: its single-flight renewal would
+            hand the token of a tenant to another one.
+        **client_kwargs
+            Other ``api_nios4`` arguments shared by every client (``codec``,
+            ``retry``, ``limiter``, ``metrics``, ``file_cache``...).
+
+        Raises
+        ------
+        ValueError
+            If ``auth`` is passed in ``client_kwargs``.
+
+        Examples
+        --------
+        >>> pool = ClientPool(max_workers=16)
+        >>> for dbname in dbnames:
+        ...     pool.add_tenant(dbname, dbname=dbname, token="abc123")
+        >>> result = pool.fan_out("find_records", "customers", fields_search=["city"], value_search="Rome")
+        >>> sum(len(rows) for rows in result["results"].values()), result["errors"]
+        (1250, {})
+        """
+        if "auth" in client_kwargs:
+            raise ValueError("ClientPool cannot share one TokenManager between tenants: use auth_factory")
+        self.transport = transport if transport is not None else Nios4Transport(pool_maxsize=max_workers)
+        self.metadata_cache = metadata_cache if metadata_cache is not None else MetadataCache()
+        self.max_workers = max(1, max_workers)
+        self.base_url = base_url
+        self.file_url = file_url
+        self.auth_factory = auth_factory
+        client_kwargs.setdefault("codec", JsonCodec())
+        client_kwargs.setdefault("retry", RetryPolicy(max_attempts=1))
+        self.client_kwargs = client_kwargs
+        self.clients = {}
+        self._lock = threading.Lock()
+    #--------------------------------------------------------
+    def add_tenant(self,name:str,dbname:str="",token:str="",username:str="",password:str="") -> api_nios4:
+        """
+        Create (or replace) the client of tenant ``name`` and return it.
+        ``dbname`` defaults to ``name``.
+        """
+        auth = self.auth_factory() if self.auth_factory is not None else None
+        client = api_nios4(token=token, username=username, password=password, transport=self.transport,
+                           metadata_cache=self.metadata_cache, dbname=dbname or name, auth=auth, **self.client_kwargs)
+        if self.base_url != "":
+            client.base_url = self.base_url
+        if self.file_url != "":
+            client.file_url = self.file_url
+        with self._lock:
+            self.clients[name] = client
+        return client
+    #--------------------------------------------------------
+    def remove_tenant(self,name:str):
+        """
+        Forget tenant ``name``, flushing its write-behind buffers and syncs.
+        The shared transport stays open.
+        """
+        with self._lock:
+            client = self.clients.pop(name, None)
+        if client is not None:
+            for buffer in list(client.write_behind.values()):
+                buffer.close()
+            if client.sync_scheduler is not None:
+                client.sync_scheduler.close()
+    #--------------------------------------------------------
+    def __getitem__(self,name:str) -> api_nios4:
+        return self.clients[name]
+    #--------------------------------------------------------
+    def __contains__(self,name:str) -> bool:
+        return name in self.clients
+    #--------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.clients)
+    #--------------------------------------------------------
+    def tenants(self) -> List[str]:
+        """
+        Return the tenant names, in insertion order.
+        """
+        with self._lock:
+            return list(self.clients)
+    #--------------------------------------------------------
+    def fan_out(self,operation:Any,*args,tenants:Optional[List[str]]=None,**kwargs) -> dict:
+        """
+        Run an operation on many tenants in parallel.
+
+        Parameters
+        ----------
+        operation : str or callable
+            Name of an ``api_nios4`` method (called as
+            ``client.<operation>(*args, **kwargs)``) or a callable invoked as
+            ``operation(client, *args, **kwargs)``.
+        *args, **kwargs
+            Arguments of the operation.
+        tenants : list of str, optional
+            Tenants to run on. Default: all of them.
+
+        Returns
+        -------
+        dict
+            ``{"results": {tenant: value}, "errors": {tenant: {"error_code",
+            "error_message"}}, "seconds"}``. A tenant is in ``errors`` when its
+            client reports an error code after the call, when the request
+            failed (``F1``), when the call raised (``CP1``, e.g. a non-JSON
+            response) or when the tenant is unknown (``CP2``), otherwise its
+            return value is in ``results``.
+        """
+        names = self.tenants() if tenants is None else list(tenants)
+        def run(name):
+            with self._lock:
+                client = self.clients.get(name)
+            if client is None:
+                return name, None, "CP2", "Unknown tenant"
+            try:
+                if isinstance(operation, str):
+                    value = getattr(client, operation)(*args, **kwargs)
+                else:
+                    value = operation(client, *args, **kwargs)
+            except requests.RequestException as e:
+                return name, None, "F1", str(e)
+            except Exception as e:
+                #non-JSON body, unexpected envelope: only this tenant fails
+                return name, None, "CP1", f"{e.__class__.__name__}: {e}"
+            return name, value, client.error_code, client.error_message
+        started = time.monotonic()
+        results = {}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, max(1, len(names)))) as executor:
+            for name, value, code, message in executor.map(run, names):
+                if code != "":
+                    errors[name] = {"error_code": code, "error_message": message}
+                else:
+                    results[name] = value
+        return {"results": results, "errors": errors, "seconds": time.monotonic() - started}
+    #--------------------------------------------------------
+    def login_all(self,tenants:Optional[List[str]]=None) -> dict:
+        """
+        Log every tenant in, in parallel (see ``fan_out``).
+        """
+        return self.fan_out("login", tenants=tenants)
+    #--------------------------------------------------------
+    def close(self):
+        """
+        Flush every tenant and close the shared transport.
+        """
+        for name in self.tenants():
+            self.remove_tenant(name)
+        close = getattr(self.transport, "close", None)
+        if close is not None:
+            close()
+    #--------------------------------------------------------
+    def __enter__(self):
+        return self
+    #--------------------------------------------------------
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
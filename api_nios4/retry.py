@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*- 
+#================================================================================
+#Copyright of Davide Sbreviglieri 2024
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+#DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+#FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+#DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+#SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+#CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+#OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE
+#================================================================================
+#RETRY POLICY AND LIMITER
+#================================================================================
+from __future__ import annotations
+
+from typing import Optional
+import threading
+import random
+import time
+
+class RetryPolicy:
+    #--------------------------------------------------------
+    def __init__(self,max_attempts:int=3,backoff:float=0.5,max_backoff:float=30,jitter:bool=True,
+                 retry_statuses:tuple=(429, 500, 502, 503, 504),budget_ratio:float=0.2,
+                 budget_min:float=10,budget_max:float=100):
+        """
+        Initialize the retry policy for transient HTTP failures.
+
+        Failed attempts (retryable status codes, timeouts, connection errors)
+        are retried with exponential backoff and full jitter. Requests that are
+        not idempotent (``detail_delete``, ``table_save``, ``save_record`` with
+        ``is_new`` or ``delete``) are only retried when the server cannot have
+        processed them: the connection could not be established or the server answered
+        ``429``. A retry budget bounds the extra load during outages: every
+        request deposits ``budget_ratio`` tokens, every retry withdraws one.
+        The policy is thread-safe and can be shared by several clients.
+
+        Parameters
+        ----------
+        max_attempts : int, optional
+            Maximum number of attempts per request (``1`` disables retries). Default 3.
+        backoff : float, optional
+            Base delay in seconds, doubled at every attempt. Default 0.5.
+        max_backoff : float, optional
+            Maximum delay in seconds. Default 30.
+        jitter : bool, optional
+            Randomize each delay between 0 and its exponential value. Default ``True``.
+        retry_statuses : tuple of int, optional
+            HTTP status codes considered transient. Default ``(429, 500, 502, 503, 504)``.
+        budget_ratio : float, optional
+            Retry tokens earned per request. Default 0.2 (about 20% extra load).
+        budget_min : float, optional
+            Initial retry tokens. Default 10.
+        budget_max : float, optional
+            Maximum retry tokens. Default 100.
+
+        Examples
+        --------
+        >>> client = api_nios4(token="abc123", retry=RetryPolicy(max_attempts=5, backoff=0.2))
+        >>> client.find_records("customers", "mydb")
+        >>> client.retry.stats()["retries"]
+        0
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses = set(retry_statuses)
+        self.budget_ratio = budget_ratio
+        self.budget_max = budget_max
+        self.requests = 0
+        self.retries = 0
+        self.recovered = 0
+        self.exhausted = 0
+        self.budget_denied = 0
+        self.retries_by_action = {}
+        self._tokens = budget_min
+        self._lock = threading.Lock()
+    #--------------------------------------------------------
+    def delay(self,attempt:int,retry_after:Optional[str]=None) -> float:
+        """
+        Return the delay in seconds before retrying after ``attempt`` failed
+        attempts, honouring a ``Retry-After`` header in seconds if given.
+        """
+        delay = min(self.max_backoff, self.backoff * (2 ** (attempt - 1)))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        if retry_after:
+            try:
+                delay = max(delay, min(self.max_backoff, float(retry_after)))
+            except ValueError:
+                pass
+        return delay
+    #--------------------------------------------------------
+    def start(self):
+        """
+        Record a new request and deposit its retry tokens.
+        """
+        with self._lock:
+            self.requests += 1
+            self._tokens = min(self.budget_max, self._tokens + self.budget_ratio)
+    #--------------------------------------------------------
+    def acquire(self,action:str) -> bool:
+        """
+        Withdraw a retry token. Returns ``False`` if the budget is exhausted.
+        """
+        with self._lock:
+            if self._tokens < 1:
+                self.budget_denied += 1
+                return False
+            self._tokens -= 1
+            self.retries += 1
+            self.retries_by_action[action] = self.retries_by_action.get(action, 0) + 1
+            return True
+    #--------------------------------------------------------
+    def finish(self,attempts:int,ok:bool):
+        """
+        Record the outcome of a request that needed ``attempts`` attempts.
+        """
+        if attempts <= 1:
+            return
+        with self._lock:
+            if ok:
+                self.recovered += 1
+            else:
+                self.exhausted += 1
+    #--------------------------------------------------------
+    def stats(self) -> dict:
+        """
+        Return the retry counters for monitoring.
+        """
+        with self._lock:
+            return {"requests": self.requests, "retries": self.retries, "recovered": self.recovered,
+                    "exhausted": self.exhausted, "budget_denied": self.budget_denied,
+                    "budget": self._tokens, "retries_by_action": dict(self.retries_by_action)}
+
+class AdaptiveLimiter:
+    #--------------------------------------------------------
+    def __init__(self,rate:float=0,burst:int=10,initial_concurrency:int=8,min_concurrency:int=1,
+                 max_concurrency:int=64,latency_target:float=1.0,decrease_factor:float=0.5):
+        """
+        Initialize a client-side rate limiter and adaptive concurrency governor.
+
+        Requests first take a token from a token bucket refilled at ``rate``
+        requests per second (disabled when ``rate`` is ``0``), then wait for a
+        free slot among ``limit`` concurrent requests. ``limit`` follows an
+        AIMD rule: it grows by ``1/limit`` after every response faster than
+        ``latency_target`` (about +1 per round of requests) and is multiplied
+        by ``decrease_factor`` when the server throttles or fails (HTTP 429,
+        5xx, timeouts, connection errors), at most once per round trip. The
+        limiter is thread-safe and shared by all the threads using a client.
+
+        Parameters
+        ----------
+        rate : float, optional
+            Maximum requests per second, ``0`` for no rate limit. Default 0.
+        burst : int, optional
+            Bucket size, i.e. requests allowed in a burst. Default 10.
+        initial_concurrency : int, optional
+            Initial number of concurrent requests. Default 8.
+        min_concurrency : int, optional
+            Lower bound of the concurrency limit. Default 1.
+        max_concurrency : int, optional
+            Upper bound of the concurrency limit. Default 64.
+        latency_target : float, optional
+            Response time in seconds considered healthy. Default 1.0.
+        decrease_factor : float, optional
+            Multiplicative decrease applied on throttling. Default 0.5.
+
+        Examples
+        --------
+        >>> limiter = AdaptiveLimiter(rate=50, burst=20, max_concurrency=32)
+        >>> client = api_nios4(token="abc123", limiter=limiter)
+        >>> with ThreadPoolExecutor(64) as pool:
+        ...     list(pool.map(lambda g: client.get_record("customers", g), gguids))
+        >>> limiter.stats()["limit"]
+        17.4
+        """
+        self.rate = rate
+        self.burst = burst
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.limit = float(min(max(initial_concurrency, self.min_concurrency), self.max_concurrency))
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self.throttled = 0
+        self.increases = 0
+        self.decreases = 0
+        self.waits = 0
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._decreased = 0.0
+        self._cond = threading.Condition()
+    #--------------------------------------------------------
+    def acquire(self):
+        """
+        Block until the rate limit and the concurrency limit allow a request.
+        """
+        if self.rate > 0:
+            while True:
+                with self._cond:
+                    now = time.monotonic()
+                    self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+                    self._refilled = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        break
+                    wait = (1 - self._tokens) / self.rate
+                    self.waits += 1
+                time.sleep(wait)
+        with self._cond:
+            if self.in_flight >= int(self.limit):
+                self.waits += 1
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+    #--------------------------------------------------------
+    def release(self,latency:float,throttled:bool=False):
+        """
+        Free a slot and adapt the concurrency limit to the outcome of the
+        request (``latency`` in seconds, ``throttled`` if the server pushed back).
+        """
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if throttled:
+                self.throttled += 1
+                if now - self._decreased >= latency:
+                    self.limit = max(self.min_concurrency, self.limit * self.decrease_factor)
+                    self._decreased = now
+                    self.decreases += 1
+            elif latency <= self.latency_target and self.limit < self.max_concurrency:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+                self.increases += 1
+            self._cond.notify_all()
+    #--------------------------------------------------------
+    def stats(self) -> dict:
+        """
+        Return the current limit and the limiter counters.
+        """
+        with self._cond:
+            return {"limit": round(self.limit, 2), "in_flight": self.in_flight, "rate": self.rate,
+                    "throttled": self.throttled, "increases": self.increases,
+                    "decreases": self.decreases, "waits": self.waits}
@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*- 
+#================================================================================
+#Copyright of Davide Sbreviglieri 2024
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+#DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+#FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+#DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+#SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+#CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+#OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE
+#================================================================================
+#FILE TRANSFERS
+#================================================================================
+from __future__ import annotations
+
+from typing import Optional, Any, List, Union, Iterator, TYPE_CHECKING
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import copy
+import time
+import json
+import os
+
+if TYPE_CHECKING:
+    from .client import api_nios4
+
+class UploadStream:
+    #--------------------------------------------------------
+    def __init__(self,source:Any,size:Optional[int]=None,chunk_size:int=1048576,progress:Any=None,throttle:Any=None):
+        """
+        Wrap a readable source as a request body sent in chunks.
+
+        ``source`` is a bytes-like object (read through a ``memoryview``,
+        without copies) or a binary file object. ``len()`` gives the
+        ``Content-Length`` when the size is known, ``seek(0)`` rewinds to the
+        initial position so that a retried request sends the whole body
+        again, ``throttle(n)`` is called before every chunk is read and
+        ``progress(sent, total)`` after it.
+
+        Parameters
+        ----------
+        source : bytes-like or file object
+            The data to send.
+        size : int, optional
+            Number of bytes to send. Computed from the source when omitted.
+        chunk_size : int, optional
+            Size in bytes of the chunks read from the source. Default 1 MiB.
+        progress : callable, optional
+            Called as ``progress(sent, total)``; ``total`` is ``None`` if unknown.
+        throttle : callable, optional
+            Called as ``throttle(n)`` with the size of the next chunk before it
+            is read; it may block to pace the upload.
+        """
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.throttle = throttle
+        self.sent = 0
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self._view = memoryview(source).cast("B")
+            self._file = None
+            self._start = 0
+            self.size = len(self._view) if size is None else size
+        else:
+            self._view = None
+            self._file = source
+            self._start = source.tell() if source.seekable() else None
+            if size is None and self._start is not None:
+                size = source.seek(0, os.SEEK_END) - self._start
+                source.seek(self._start)
+            self.size = size
+    #--------------------------------------------------------
+    def __len__(self) -> int:
+        return self.size
+    #--------------------------------------------------------
+    def read(self,n:int=-1) -> Union[bytes, memoryview]:
+        """
+        Return the next chunk (at most ``chunk_size`` bytes), empty at the end.
+        """
+        remaining = self.size - self.sent if self.size is not None else self.chunk_size
+        n = min(self.chunk_size, remaining)
+        if n <= 0:
+            return b""
+        if self.throttle is not None:
+            self.throttle(n)
+        if self._view is not None:
+            chunk = self._view[self.sent:self.sent + n]
+        else:
+            chunk = self._file.read(n)
+        self.sent += len(chunk)
+        if self.progress is not None and len(chunk):
+            self.progress(self.sent, self.size)
+        return chunk
+    #--------------------------------------------------------
+    def __iter__(self) -> Iterator[Union[bytes, memoryview]]:
+        while True:
+            chunk = self.read()
+            if not len(chunk):
+                return
+            yield chunk
+    #--------------------------------------------------------
+    def seekable(self) -> bool:
+        return self._view is not None or self._start is not None
+    #--------------------------------------------------------
+    def seek(self,offset:int,whence:int=os.SEEK_SET) -> int:
+        """
+        Rewind to the beginning of the body (the only supported position).
+        """
+        if offset != 0 or whence != os.SEEK_SET or not self.seekable():
+            raise OSError("UploadStream can only be rewound to its start")
+        if self._file is not None:
+            self._file.seek(self._start)
+        self.sent = 0
+        return 0
+
+class TransferManager:
+    #: error codes of upload_file/download_file worth another attempt
+    RETRY_CODES = ("F1", "F3", "F4")
+    #--------------------------------------------------------
+    def __init__(self,client:api_nios4,max_workers:int=4,retries:int=2,max_bytes_per_second:float=0,
+                 chunk_size:int=1048576,progress:Any=None):
+        """
+        Initialize a manager running many file transfers in parallel.
+
+        ``upload`` and ``download`` take a list of ``(path, gguidrif, tablename)``
+        jobs and run them on a pool of ``max_workers`` threads sharing the
+        client's connection pool, retry policy and limiter. Each job runs on
+        a shallow copy of the client, so error state is per job. A job that
+        fails with a transient error (``RETRY_CODES``) is attempted again up
+        to ``retries`` times; downloads resume from the bytes already
+        received and file objects are rewound to their initial position
+        (a failed job reading a non-seekable stream is not retried). An
+        upload whose sent size differs from the size of its source fails
+        with ``F4``. ``max_bytes_per_second`` caps the total bandwidth of all
+        workers together: every chunk waits for its share of the budget
+        before it is read or sent.
+
+        Parameters
+        ----------
+        client : api_nios4
+            Client used for the transfers.
+        max_workers : int, optional
+            Number of transfers in flight. Default 4.
+        retries : int, optional
+            Extra attempts per failed job. Default 2.
+        max_bytes_per_second : float, optional
+            Overall bandwidth cap in bytes per second (``0`` disables it). Default 0.
+        chunk_size : int, optional
+            Size in bytes of the chunks sent or received. Default 1 MiB.
+        progress : callable, optional
+            Called as ``progress(done_jobs, total_jobs, transferred_bytes)``
+            after every chunk and every completed job.
+
+        Examples
+        --------
+        >>> client = api_nios4(token="abc123")
+        >>> manager = TransferManager(client, max_workers=8, max_bytes_per_second=10 * 1024 * 1024)
+        >>> manifest = manager.upload([("a.pdf", "gguid-1", "documents"),
+        ...                            ("b.pdf", "gguid-2", "documents")], dbname="mydb")
+        >>> len(manifest["succeeded"]), len(manifest["failed"])
+        (2, 0)
+        """
+        self.client = client
+        self.max_workers = max(1, max_workers)
+        self.retries = max(0, retries)
+        self.max_bytes_per_second = max_bytes_per_second
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self._lock = threading.Lock()
+        self._next = 0.0
+        self._done = 0
+        self._total = 0
+        self._bytes = 0
+    #--------------------------------------------------------
+    def upload(self,jobs:List[tuple],is_image:bool=False,dbname:str="",token:str="",manifest_path:str="") -> dict:
+        """
+        Upload ``(path, gguidrif, tablename)`` jobs in parallel and return the
+        manifest (see ``run``). A job can carry a fourth ``is_image`` element
+        overriding ``is_image``.
+        """
+        return self.run("upload", jobs, is_image, dbname, token, manifest_path)
+    #--------------------------------------------------------
+    def download(self,jobs:List[tuple],dbname:str="",token:str="",manifest_path:str="") -> dict:
+        """
+        Download ``(path, gguidrif, tablename)`` jobs in parallel and return
+        the manifest (see ``run``).
+        """
+        return self.run("download", jobs, False, dbname, token, manifest_path)
+    #--------------------------------------------------------
+    def run(self,direction:str,jobs:List[tuple],is_image:bool=False,dbname:str="",token:str="",
+            manifest_path:str="") -> dict:
+        """
+        Run the jobs and return the manifest.
+
+        Returns
+        -------
+        dict
+            ``{"direction", "succeeded", "failed", "bytes", "seconds",
+            "bytes_per_second"}``. ``succeeded`` and ``failed`` list one entry per
+            job, ``{"path", "gguidrif", "tablename", "ok", "attempts", "bytes",
+            "seconds", "error_code", "error_message"}``, in the order of
+            ``jobs`` (``path`` is ``None`` for in-memory uploads). If ``manifest_path`` is given the manifest is also
+            written there as JSON.
+        """
+        dbname = dbname or self.client.dbname
+        token = token or self.client.token
+        with self._lock:
+            self._done = 0
+            self._total = len(jobs)
+            self._bytes = 0
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            entries = list(executor.map(lambda job: self._transfer(direction, job, is_image, dbname, token), jobs))
+        seconds = time.monotonic() - started
+        total = sum(entry["bytes"] for entry in entries)
+        manifest = {
+            "direction": direction,
+            "succeeded": [entry for entry in entries if entry["ok"]],
+            "failed": [entry for entry in entries if not entry["ok"]],
+            "bytes": total,
+            "seconds": seconds,
+            "bytes_per_second": total / seconds if seconds > 0 else 0.0,
+        }
+        if manifest_path != "":
+            with open(manifest_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+        return manifest
+    #--------------------------------------------------------
+    def _throttle(self,nbytes:int):
+        #token bucket holding at most one chunk: called before a chunk is read
+        #or sent, it takes nbytes from the bucket and waits until they have
+        #accrued; a negative nbytes gives back what a short read did not use
+        if self.max_bytes_per_second <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._next = max(self._next, now - self.chunk_size / self.max_bytes_per_second)
+            self._next += nbytes / self.max_bytes_per_second
+            wait = self._next - now
+        if wait > 0:
+            time.sleep(wait)
+    #--------------------------------------------------------
+    def _report(self,nbytes:int=0,done:int=0):
+        with self._lock:
+            self._bytes += nbytes
+            self._done += done
+            state = (self._done, self._total, self._bytes)
+        if self.progress is not None:
+            self.progress(*state)
+    #--------------------------------------------------------
+    def _transfer(self,direction:str,job:tuple,is_image:bool,dbname:str,token:str) -> dict:
+        path, gguidrif, tablename = job[0], job[1], job[2]
+        if len(job) > 3:
+            is_image = job[3]
+        client = copy.copy(self.client)
+        position = [0]
+        def progress(current, total):
+            #current restarts from 0 when a request is retried
+            delta = current - position[0] if current >= position[0] else current
+            position[0] = current
+            self._report(delta)
+        transferred = 0
+        attempts = 0
+        ok = False
+        started = time.monotonic()
+        try:
+            #a file object is sent from its current position: every attempt starts there again
+            stream = None
+            origin = None
+            expected = None
+            if direction == "upload":
+                if isinstance(path, (str, os.PathLike)):
+                    expected = os.path.getsize(path) if os.path.isfile(path) else None
+                elif isinstance(path, (bytes, bytearray, memoryview)):
+                    expected = memoryview(path).nbytes
+                else:
+                    stream = path
+                    if path.seekable():
+                        origin = path.tell()
+                        expected = path.seek(0, os.SEEK_END) - origin
+                        path.seek(origin)
+            while True:
+                attempts += 1
+                position[0] = 0
+                if direction == "download" and os.path.exists(f"{path}.part"):
+                    position[0] = os.path.getsize(f"{path}.part")
+                start = position[0]
+                if direction == "upload":
+                    if stream is not None and attempts > 1:
+                        stream.seek(origin)
+                    ok = client.upload_file(path, is_image, gguidrif, tablename, dbname, token,
+                                            chunk_size=self.chunk_size, progress=progress, throttle=self._throttle)
+                    if ok and expected is not None and position[0] != expected:
+                        ok = False
+                        client.error_code = "F4"
+                        client.error_message = f"Uploaded {position[0]} bytes out of {expected}"
+                else:
+                    ok = client.download_file(path, gguidrif, tablename, dbname, token,
+                                              chunk_size=self.chunk_size, progress=progress, throttle=self._throttle)
+                transferred += max(0, position[0] - start)
+                if ok or attempts > self.retries or client.error_code not in self.RETRY_CODES:
+                    break
+                if stream is not None and origin is None:
+                    #the data already read from a non-seekable stream cannot be sent again
+                    break
+                if self.client.retry is not None:
+                    time.sleep(self.client.retry.delay(attempts))
+        except Exception as e:
+            #a failing job (progress hook, unreadable stream) must not lose the other jobs of the batch
+            ok = False
+            client.error_code = "TR1"
+            client.error_message = f"{e.__class__.__name__}: {e}"
+        self._report(done=1)
+        return {
+            "path": os.fspath(path) if isinstance(path, (str, os.PathLike)) else None,
+            "gguidrif": gguidrif,
+            "tablename": tablename,
+            "ok": bool(ok),
+            "attempts": attempts,
+            "bytes": transferred,
+            "seconds": time.monotonic() - started,
+            "error_code": client.error_code,
+            "error_message": client.error_message,
+        }
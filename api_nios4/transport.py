@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*- 
+#================================================================================
+#Copyright of Davide Sbreviglieri 2024
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+#DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+#FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+#DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+#SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+#CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+#OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE
+#================================================================================
+#TRANSPORT
+#================================================================================
+from __future__ import annotations
+
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Optional, Any
+
+class Nios4Transport:
+    #--------------------------------------------------------
+    def __init__(self,pool_connections:int=10,pool_maxsize:int=10,pool_block:bool=False,
+                 timeout:Any=None,session:Optional[requests.Session]=None):
+        """
+        Initialize a pooled keep-alive HTTP transport.
+
+        All the calls of ``api_nios4`` are routed through a single
+        ``requests.Session`` so that TCP/TLS connections to the web service
+        are reused instead of being opened again on every request.
+
+        Parameters
+        ----------
+        pool_connections : int, optional
+            Number of per-host connection pools kept alive (one for
+            ``web.nios4.com``, one for the file synchronizer, ...). Default 10.
+        pool_maxsize : int, optional
+            Maximum number of connections kept alive for each host. Default 10.
+        pool_block : bool, optional
+            If ``True``, callers wait for a free connection when ``pool_maxsize``
+            connections to the same host are busy instead of opening extra,
+            non-pooled ones. Default ``False``.
+        timeout : float or tuple, optional
+            Default timeout applied to every request, either a single value or a
+            ``(connect, read)`` tuple. ``None`` waits indefinitely. A ``timeout``
+            passed to ``request`` overrides it.
+        session : requests.Session, optional
+            Pre-configured session to use. If omitted a new one is created.
+
+        Examples
+        --------
+        >>> transport = Nios4Transport(pool_maxsize=32, timeout=(5, 60))
+        >>> client = api_nios4(token="abc123", transport=transport)
+        """
+        self.timeout = timeout
+        self.session = session if session is not None else requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections,pool_maxsize=pool_maxsize,pool_block=pool_block)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+    #--------------------------------------------------------
+    def request(self,method:str,url:str,**kwargs) -> requests.Response:
+        """
+        Send an HTTP request on the pooled session.
+
+        Any custom transport injected in ``api_nios4`` must expose this same
+        method and return an object behaving like ``requests.Response``
+        (``status_code``, ``text``, ``content``, ``json()``, ``iter_content()``).
+
+        Parameters
+        ----------
+        method : str
+            HTTP method (``"GET"``, ``"POST"``).
+        url : str
+            Full URL of the request.
+        **kwargs
+            Extra arguments forwarded to ``requests.Session.request``
+            (``json``, ``data``, ``headers``, ``stream``, ``timeout``...).
+
+        Returns
+        -------
+        requests.Response
+            The server response.
+        """
+        if "timeout" not in kwargs:
+            kwargs["timeout"] = self.timeout
+        return self.session.request(method, url, **kwargs)
+    #--------------------------------------------------------
+    def close(self):
+        """
+        Close the session and every pooled connection.
+        """
+        self.session.close()
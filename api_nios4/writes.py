@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*- 
+#================================================================================
+#Copyright of Davide Sbreviglieri 2024
+#THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+#DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+#FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+#DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+#SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+#CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+#OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+#OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE
+#================================================================================
+#WRITE SCHEDULING
+#================================================================================
+from __future__ import annotations
+
+import requests
+from typing import Optional, Dict, Any, List, TYPE_CHECKING
+from concurrent.futures import Future
+import threading
+import weakref
+import atexit
+import time
+
+if TYPE_CHECKING:
+    from .client import api_nios4
+
+class SyncScheduler:
+    #--------------------------------------------------------
+    def __init__(self,client:api_nios4,window:float=2.0,max_latency:float=20.0,sync_timeout:float=300.0):
+        """
+        Initialize a coalescing scheduler for ``sync`` calls.
+
+        Writes mark their database as dirty; a background thread calls the
+        sync endpoint (until a partial sync completes) once per dirty database
+        when no write happened for ``window`` seconds, or at the latest
+        ``max_latency`` seconds after the first pending write. Many writes
+        therefore cost a single sync instead of one each.
+
+        Parameters
+        ----------
+        client : api_nios4
+            Client used to call the sync endpoint.
+        window : float, optional
+            Quiet period in seconds after the last write. Default 2.0.
+        max_latency : float, optional
+            Maximum delay in seconds between the first pending write and its
+            sync. Default 20.0.
+        sync_timeout : float, optional
+            Maximum duration in seconds of one sync, partial syncs included;
+            a sync still incomplete after it is abandoned with ``SY1`` so the
+            other databases are not starved. Default 300.0.
+
+        Examples
+        --------
+        >>> client = api_nios4(token="abc123", sync_window=2, sync_max_latency=15)
+        >>> for record in records:
+        ...     client.save_record("orders", record)   # no sync per write
+        >>> client.sync_scheduler.flush()               # sync now and wait
+        """
+        self.client = client
+        self.window = window
+        self.max_latency = max(window, max_latency)
+        self.sync_timeout = sync_timeout
+        self.marks = 0
+        self.rejected = 0
+        self.syncs = 0
+        self.errors = {}
+        self._pending = {}
+        self._running = 0
+        self._closed = False
+        self._thread = None
+        self._cond = threading.Condition()
+    #--------------------------------------------------------
+    def mark_dirty(self,dbname:str,token:str) -> bool:
+        """
+        Record a write on ``dbname``; its sync is scheduled or postponed.
+
+        Returns ``False`` (and schedules nothing) once the scheduler is closed.
+        """
+        now = time.monotonic()
+        with self._cond:
+            if self._closed:
+                self.rejected += 1
+                return False
+            self.marks += 1
+            first = self._pending.get(dbname, (now, now, token))[0]
+            self._pending[dbname] = (first, now, token)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+            return True
+    #--------------------------------------------------------
+    def _due(self,now:float) -> tuple[List[tuple], Optional[float]]:
+        """
+        Split the pending databases into the ones to sync now and the time
+        to wait for the next one.
+        """
+        due = []
+        wait = None
+        for dbname, (first, last, token) in list(self._pending.items()):
+            at = min(last + self.window, first + self.max_latency)
+            if at <= now or self._closed:
+                due.append((dbname, token))
+                del self._pending[dbname]
+            elif wait is None or at - now < wait:
+                wait = at - now
+        return due, wait
+    #--------------------------------------------------------
+    def _run(self):
+        try:
+            while True:
+                with self._cond:
+                    due, wait = self._due(time.monotonic())
+                    while not due:
+                        if self._closed and not self._pending:
+                            return
+                        self._cond.wait(wait)
+                        due, wait = self._due(time.monotonic())
+                    self._running += len(due)
+                for dbname, token in due:
+                    try:
+                        values, code, message = self.client._sync_loop(dbname, token, self.sync_timeout, 0, 30, None)
+                    except Exception as e:
+                        code, message = "F1", f"{e.__class__.__name__}: {e}"
+                    with self._cond:
+                        self.syncs += 1
+                        if code != "":
+                            self.errors[dbname] = (code, message)
+                        else:
+                            self.errors.pop(dbname, None)
+                        self._running -= 1
+                        self._cond.notify_all()
+        finally:
+            #never leave flush()/close() waiting on a dead thread
+            with self._cond:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+                self._cond.notify_all()
+    #--------------------------------------------------------
+    def flush(self,timeout:Optional[float]=None) -> bool:
+        """
+        Sync every dirty database now and wait until done.
+
+        Returns ``False`` if ``timeout`` seconds elapsed first.
+        """
+        with self._cond:
+            for dbname, (first, last, token) in self._pending.items():
+                self._pending[dbname] = (first - self.max_latency, last - self.window, token)
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self._pending and self._running == 0, timeout)
+    #--------------------------------------------------------
+    def close(self,timeout:Optional[float]=None):
+        """
+        Sync the pending databases and stop the background thread.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: self._thread is None, timeout)
+    #--------------------------------------------------------
+    def stats(self) -> dict:
+        """
+        Return the number of writes recorded, writes rejected after ``close``,
+        syncs performed and databases waiting, plus the last error of each
+        database.
+        """
+        with self._cond:
+            return {"marks": self.marks, "rejected": self.rejected, "syncs": self.syncs,
+                    "pending": len(self._pending), "errors": dict(self.errors)}
+
+_WRITE_BEHIND_BUFFERS = weakref.WeakSet()
+
+@atexit.register
+def _flush_write_behind_buffers():
+    #flush the records still buffered when the interpreter exits
+    for buffer in list(_WRITE_BEHIND_BUFFERS):
+        try:
+            buffer.close()
+        except Exception:
+            pass
+
+class WriteBehindBuffer:
+    #--------------------------------------------------------
+    def __init__(self,client:api_nios4,tablename:str,dbname:str,token:str,max_rows:int=500,max_delay:float=1.0):
+        """
+        Initialize a write-behind buffer for one table.
+
+        Records added with ``add`` are sent together in a single ``table_save``
+        request when ``max_rows`` records are buffered or ``max_delay``
+        seconds after the oldest one, whichever comes first. Records with the
+        same gguid in a batch are merged, the latest values winning. Each
+        ``add`` returns a ``Future`` resolved with the response of its batch,
+        or with an ``{"error": True, "error_code": ..., "error_message": ...}``
+        dictionary on failure. Use ``api_nios4.enable_write_behind`` to create
+        one.
+
+        Parameters
+        ----------
+        client : api_nios4
+            Client used to send the batches.
+        tablename : str
+            Name of the table.
+        dbname : str
+            Database name.
+        token : str
+            Authentication token.
+        max_rows : int, optional
+            Number of buffered records triggering a flush. Default 500.
+        max_delay : float, optional
+            Maximum time in seconds a record waits in the buffer. Default 1.0.
+        """
+        self.client = client
+        self.tablename = tablename
+        self.dbname = dbname
+        self.token = token
+        self.max_rows = max(1, max_rows)
+        self.max_delay = max_delay
+        self.batches = 0
+        self.records = 0
+        self._rows = {}
+        self._futures = []
+        self._first = 0.0
+        self._closed = False
+        self._thread = None
+        self._cond = threading.Condition()
+        self._send_lock = threading.Lock()
+        _WRITE_BEHIND_BUFFERS.add(self)
+    #--------------------------------------------------------
+    def add(self,values:Dict[str, Any]) -> Future:
+        """
+        Buffer a record and return the ``Future`` of its batch.
+        """
+        future = Future()
+        if values.get("gguid") == "" or values.get("gguid") == None:
+            future.set_result({"error": True, "error_code": "E1", "error_message": "The record's gguid is not defined"})
+            return future
+        with self._cond:
+            if self._closed:
+                future.set_result({"error": True, "error_code": "WB1", "error_message": "Write-behind buffer closed"})
+                return future
+            if not self._rows:
+                self._first = time.monotonic()
+            gguid = values["gguid"]
+            self._rows[gguid] = {**self._rows[gguid], **values} if gguid in self._rows else dict(values)
+            self._futures.append(future)
+            full = len(self._rows) >= self.max_rows
+            if not full and self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+        if full:
+            self.flush()
+        return future
+    #--------------------------------------------------------
+    def _run(self):
+        #flush the buffer max_delay seconds after its oldest record
+        try:
+            while True:
+                with self._cond:
+                    while self._rows and time.monotonic() < self._first + self.max_delay and not self._closed:
+                        self._cond.wait(self._first + self.max_delay - time.monotonic())
+                    if not self._rows:
+                        self._thread = None
+                        return
+                self.flush()
+        finally:
+            #a failed flush must not leave a dead thread registered
+            with self._cond:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+    #--------------------------------------------------------
+    def flush(self):
+        """
+        Send the buffered records now and resolve their futures.
+        """
+        with self._send_lock:
+            with self._cond:
+                rows = list(self._rows.values())
+                futures = self._futures
+                self._rows = {}
+                self._futures = []
+            if not rows:
+                return
+            client = self.client
+            url = client.base_url + f'?action=table_save&token={self.token}&db={self.dbname}&tablename={self.tablename}'
+            outcome = None
+            try:
+                try:
+                    result, code, message = client._fetch("POST", url, "E13", payload={"rows": rows})
+                except requests.RequestException as e:
+                    result, code, message = None, "F1", str(e)
+                except Exception as e:
+                    #non-JSON body or unexpected envelope
+                    result, code, message = None, "E13", f"Invalid response: {e}"
+                if result is None:
+                    outcome = {"error": True, "error_code": code, "error_message": message}
+                else:
+                    outcome = result
+                    client._after_write(self.tablename, self.dbname, self.token)
+            finally:
+                #every future taken from the buffer is resolved, whatever happened
+                self.batches += 1
+                self.records += len(rows)
+                for future in futures:
+                    if outcome is not None:
+                        future.set_result(outcome)
+                    else:
+                        future.set_exception(RuntimeError("Write-behind flush interrupted"))
+    #--------------------------------------------------------
+    def close(self):
+        """
+        Flush the buffer and refuse further records.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self.flush()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#================================================================================
+#MOCK NIOS4 SERVER
+#================================================================================
+#Local stand-in for web.nios4.com/ws and the synchronizer, used by the
+#benchmarks. It implements the actions called by api_nios4 with in-memory
+#tables, a configurable latency and configurable payload sizes.
+#
+#    python benchmarks/mock_server.py --port 8765 --latency 0.02 --records 1000
+#================================================================================
+from __future__ import annotations
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+from typing import Optional
+import argparse
+import threading
+import random
+import json
+import zlib
+import time
+import os
+
+class MockNios4Server:
+    #--------------------------------------------------------
+    def __init__(self,host:str="127.0.0.1",port:int=0,latency:float=0.0,jitter:float=0.0,
+                 records:int=1000,record_size:int=200,file_size:int=1048576,sync_pages:int=1):
+        """
+        Initialize the mock server (call ``start`` to serve).
+
+        Implemented actions: ``user_login``, ``database_list``, ``users``,
+        ``table_list``, ``table_info``,
+        ``model`` (by gguid, ``conditions``, ``page``/``perpage``),
+        ``model_fuzzy``, ``detail_save``, ``table_save``, ``detail_delete``,
+        ``detail_resolve``, ``sync`` and, on the same address, the
+        synchronizer actions ``file_upload`` and ``file_download``. Every
+        response is delayed by ``latency`` plus a random ``jitter``. The
+        responses have the keys read by api_nios4 and the Nios4 field types
+        (``text``, ``integernumber``, ``decimalnumber``, ``date``).
+
+        Parameters
+        ----------
+        host : str, optional
+            Address to bind. Default ``"127.0.0.1"``.
+        port : int, optional
+            Port to bind, ``0`` for a free one. Default 0.
+        latency : float, optional
+            Delay in seconds added to every response. Default 0.
+        jitter : float, optional
+            Maximum random delay in seconds added on top of ``latency``. Default 0.
+        records : int, optional
+            Records generated in every table on first access. Default 1000.
+        record_size : int, optional
+            Approximate size in bytes of each generated record. Default 200.
+        file_size : int, optional
+            Size in bytes of the files returned for gguids never uploaded.
+            Default 1 MiB.
+        sync_pages : int, optional
+            Number of ``sync`` calls needed to complete a synchronization
+            (``partial`` responses before the last one). Default 1.
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.records = records
+        self.record_size = record_size
+        self.file_size = file_size
+        self.sync_pages = max(1, sync_pages)
+        self.requests = {}
+        self.tables = {}
+        self.files = {}
+        self._sync_state = {}
+        self._file = os.urandom(file_size)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+    #--------------------------------------------------------
+    @property
+    def url(self) -> str:
+        """
+        Base URL to assign to ``api_nios4.base_url`` and ``api_nios4.file_url``.
+        """
+        return f"http://{self.host}:{self._server.server_port}/"
+    #--------------------------------------------------------
+    def start(self) -> "MockNios4Server":
+        """
+        Start serving on a background thread and return the server.
+        """
+        mock = self
+        class Handler(MockHandler):
+            server_state = mock
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    #--------------------------------------------------------
+    def stop(self):
+        """
+        Stop the server.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+    #--------------------------------------------------------
+    def __enter__(self):
+        return self.start()
+    #--------------------------------------------------------
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+    #--------------------------------------------------------
+    def table(self,tablename:str) -> dict:
+        """
+        Return the records of a table, generating them on first access.
+        """
+        with self._lock:
+            rows = self.tables.get(tablename)
+            if rows is None:
+                filler = "x" * max(0, self.record_size - 150)
+                rows = {}
+                for i in range(self.records):
+                    gguid = f"{tablename}-{i:08d}"
+                    rows[gguid] = {"gguid": gguid, "name": f"record {i}", "code": i,
+                                   "amount": round(i * 1.5, 2), "created": 20250101000000 + i % 60,
+                                   "notes": filler}
+                self.tables[tablename] = rows
+            return rows
+    #--------------------------------------------------------
+    def handle(self,action:str,query:dict,body:Optional[bytes]) -> tuple[int, bytes]:
+        """
+        Compute the ``(status, body)`` answer to a request.
+        """
+        with self._lock:
+            self.requests[action] = self.requests.get(action, 0) + 1
+        tablename = query.get("tablename", "")
+        if action == "user_login":
+            return self.json({"error": False, "user": {"id": "1", "email": query.get("email", "user@example.com"),
+                                                       "token": "mock-token"}})
+        if action == "database_list":
+            return self.json({"error": False, "db": [{"name": "mockdb"}]})
+        if action == "users":
+            return self.json({"error": False, "users": [{"id": "1", "email": "user@example.com"}]})
+        if action == "table_list":
+            return self.json({"error": False, "tables": [{"tablename": name} for name in self.tables or {"customers": 0}]})
+        if action == "table_info":
+            return self.json({"error": False, "table": {"tablename": tablename},
+                              "fields": [{"fieldname": "gguid", "fieldtype": "text"},
+                                         {"fieldname": "name", "fieldtype": "text"},
+                                         {"fieldname": "code", "fieldtype": "integernumber"},
+                                         {"fieldname": "amount", "fieldtype": "decimalnumber"},
+                                         {"fieldname": "created", "fieldtype": "date"},
+                                         {"fieldname": "notes", "fieldtype": "text"}]})
+        if action == "model":
+            rows = self.table(tablename)
+            if body is None:
+                row = rows.get(query.get("gguid", ""))
+                return self.json({"error": False, "records": [row] if row is not None else []})
+            payload = json.loads(body or b"{}")
+            records = list(rows.values())
+            for field, value in (payload.get("conditions") or {}).items():
+                values = set(map(str, value if isinstance(value, list) else [value]))
+                records = [row for row in records if str(row.get(field)) in values]
+            total = len(records)
+            if "page" in payload:
+                perpage = payload.get("perpage", 50)
+                records = records[(payload["page"] - 1) * perpage:payload["page"] * perpage]
+            return self.json({"error": False, "records": records, "total": total})
+        if action == "model_fuzzy":
+            payload = json.loads(body or b"{}")
+            limit = payload.get("limit") or 50
+            return self.json({"error": False, "results": list(self.table(tablename).values())[:limit]})
+        if action == "detail_save":
+            values = json.loads(body)["values"]
+            self.table(tablename)[values["gguid"]] = values
+            return self.json({"error": False, "values": values})
+        if action == "table_save":
+            rows = json.loads(body)["rows"]
+            table = self.table(tablename)
+            for row in rows:
+                table[row["gguid"]] = row
+            return self.json({"error": False, "rows": [{"gguid": row["gguid"]} for row in rows]})
+        if action == "detail_delete":
+            self.table(tablename).pop(json.loads(body).get("gguid"), None)
+            return self.json({"error": False})
+        if action == "detail_resolve":
+            return self.json({"error": False})
+        if action == "sync":
+            db = query.get("db", "")
+            with self._lock:
+                page = self._sync_state.get(db, 0) + 1
+                self._sync_state[db] = page % self.sync_pages
+            partial = page < self.sync_pages
+            return self.json({"error": False, "sync": {"partial": partial, "partial_from": page,
+                                                       "partial_total": self.sync_pages}})
+        if action == "file_upload":
+            self.files[query.get("gguid", "")] = body or b""
+            return self.json({"result": "OK"})
+        if action == "file_download":
+            return 200, self.files.get(query.get("gguid", ""), self._file)
+        return self.json({"error": True, "error_code": "MOCK", "error_message": f"Unknown action {action}"})
+    #--------------------------------------------------------
+    @staticmethod
+    def json(value:dict) -> tuple[int, bytes]:
+        return 200, json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server_state = None
+    #--------------------------------------------------------
+    def log_message(self, format, *args):
+        pass
+    #--------------------------------------------------------
+    def _read_body(self) -> Optional[bytes]:
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            parts = []
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return b"".join(parts)
+                parts.append(self.rfile.read(size))
+                self.rfile.readline()
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length)
+    #--------------------------------------------------------
+    def _answer(self,body:Optional[bytes]):
+        state = self.server_state
+        query = {key: value[0] for key, value in parse_qs(urlsplit(self.path).query).items()}
+        if state.latency or state.jitter:
+            time.sleep(state.latency + random.uniform(0, state.jitter))
+        status, content = state.handle(query.get("action", ""), query, body)
+        download = status == 200 and query.get("action") == "file_download"
+        etag = f'"{zlib.crc32(content):08x}-{len(content)}"' if download else ""
+        start = 0
+        range_header = self.headers.get("Range", "")
+        if download and range_header.startswith("bytes=") and self.headers.get("If-Range", etag) == etag:
+            start = int(range_header[6:].split("-")[0] or 0)
+            status = 206 if start < len(content) else 416
+        if status == 416:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{len(content)}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{len(content) - 1}/{len(content)}")
+        self.send_header("Content-Type", "application/octet-stream" if query.get("action") == "file_download"
+                         else "application/json")
+        self.send_header("Content-Length", str(len(content) - start))
+        self.end_headers()
+        self.wfile.write(memoryview(content)[start:])
+    #--------------------------------------------------------
+    def do_GET(self):
+        self._answer(None)
+    #--------------------------------------------------------
+    def do_POST(self):
+        self._answer(self._read_body())
+
+#================================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local mock of the Nios4 web service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="maximum random extra latency")
+    parser.add_argument("--records", type=int, default=1000, help="records per table")
+    parser.add_argument("--record-size", type=int, default=200, help="approximate bytes per record")
+    parser.add_argument("--file-size", type=int, default=1048576, help="bytes per downloaded file")
+    args = parser.parse_args()
+    server = MockNios4Server(args.host, args.port, args.latency, args.jitter, args.records,
+                             args.record_size, args.file_size).start()
+    print(f"Mock Nios4 server on {server.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#================================================================================
+#API NIOS4 BENCHMARKS
+#================================================================================
+#Measures throughput, latency and memory of the api_nios4 methods against the
+#local mock server (no network access needed) and writes the results as JSON,
+#so that they can be compared across versions.
+#
+#    python benchmarks/run_benchmarks.py --latency 0.005 --output results.json
+#    python benchmarks/run_benchmarks.py --only save_record --iterations 500
+#================================================================================
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+import subprocess
+import tracemalloc
+import platform
+import argparse
+import tempfile
+import time
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import api_nios4
+from mock_server import MockNios4Server
+
+DBNAME = "mockdb"
+TABLE = "customers"
+
+#--------------------------------------------------------
+def percentile(samples:List[float],q:float) -> float:
+    """
+    Return the ``q`` quantile (0-1) of the samples, by nearest rank.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+#--------------------------------------------------------
+def new_client(server:MockNios4Server,**kwargs) -> api_nios4.api_nios4:
+    """
+    Return a client pointed at the mock server.
+    """
+    client = api_nios4.api_nios4(token="mock-token", dbname=DBNAME, **kwargs)
+    client.base_url = server.url
+    client.file_url = server.url
+    return client
+#--------------------------------------------------------
+def measure(name:str,mode:str,call:Callable[[int], Any],iterations:int,workers:int=1,
+            items_per_call:int=1,memory_iterations:int=20) -> Dict[str, Any]:
+    """
+    Run ``call(i)`` ``iterations`` times on ``workers`` threads and return
+    throughput and latency figures; the peak Python memory is measured on a
+    separate traced run of ``memory_iterations`` calls, so that tracing does
+    not distort the timings.
+    """
+    errors = 0
+    latencies = []
+    def timed(i):
+        started = time.perf_counter()
+        result = call(i)
+        return time.perf_counter() - started, result
+    call(0)  # warm-up: connection, caches, lazy imports
+    started = time.perf_counter()
+    if workers == 1:
+        outcomes = [timed(i) for i in range(iterations)]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(timed, range(iterations)))
+    seconds = time.perf_counter() - started
+    for latency, result in outcomes:
+        latencies.append(latency)
+        if result is None or result is False:
+            errors += 1
+    tracemalloc.start()
+    for i in range(min(iterations, memory_iterations)):
+        call(i)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "name": name,
+        "mode": mode,
+        "workers": workers,
+        "calls": iterations,
+        "items": iterations * items_per_call,
+        "errors": errors,
+        "seconds": seconds,
+        "calls_per_second": iterations / seconds if seconds > 0 else 0.0,
+        "items_per_second": iterations * items_per_call / seconds if seconds > 0 else 0.0,
+        "latency_mean": sum(latencies) / len(latencies) if latencies else 0.0,
+        "latency_p50": percentile(latencies, 0.50),
+        "latency_p95": percentile(latencies, 0.95),
+        "latency_p99": percentile(latencies, 0.99),
+        "peak_memory_bytes": peak,
+    }
+#--------------------------------------------------------
+def benchmarks(server:MockNios4Server,args:argparse.Namespace,workdir:str) -> List[Callable[[], Dict[str, Any]]]:
+    """
+    Return the benchmark functions, each producing one result. Downloaded
+    files are written in ``workdir``.
+    """
+    n = args.iterations
+    payload = os.urandom(args.file_size)
+    gguids = [f"{TABLE}-{i:08d}" for i in range(args.records)]
+    rows = [{"gguid": f"bench-{i:08d}", "name": f"row {i}", "code": i, "amount": i * 0.5}
+            for i in range(args.batch_size)]
+    client = new_client(server)
+    #one thread-safe client shared by the threads, with a connection per worker
+    threaded = new_client(server, transport=api_nios4.Nios4Transport(pool_maxsize=args.workers), thread_safe=True)
+    cases = {
+        "login": lambda: measure("login", "serial", lambda i: client.login(), n),
+        "table_info": lambda: measure("table_info", "serial", lambda i: client.table_info(TABLE), n),
+        "table_info_cached": lambda: measure("table_info_cached", "serial",
+            lambda i, c=new_client(server, metadata_cache=api_nios4.MetadataCache()): c.table_info(TABLE), n),
+        "get_record": lambda: measure("get_record", "serial",
+            lambda i: client.get_record(TABLE, gguids[i % len(gguids)]), n),
+        "find_records": lambda: measure("find_records", "serial",
+            lambda i: client.find_records(TABLE), max(1, n // 10), items_per_call=args.records),
+        "find_records_stream": lambda: measure("find_records_stream", "serial",
+            lambda i: sum(1 for _ in client.find_records(TABLE, stream=True)), max(1, n // 10),
+            items_per_call=args.records),
+        "fuzzy_records": lambda: measure("fuzzy_records", "serial",
+            lambda i: client.fuzzy_records(TABLE, ["name"], ["gguid", "name"], "record"), n),
+        "save_record": lambda: measure("save_record", "serial",
+            lambda i: client.save_record(TABLE, {"gguid": f"serial-{i}", "name": "x"}), n),
+        "save_record_threaded": lambda: measure("save_record", "threaded",
+            lambda i, c=threaded: c.save_record(TABLE, {"gguid": f"thread-{i}", "name": "x"}), n, workers=args.workers),
+        "get_record_threaded": lambda: measure("get_record", "threaded",
+            lambda i, c=threaded: c.get_record(TABLE, gguids[i % len(gguids)]), n, workers=args.workers),
+        "save_records": lambda: measure("save_records", "batched",
+            lambda i: client.save_records(TABLE, rows), max(1, n // 10), items_per_call=len(rows)),
+        "save_records_batch": lambda: measure("save_records_batch", "batched",
+            lambda i: client.save_records_batch(TABLE, rows, chunk_size=max(1, len(rows) // args.workers),
+                                                max_workers=args.workers), max(1, n // 10), items_per_call=len(rows)),
+        "get_records": lambda: measure("get_records", "batched",
+            lambda i: client.get_records(TABLE, gguids[:args.batch_size], max_workers=args.workers),
+            max(1, n // 10), items_per_call=min(args.batch_size, len(gguids))),
+        "sync": lambda: measure("sync", "serial", lambda i: client.sync(), n),
+        "upload_file": lambda: measure("upload_file", "serial",
+            lambda i: client.upload_file(payload, False, f"file-{i}", TABLE), max(1, n // 10)),
+        "download_file": lambda: measure("download_file", "serial",
+            lambda i: client.download_file(os.path.join(workdir, "download.bin"), f"file-{i}", TABLE), max(1, n // 10)),
+        "transfer_manager_download": lambda: measure("transfer_manager_download", "threaded",
+            lambda i: api_nios4.TransferManager(client, max_workers=args.workers).download(
+                [(os.path.join(workdir, f"tm-{j}.bin"), f"file-{j}", TABLE) for j in range(args.workers * 2)])["failed"] == [],
+            max(1, n // 50), items_per_call=args.workers * 2),
+    }
+    selected = args.only or list(cases)
+    return [cases[name] for name in selected]
+#--------------------------------------------------------
+def version() -> str:
+    """
+    Return the git commit of the benchmarked tree, if available.
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+#--------------------------------------------------------
+def main(argv:List[str]=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmarks of api_nios4")
+    parser.add_argument("--iterations", type=int, default=200, help="calls per serial/threaded benchmark")
+    parser.add_argument("--workers", type=int, default=8, help="threads of the threaded/batched benchmarks")
+    parser.add_argument("--latency", type=float, default=0.0, help="mock server latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="mock server random extra latency")
+    parser.add_argument("--records", type=int, default=1000, help="records per table")
+    parser.add_argument("--record-size", type=int, default=200, help="approximate bytes per record")
+    parser.add_argument("--batch-size", type=int, default=500, help="rows per batched call")
+    parser.add_argument("--file-size", type=int, default=1048576, help="bytes per uploaded/downloaded file")
+    parser.add_argument("--only", nargs="*", help="benchmarks to run (default: all)")
+    parser.add_argument("--output", default="", help="JSON results file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    with MockNios4Server(latency=args.latency, jitter=args.jitter, records=args.records,
+                         record_size=args.record_size, file_size=args.file_size) as server, \
+            tempfile.TemporaryDirectory(prefix="nios4-bench-") as workdir:
+        results = []
+        for bench in benchmarks(server, args, workdir):
+            result = bench()
+            results.append(result)
+            print(f"{result['name']:<28}{result['mode']:<10}{result['calls_per_second']:>10.1f} calls/s"
+                  f"  p50 {result['latency_p50'] * 1000:8.2f} ms  p99 {result['latency_p99'] * 1000:8.2f} ms"
+                  f"  peak {result['peak_memory_bytes'] / 1024:9.1f} KiB  errors {result['errors']}",
+                  file=sys.stderr)
+    report = {
+        "version": version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "json_backend": api_nios4.JsonCodec().backend,
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+#================================================================================
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+#================================================================================
+#PYTEST FIXTURES
+#================================================================================
+#``server`` is the local mock of the web service used by the benchmarks
+#(benchmarks/mock_server.py); ``client`` is an api_nios4 pointed at it.
+#================================================================================
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import pytest
+
+import api_nios4 as nios4
+from mock_server import MockNios4Server
+
+DBNAME = "mockdb"
+
+#--------------------------------------------------------
+@pytest.fixture
+def server():
+    with MockNios4Server(records=50, record_size=120, file_size=65536) as mock:
+        yield mock
+#--------------------------------------------------------
+@pytest.fixture
+def make_client(server):
+    """
+    Factory of clients pointed at the mock server; every client created is
+    closed at teardown.
+    """
+    clients = []
+    def factory(**kwargs):
+        kwargs.setdefault("token", "mock-token")
+        kwargs.setdefault("dbname", DBNAME)
+        client = nios4.api_nios4(**kwargs)
+        client.base_url = server.url
+        client.file_url = server.url
+        clients.append(client)
+        return client
+    yield factory
+    for client in clients:
+        client.close()
+#--------------------------------------------------------
+@pytest.fixture
+def client(make_client):
+    return make_client()
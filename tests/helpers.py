@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+#================================================================================
+#TEST HELPERS
+#================================================================================
+#Fake transport and response builders: the client accepts any object exposing
+#``request(method, url, **kwargs)``, so the error paths (non-JSON bodies,
+#HTTP errors, connection failures) can be scripted without a server.
+#================================================================================
+from __future__ import annotations
+
+from typing import Any, Callable, List, Optional, Union
+from urllib.parse import urlsplit, parse_qs
+import threading
+import json
+
+import requests
+
+#--------------------------------------------------------
+def make_response(status:int=200,body:Union[bytes, str, dict, list]=b"",headers:Optional[dict]=None,
+                  url:str="") -> requests.Response:
+    """
+    Build a ``requests.Response`` with the given status, body and headers.
+    Dictionaries and lists are encoded as JSON.
+    """
+    if isinstance(body, (dict, list)):
+        body = json.dumps(body).encode("utf-8")
+    elif isinstance(body, str):
+        body = body.encode("utf-8")
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response._content_consumed = True
+    response.headers.update(headers or {})
+    response.encoding = "utf-8"
+    response.url = url
+    return response
+#--------------------------------------------------------
+def ok(**values) -> requests.Response:
+    """
+    Build a successful web service response carrying ``values``.
+    """
+    return make_response(200, {"error": False, **values})
+#--------------------------------------------------------
+def action(url:str) -> str:
+    """
+    Return the ``action`` parameter of a request URL.
+    """
+    return parse_qs(urlsplit(url).query).get("action", [""])[0]
+
+class FakeTransport:
+    #--------------------------------------------------------
+    def __init__(self,*responses:Any,handler:Optional[Callable[..., Any]]=None):
+        """
+        Transport answering with ``responses`` in order (the last one is
+        repeated), or with ``handler(method, url, **kwargs)``. An exception
+        instead of a response is raised. Every call is recorded in ``calls``
+        as ``(method, url, kwargs)``; the body of a file-like ``data`` is
+        read and stored in ``bodies``.
+        """
+        self.responses = list(responses)
+        self.handler = handler
+        self.calls: List[tuple] = []
+        self.bodies: List[Optional[bytes]] = []
+        self.closed = False
+        self._lock = threading.Lock()
+    #--------------------------------------------------------
+    def request(self,method:str,url:str,**kwargs) -> requests.Response:
+        data = kwargs.get("data")
+        if data is not None and hasattr(data, "read"):
+            body = b"".join(bytes(chunk) for chunk in iter(lambda: data.read(65536), b""))
+        elif isinstance(data, str):
+            body = data.encode("utf-8")
+        elif isinstance(data, (bytes, bytearray, memoryview)):
+            body = bytes(data)
+        else:
+            #chunk generator (streams of unknown size)
+            body = b"".join(bytes(chunk) for chunk in data) if data is not None else None
+        with self._lock:
+            self.calls.append((method, url, kwargs))
+            self.bodies.append(body)
+            if self.handler is None:
+                answer = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        if self.handler is not None:
+            answer = self.handler(method, url, **kwargs)
+        if isinstance(answer, BaseException):
+            raise answer
+        if callable(answer):
+            answer = answer()
+        return answer
+    #--------------------------------------------------------
+    def actions(self) -> List[str]:
+        """
+        Return the ``action`` of every recorded call.
+        """
+        return [action(url) for _, url, _ in self.calls]
+    #--------------------------------------------------------
+    def close(self):
+        self.closed = True
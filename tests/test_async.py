@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+import api_nios4 as nios4
+from helpers import FakeTransport
+from mock_server import MockNios4Server
+
+class FlakyServer(MockNios4Server):
+    #rejects the records named "bad", fails the first download of "flaky"
+    #and answers "broken" downloads with an error page
+    def __init__(self, **kwargs):
+        super().__init__(records=20, record_size=120, file_size=4096, latency=0.005, **kwargs)
+        self.failures = {"flaky": 1}
+    def handle(self, action, query, body):
+        if action == "detail_save" and b'"bad' in (body or b""):
+            return self.json({"error": True, "error_code": "RC1", "error_message": "rejected"})
+        gguid = query.get("gguid", "")
+        if action == "file_download" and gguid == "broken":
+            return 500, b"<html>Internal error</html>"
+        if action == "file_download" and self.failures.get(gguid):
+            self.failures[gguid] -= 1
+            return 503, b"busy"
+        return super().handle(action, query, body)
+#--------------------------------------------------------
+@pytest.fixture
+def flaky():
+    with FlakyServer() as server:
+        yield server
+#--------------------------------------------------------
+def new_client(server, **kwargs):
+    kwargs.setdefault("retry", nios4.RetryPolicy(backoff=0, jitter=False))
+    client = nios4.AsyncNios4(token="mock-token", **kwargs)
+    client.base_url = client.file_url = server.url
+    client.set_defaults(dbname="mockdb")
+    #the blocking transport must never be used by the coroutines
+    client.transport = FakeTransport(AssertionError("blocking transport used"))
+    return client
+#--------------------------------------------------------
+def test_concurrent_calls_keep_their_own_error_state(flaky):
+    async def main():
+        async with new_client(flaky) as client:
+            async def save(i):
+                gguid = f"bad-{i}" if i % 2 else f"good-{i}"
+                result = await client.save_record("customers", {"gguid": gguid})
+                await asyncio.sleep(0.01)
+                return result, client.error_code
+            return await asyncio.gather(*(save(i) for i in range(20)))
+    for i, (result, code) in enumerate(asyncio.run(main())):
+        assert (result is None, code) == ((True, "RC1") if i % 2 else (False, ""))
+#--------------------------------------------------------
+def test_metadata_calls_do_not_use_the_blocking_transport(flaky):
+    async def main():
+        async with new_client(flaky) as client:
+            table = await client.table_info("customers")
+            fields = await client.fields_info("customers")
+            tables = await client.table_list()
+            return table, fields, tables, client.error_code
+    table, fields, tables, code = asyncio.run(main())
+    assert table == {"tablename": "customers"}
+    assert [field["fieldname"] for field in fields][0] == "gguid"
+    assert tables and code == ""
+#--------------------------------------------------------
+def test_iter_records_pages(flaky):
+    async def main():
+        async with new_client(flaky) as client:
+            return [row["gguid"] async for row in client.iter_records("customers", page_size=7)]
+    rows = asyncio.run(main())
+    assert len(rows) == 20 and len(set(rows)) == 20
+#--------------------------------------------------------
+def test_blocking_methods_run_in_a_thread(flaky):
+    async def main():
+        client = new_client(flaky)
+        #get_records runs the sync implementation: give it a real transport
+        client.transport = nios4.Nios4Transport()
+        ticks = 0
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+        task = asyncio.create_task(ticker())
+        gguids = [f"customers-{i:08d}" for i in range(20)]
+        result = await client.get_records("customers", gguids, chunk_size=2, max_workers=1)
+        task.cancel()
+        await client.aclose()
+        return result, client.error_code, ticks
+    result, code, ticks = asyncio.run(main())
+    assert code == "" and len(result["records"]) == 20
+    assert ticks > 1
+#--------------------------------------------------------
+def test_download_error_page_is_not_saved(flaky, tmp_path):
+    target = tmp_path / "out.bin"
+    async def main():
+        async with new_client(flaky) as client:
+            return await client.download_file(str(target), "broken", "documents"), client.error_code
+    assert asyncio.run(main()) == (False, "F3")
+    assert not target.exists()
+    assert not (tmp_path / "out.bin.part").exists()
+#--------------------------------------------------------
+def test_download_is_retried_and_instrumented(flaky, tmp_path):
+    target = tmp_path / "out.bin"
+    events = []
+    async def main():
+        async with new_client(flaky) as client:
+            client.add_hook(after=events.append)
+            return await client.download_file(str(target), "flaky", "documents")
+    assert asyncio.run(main()) is True
+    assert target.stat().st_size == 4096
+    assert events[0]["retries"] == 1
+    assert events[0]["bytes_received"] == 4096
+#--------------------------------------------------------
+def test_write_errors_have_async_codes():
+    class Down(MockNios4Server):
+        def handle(self, action, query, body):
+            return 502, b"bad gateway"
+    with Down() as server:
+        async def main():
+            async with new_client(server, retry=nios4.RetryPolicy(max_attempts=1)) as client:
+                codes = []
+                await client.save_record("customers", {"gguid": "g"})
+                codes.append(client.error_code)
+                await client.save_records("customers", [{"gguid": "g"}])
+                codes.append(client.error_code)
+                await client.sync()
+                codes.append(client.error_code)
+                return codes
+        assert asyncio.run(main()) == ["AE1", "AE2", "AE3"]
+#--------------------------------------------------------
+def test_loaded_snapshot_serves_the_async_metadata_calls(flaky, tmp_path):
+    async def main():
+        async with new_client(flaky) as writer:
+            writer.transport = nios4.Nios4Transport()
+            writer.snapshot_dir = str(tmp_path)
+            assert await writer.save_schema_snapshot(["customers"])
+            assert writer.metadata_cache is not None
+        async with new_client(flaky) as reader:
+            reader.snapshot_dir = str(tmp_path)
+            assert await reader.load_schema_snapshot()
+            calls = dict(flaky.requests)
+            table = await reader.table_info("customers")
+            fields = await reader.fields_info("customers")
+            return table, fields, calls
+    table, fields, calls = asyncio.run(main())
+    assert table == {"tablename": "customers"} and fields[0]["fieldname"] == "gguid"
+    assert flaky.requests == calls
+#--------------------------------------------------------
+def test_metadata_cache_is_shared_with_blocking_clients(flaky):
+    cache = nios4.MetadataCache()
+    async def main():
+        async with new_client(flaky, metadata_cache=cache) as client:
+            first = await client.table_info("customers")
+            calls = dict(flaky.requests)
+            await client.table_info("customers")
+            return first, calls
+    first, calls = asyncio.run(main())
+    assert flaky.requests == calls
+    assert len(cache.entries("mockdb", nios4.MetadataCache.user_key("mock-token"))) == 1
+#--------------------------------------------------------
+def test_stale_snapshot_refresh_is_reported_on_the_async_client(flaky, tmp_path):
+    async def main():
+        async with new_client(flaky) as client:
+            client.transport = nios4.Nios4Transport()
+            client.snapshot_dir = str(tmp_path)
+            assert await client.save_schema_snapshot(["customers"])
+            assert await client.load_schema_snapshot(max_age=-1)
+            client.snapshot_thread.join(5)
+            return client.snapshot_result
+    assert asyncio.run(main()) == (True, "", "")
+#--------------------------------------------------------
+def test_write_behind_and_call_are_coroutines(flaky):
+    async def main():
+        async with new_client(flaky) as client:
+            client.transport = nios4.Nios4Transport()
+            await client.enable_write_behind("customers", max_rows=2, max_delay=60)
+            futures = [await client.save_record("customers", {"gguid": f"w{i}"}) for i in range(2)]
+            results = await asyncio.gather(*futures)
+            result = await client.call(client.table_list, dbname="other")
+            return results, result, client.dbname
+    results, result, dbname = asyncio.run(main())
+    assert [r["error"] for r in results] == [False, False]
+    assert flaky.requests["table_save"] == 1
+    assert result.ok and result.dbname == "other" and dbname == "mockdb"
+#--------------------------------------------------------
+def test_sync_context_manager_is_refused():
+    with pytest.raises(TypeError):
+        with nios4.AsyncNios4(token="t"):
+            pass
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import api_nios4 as nios4
+from helpers import FakeTransport, action, make_response, ok
+
+EXPIRED = make_response(200, {"error": True, "error_code": "X9", "error_message": "Token expired"})
+
+#--------------------------------------------------------
+def relogin_server(failure):
+    #answers failure to requests with the old token, logs in with "new"
+    logins = []
+    def handler(method, url, **kwargs):
+        if action(url) == "user_login":
+            logins.append(url)
+            return ok(user={"token": "new"})
+        return failure if "token=old" in url else ok(tables=["customers"])
+    return FakeTransport(handler=handler), logins
+#--------------------------------------------------------
+def new_client(transport, **kwargs):
+    client = nios4.api_nios4(token="old", dbname="db", transport=transport, auth=nios4.TokenManager(**kwargs))
+    client.username, client.password = "john", "secret"
+    return client
+#--------------------------------------------------------
+def test_error_message_about_the_token_is_detected_by_default():
+    transport, logins = relogin_server(EXPIRED)
+    client = new_client(transport)
+    assert client.table_list() == ["customers"]
+    assert len(logins) == 1 and client.token == "new"
+#--------------------------------------------------------
+def test_other_errors_are_not_auth_failures():
+    transport, logins = relogin_server(make_response(200, {"error": True, "error_code": "DB1", "error_message": "Unknown table"}))
+    client = new_client(transport)
+    assert client.table_list() is None and client.error_code == "DB1"
+    assert logins == []
+#--------------------------------------------------------
+def test_concurrent_failures_log_in_once():
+    transport, logins = relogin_server(make_response(401, "unauthorized"))
+    client = new_client(transport)
+    client.thread_safe = True
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.table_list())) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [["customers"]] * 8
+    assert len(logins) == 1
+#--------------------------------------------------------
+def test_body_is_decoded_with_the_client_codec():
+    class Counting(nios4.JsonCodec):
+        decoded = 0
+        def loads(self, data):
+            Counting.decoded += 1
+            return super().loads(data)
+    transport, logins = relogin_server(EXPIRED)
+    client = nios4.api_nios4(token="old", dbname="db", transport=transport, codec=Counting("json"),
+                             auth=nios4.TokenManager(error_messages=()))
+    assert client.auth.is_failure(EXPIRED) is False
+    client.auth.error_codes = ("X9",)
+    before = Counting.decoded
+    assert client.auth.is_failure(EXPIRED, codec=client.codec) is True
+    assert Counting.decoded == before + 1
+#--------------------------------------------------------
+def test_background_renewal_is_claimed_once():
+    auth = nios4.TokenManager(ttl=60)
+    assert auth.claim_refresh() is True
+    assert auth.claim_refresh() is False
+    auth.refreshing = False
+    with auth.lock:
+        #a login in progress: no second renewal
+        assert auth.claim_refresh() is False
+#--------------------------------------------------------
+def test_malformed_login_in_the_background_is_a_failure():
+    def handler(method, url, **kwargs):
+        if action(url) == "user_login":
+            return ok(user={"name": "john"})
+        return ok(tables=["customers"])
+    client = new_client(FakeTransport(handler=handler), ttl=60)
+    client.auth.obtained_at -= 58
+    assert client.table_list() == ["customers"]
+    deadline = threading.Event()
+    for i in range(100):
+        if client.auth.failures:
+            break
+        deadline.wait(0.01)
+    assert client.auth.failures == 1 and not client.auth.refreshing
+    assert client.token == "old"
+#--------------------------------------------------------
+def test_successful_bodies_are_not_decoded():
+    class Counting(nios4.JsonCodec):
+        decoded = 0
+        def loads(self, data):
+            Counting.decoded += 1
+            return super().loads(data)
+    auth = nios4.TokenManager(error_codes=("X9",))
+    codec = Counting("json")
+    page = ok(records=[{"gguid": f"g{i}", "note": "Token X9"} for i in range(5000)])
+    assert len(page.content) > auth.ERROR_BODY_MAX
+    assert auth.is_failure(page, codec=codec) is False
+    assert auth.is_failure(ok(records=[{"note": "token"}]), codec=codec) is False
+    assert Counting.decoded == 0
+    assert auth.is_failure(make_response(200, b'{"error" : true, "error_code": "DB1", "error_message": "TOKEN expired"}'),
+                           codec=codec) is True
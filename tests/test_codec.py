@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+from datetime import date
+import json
+from decimal import Decimal
+
+import pytest
+
+import api_nios4 as nios4
+from api_nios4 import codec
+from helpers import FakeTransport, ok
+
+BACKENDS = [name for name, module in (("orjson", codec.orjson), ("ujson", codec.ujson), ("json", codec.json))
+            if module is not None]
+
+#--------------------------------------------------------
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_decimals_keep_every_digit(backend):
+    codec = nios4.JsonCodec(backend)
+    values = {"amount": Decimal("0.10000000000000000001"), "big": Decimal("1E+3"), "day": date(2025, 9, 30),
+              "text": "\x00decimal:1\x00"}
+    data = codec.dumps(values)
+    assert json.loads(data, parse_float=Decimal) == {"amount": Decimal("0.10000000000000000001"), "big": 1000,
+                                                     "day": 20250930000000, "text": "\x00decimal:1\x00"}
+#--------------------------------------------------------
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_non_finite_decimals_are_rejected(backend):
+    with pytest.raises((TypeError, ValueError)):
+        nios4.JsonCodec(backend).dumps({"amount": Decimal("NaN")})
+#--------------------------------------------------------
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_round_trip(backend):
+    codec = nios4.JsonCodec(backend)
+    values = {"name": "Caffè", "rows": [1, 2.5, None, True]}
+    assert codec.loads(codec.dumps(values)) == values
+#--------------------------------------------------------
+def test_json_body_with_explicit_none_headers():
+    transport = FakeTransport(ok(rows=[]))
+    client = nios4.api_nios4(token="t", dbname="db", transport=transport)
+    client._request("POST", client.base_url + "?action=table_save", json={"rows": []}, headers=None)
+    assert transport.calls[0][2]["headers"] == {"Content-Type": "application/json"}
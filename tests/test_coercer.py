@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+from datetime import date
+
+import pytest
+
+import api_nios4 as nios4
+
+FIELDS = [{"fieldname": "name", "fieldtype": "text"},
+          {"fieldname": "amount", "fieldtype": "decimalnumber"},
+          {"fieldname": "qty", "fieldtype": "integernumber"},
+          {"fieldname": "day", "fieldtype": "date"},
+          {"fieldname": "photo", "fieldtype": "image"}]
+
+#--------------------------------------------------------
+@pytest.fixture
+def coercer():
+    return nios4.RecordCoercer(nios4.api_nios4(), FIELDS)
+#--------------------------------------------------------
+def test_rows_match_check_value(coercer):
+    client = nios4.api_nios4()
+    samples = {"name": [None, "", 12, "x"], "amount": [None, "", "12.50", 3, 2.25],
+               "qty": [None, "", "7", 7.9, 4], "day": [None, "", "2025-09-30", date(2025, 9, 30), 20250930120000]}
+    formats = {"name": "text", "amount": "decimalnumber", "qty": "integernumber", "day": "date"}
+    for name, values in samples.items():
+        rows = [{name: value} for value in values]
+        expected = [{name: client.check_value(value, formats[name])} for value in values]
+        assert coercer.coerce_rows(rows) == expected
+#--------------------------------------------------------
+def test_unknown_fields_and_types_are_untouched(coercer):
+    row = {"photo": b"\x89PNG", "extra": "  kept  ", "qty": "3"}
+    out = coercer.coerce_rows([row])[0]
+    assert out == {"photo": b"\x89PNG", "extra": "  kept  ", "qty": 3}
+    assert row["qty"] == "3"
+#--------------------------------------------------------
+def test_type_map_renames_server_types():
+    coercer = nios4.RecordCoercer(nios4.api_nios4(), [{"fieldname": "n", "fieldtype": "money"}],
+                                  type_map={"money": "decimalnumber"})
+    assert coercer.coerce_rows([{"n": "1.5"}]) == [{"n": 1.5}]
+#--------------------------------------------------------
+def test_columns(coercer):
+    columns = coercer.coerce_columns({"amount": ["1.5", None], "qty": ["2", ""], "name": [1, None]})
+    assert columns == {"amount": [1.5, 0], "qty": [2, 0], "name": ["1", ""]}
+#--------------------------------------------------------
+def test_numpy_columns(coercer):
+    np = pytest.importorskip("numpy")
+    columns = coercer.coerce_columns({"amount": np.array([1, 2], dtype=np.int32), "qty": np.array([1.9, 2.0]),
+                                      "day": ["2025-09-30", None]}, as_numpy=True)
+    assert columns["amount"].dtype == np.float64 and columns["amount"].tolist() == [1.0, 2.0]
+    assert columns["qty"].dtype == np.int64 and columns["qty"].tolist() == [1, 2]
+    assert columns["day"].dtype == np.int64 and columns["day"].tolist() == [20250930000000, 0]
+    rows = coercer.columns_to_rows(columns)
+    assert rows[0] == {"amount": 1.0, "qty": 1, "day": 20250930000000}
+    assert type(rows[0]["qty"]) is int
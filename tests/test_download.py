@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import zlib
+
+import requests
+
+import api_nios4 as nios4
+from helpers import FakeTransport, make_response
+
+CONTENT = bytes(range(256)) * 64
+
+#--------------------------------------------------------
+def fake_client(transport):
+    return nios4.api_nios4(token="t", dbname="db", transport=transport,
+                           retry=nios4.RetryPolicy(max_attempts=1))
+#--------------------------------------------------------
+def test_download(client, server, tmp_path):
+    target = tmp_path / "out.bin"
+    assert client.download_file(str(target), "file-1", "documents")
+    assert target.read_bytes() == server._file
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["out.bin"]
+#--------------------------------------------------------
+def test_malformed_checksum_is_rejected_before_the_request(client, server, tmp_path):
+    for checksum in ("crc32:abcd", "abcd", "sha256:xyz", "sha256:abcd", "md5:"):
+        assert not client.download_file(str(tmp_path / "out.bin"), "file-1", "documents", checksum=checksum)
+        assert client.error_code == "F6"
+    assert "file_download" not in server.requests
+#--------------------------------------------------------
+def test_checksum_is_verified(client, server, tmp_path):
+    target = tmp_path / "out.bin"
+    good = "sha256:" + hashlib.sha256(server._file).hexdigest().upper()
+    bad = "sha256:" + hashlib.sha256(b"other").hexdigest()
+    assert not client.download_file(str(target), "file-1", "documents", checksum=bad)
+    assert client.error_code == "F4" and not target.exists()
+    assert client.download_file(str(target), "file-1", "documents", checksum=good)
+#--------------------------------------------------------
+def test_leftover_part_is_resumed_with_if_range(client, server, tmp_path):
+    target = tmp_path / "out.bin"
+    assert client.download_file(str(target), "file-1", "documents")
+    etag = f'"{zlib.crc32(server._file):08x}-{len(server._file)}"'
+    (tmp_path / "out.bin.part").write_bytes(server._file[:1000])
+    (tmp_path / "out.bin.part.validator").write_text(etag)
+    target.unlink()
+    assert client.download_file(str(target), "file-1", "documents")
+    assert client.last_transfer["resumed_from"] == 1000
+    assert target.read_bytes() == server._file
+#--------------------------------------------------------
+def test_part_of_another_version_is_not_spliced(client, server, tmp_path):
+    target = tmp_path / "out.bin"
+    (tmp_path / "out.bin.part").write_bytes(b"old version" * 100)
+    (tmp_path / "out.bin.part.validator").write_text('"stale"')
+    assert client.download_file(str(target), "file-1", "documents")
+    assert client.last_transfer["resumed_from"] == 0
+    assert target.read_bytes() == server._file
+#--------------------------------------------------------
+def test_part_without_validator_starts_over(client, server, tmp_path):
+    target = tmp_path / "out.bin"
+    (tmp_path / "out.bin.part").write_bytes(b"unknown" * 100)
+    assert client.download_file(str(target), "file-1", "documents")
+    assert client.last_transfer["resumed_from"] == 0
+    assert target.read_bytes() == server._file
+#--------------------------------------------------------
+def test_complete_part_answered_with_416(tmp_path):
+    target = tmp_path / "out.bin"
+    (tmp_path / "out.bin.part").write_bytes(CONTENT)
+    (tmp_path / "out.bin.part.validator").write_text('"v1"')
+    transport = FakeTransport(make_response(416, b"", {"Content-Range": f"bytes */{len(CONTENT)}"}))
+    client = fake_client(transport)
+    assert client.download_file(str(target), "g", "documents", checksum="md5:" + hashlib.md5(CONTENT).hexdigest())
+    assert target.read_bytes() == CONTENT
+    assert transport.calls[0][2]["headers"]["If-Range"] == '"v1"'
+#--------------------------------------------------------
+def test_encoded_body_skips_the_length_check(tmp_path):
+    #requests decodes the body: Content-Length is the size of the compressed one
+    transport = FakeTransport(make_response(200, CONTENT, {"Content-Encoding": "gzip", "Content-Length": "321"}))
+    client = fake_client(transport)
+    assert client.download_file(str(tmp_path / "out.bin"), "g", "documents")
+    assert transport.calls[0][2]["headers"]["Accept-Encoding"] == "identity"
+    assert not (tmp_path / "out.bin.part.validator").exists()
+#--------------------------------------------------------
+def test_error_page_is_not_saved(tmp_path):
+    client = fake_client(FakeTransport(make_response(500, "<html>error</html>")))
+    assert not client.download_file(str(tmp_path / "out.bin"), "g", "documents")
+    assert client.error_code == "F3"
+    assert not (tmp_path / "out.bin").exists()
+#--------------------------------------------------------
+def test_dropped_connection_is_resumed(tmp_path):
+    class Dropping(requests.Response):
+        def iter_content(self, chunk_size=1, decode_unicode=False):
+            yield self._content[:5000]
+            raise requests.exceptions.ChunkedEncodingError("connection reset")
+    first = make_response(200, CONTENT, {"Content-Length": str(len(CONTENT)), "ETag": '"v2"'})
+    first.__class__ = Dropping
+    rest = make_response(206, CONTENT[5000:], {"Content-Range": f"bytes 5000-{len(CONTENT) - 1}/{len(CONTENT)}"})
+    transport = FakeTransport(first, rest)
+    client = fake_client(transport)
+    assert client.download_file(str(tmp_path / "out.bin"), "g", "documents")
+    assert (tmp_path / "out.bin").read_bytes() == CONTENT
+    headers = transport.calls[1][2]["headers"]
+    assert headers["Range"] == "bytes=5000-" and headers["If-Range"] == '"v2"'
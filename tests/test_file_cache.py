@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import os
+
+import api_nios4 as nios4
+
+#--------------------------------------------------------
+def test_repeated_download_is_served_from_disk(client, server, tmp_path):
+    client.file_cache = nios4.FileCache(str(tmp_path / "cache"))
+    for name in ("a.bin", "b.bin"):
+        assert client.download_file(str(tmp_path / name), "file-1", "documents")
+    assert server.requests["file_download"] == 1
+    assert client.last_transfer["cached"] is True
+    assert (tmp_path / "b.bin").read_bytes() == server._file
+#--------------------------------------------------------
+def test_entries_are_written_one_file_each(tmp_path):
+    cache = nios4.FileCache(str(tmp_path / "cache"))
+    source = tmp_path / "source.bin"
+    for i in range(3):
+        source.write_bytes(b"content %d" % i)
+        cache.put("db", "documents", f"g{i}", str(source))
+    index = tmp_path / "cache" / "entries"
+    before = {path.name: path.stat().st_mtime_ns for path in index.iterdir()}
+    assert len(before) == 3
+    cache.invalidate("db", "documents", "g0")
+    after = {path.name: path.stat().st_mtime_ns for path in index.iterdir()}
+    assert len(after) == 2 and all(before[name] == mtime for name, mtime in after.items())
+#--------------------------------------------------------
+def test_entries_of_another_instance_are_found(tmp_path):
+    first = nios4.FileCache(str(tmp_path / "cache"))
+    second = nios4.FileCache(str(tmp_path / "cache"))
+    source = tmp_path / "source.bin"
+    source.write_bytes(b"shared")
+    first.put("db", "documents", "g", str(source))
+    assert second.get("db", "documents", "g", str(tmp_path / "out.bin"))
+    assert nios4.FileCache(str(tmp_path / "cache")).stats()["size"] == 1
+#--------------------------------------------------------
+def test_linked_file_edited_in_place_does_not_corrupt_the_cache(client, server, tmp_path):
+    client.file_cache = nios4.FileCache(str(tmp_path / "cache"), link=True)
+    target = tmp_path / "out.bin"
+    assert client.download_file(str(target), "file-1", "documents")
+    assert client.download_file(str(target), "file-1", "documents")
+    assert not os.access(str(target), os.W_OK) or os.geteuid() == 0
+    os.chmod(target, 0o644)
+    with open(target, "ab") as f:
+        f.write(b"local edit")
+    other = tmp_path / "other.bin"
+    assert client.download_file(str(other), "file-1", "documents")
+    assert other.read_bytes() == server._file
+    assert server.requests["file_download"] == 2
+#--------------------------------------------------------
+def test_checksum_is_verified_on_a_hit(client, server, tmp_path):
+    client.file_cache = nios4.FileCache(str(tmp_path / "cache"))
+    target = tmp_path / "out.bin"
+    assert client.download_file(str(target), "file-1", "documents")
+    for algorithm in ("sha256", "md5"):
+        good = f"{algorithm}:{hashlib.new(algorithm, server._file).hexdigest()}"
+        assert client.download_file(str(target), "file-1", "documents", checksum=good)
+        assert client.last_transfer["cached"] is True
+    bad = "sha256:" + hashlib.sha256(b"other").hexdigest()
+    assert not client.download_file(str(target), "file-1", "documents", checksum=bad)
+    assert client.error_code == "F4"
+    assert server.requests["file_download"] == 2
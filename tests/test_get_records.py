@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+import json
+
+import requests
+
+import api_nios4 as nios4
+from helpers import FakeTransport, make_response, ok
+
+#--------------------------------------------------------
+def by_chunk(answer):
+    #transport answering every model request with answer(gguids of the chunk)
+    def handler(method, url, **kwargs):
+        gguids = json.loads(kwargs["data"])["conditions"]["gguid"]
+        return answer(gguids)
+    return FakeTransport(handler=handler)
+#--------------------------------------------------------
+def test_records_in_input_order(client):
+    gguids = [f"customers-{i:08d}" for i in (5, 1, 9, 3)] + ["missing"]
+    result = client.get_records("customers", gguids, chunk_size=2)
+    assert [r and r["gguid"] for r in result["records"]] == gguids[:4] + [None]
+    assert result["errors"] == {"missing": {"error_code": "NF", "error_message": "Record not found"}}
+    assert client.error_code == "E12"
+#--------------------------------------------------------
+def test_malformed_chunk_keeps_the_other_chunks():
+    def answer(gguids):
+        if "g3" in gguids:
+            return make_response(200, "<html>gateway</html>")
+        return ok(records=[{"gguid": g} for g in gguids])
+    client = nios4.api_nios4(token="t", dbname="db", transport=by_chunk(answer))
+    result = client.get_records("customers", [f"g{i}" for i in range(6)], chunk_size=2)
+    assert [r and r["gguid"] for r in result["records"]] == ["g0", "g1", None, None, "g4", "g5"]
+    assert {g: e["error_code"] for g, e in result["errors"].items()} == {"g2": "E12", "g3": "E12"}
+    assert client.error_code == "E12"
+#--------------------------------------------------------
+def test_envelope_without_records_is_reported():
+    def answer(gguids):
+        return ok(rows=[]) if "g0" in gguids else ok(records=[{"gguid": g} for g in gguids])
+    client = nios4.api_nios4(token="t", dbname="db", transport=by_chunk(answer))
+    result = client.get_records("customers", ["g0", "g1"], chunk_size=1)
+    assert result["records"] == [None, {"gguid": "g1"}]
+    assert result["errors"]["g0"]["error_code"] == "E12"
+#--------------------------------------------------------
+def test_request_errors_are_reported_per_chunk():
+    def answer(gguids):
+        return requests.ConnectionError("reset") if "g1" in gguids else ok(records=[{"gguid": g} for g in gguids])
+    client = nios4.api_nios4(token="t", dbname="db", transport=by_chunk(answer),
+                             retry=nios4.RetryPolicy(max_attempts=1))
+    result = client.get_records("customers", ["g0", "g1"], chunk_size=1)
+    assert result["records"] == [{"gguid": "g0"}, None]
+    assert result["errors"]["g1"]["error_code"] == "F1"
+#--------------------------------------------------------
+def test_duplicates_are_dropped_and_not_counted():
+    client = nios4.api_nios4(token="t", dbname="db", transport=by_chunk(lambda gguids: ok(records=[{"gguid": "g0"}])))
+    result = client.get_records("customers", ["g0", "g1", "g0", "g1"])
+    assert [r and r["gguid"] for r in result["records"]] == ["g0", None]
+    assert client.error_message == "1 of 2 records could not be retrieved"
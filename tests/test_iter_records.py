@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+import json
+
+import api_nios4 as nios4
+from helpers import FakeTransport, make_response, ok
+
+#--------------------------------------------------------
+def test_every_record_once_in_pages(client, server):
+    rows = [row["gguid"] for row in client.iter_records("customers", page_size=7)]
+    assert rows == sorted(server.table("customers"))
+    assert server.requests["model"] == 8
+    assert client.error_code == ""
+#--------------------------------------------------------
+def test_pages_are_ordered_by_gguid():
+    transport = FakeTransport(ok(records=[{"gguid": "a"}], total=1))
+    client = nios4.api_nios4(token="t", dbname="db", transport=transport)
+    assert list(client.iter_records("orders", order_info=[["date", False]], page_size=10)) == [{"gguid": "a"}]
+    payload = json.loads(transport.bodies[0])
+    assert payload["order_info"] == [["date", False], ["gguid", True]]
+    assert payload["page"] == 1 and payload["perpage"] == 10
+#--------------------------------------------------------
+def test_failing_page_stops_the_iteration():
+    transport = FakeTransport(ok(records=[{"gguid": "a"}, {"gguid": "b"}]), make_response(500, "down"))
+    client = nios4.api_nios4(token="t", dbname="db", transport=transport)
+    assert [row["gguid"] for row in client.iter_records("orders", page_size=2)] == ["a", "b"]
+    assert client.error_code == "E11" and client.error_message == "down"
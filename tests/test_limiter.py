@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+import api_nios4 as nios4
+from helpers import FakeTransport, make_response, ok
+
+#--------------------------------------------------------
+def test_rate_limit_spaces_requests():
+    limiter = nios4.AdaptiveLimiter(rate=100, burst=1)
+    started = time.monotonic()
+    for i in range(11):
+        limiter.acquire()
+        limiter.release(0.0)
+    assert time.monotonic() - started >= 0.09
+    assert limiter.stats()["waits"] >= 10
+#--------------------------------------------------------
+def test_concurrency_never_exceeds_the_limit():
+    limiter = nios4.AdaptiveLimiter(initial_concurrency=3, max_concurrency=3)
+    peak = 0
+    active = 0
+    lock = threading.Lock()
+    def work():
+        nonlocal peak, active
+        limiter.acquire()
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.01)
+        with lock:
+            active -= 1
+        limiter.release(0.01)
+    threads = [threading.Thread(target=work) for i in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak == 3 and limiter.stats()["in_flight"] == 0
+#--------------------------------------------------------
+def test_limit_grows_when_fast_and_halves_when_throttled():
+    limiter = nios4.AdaptiveLimiter(initial_concurrency=4, max_concurrency=64)
+    for i in range(20):
+        limiter.acquire()
+        limiter.release(0.01)
+    grown = limiter.limit
+    assert grown > 4
+    limiter.acquire()
+    limiter.release(0.0, throttled=True)
+    assert limiter.limit == max(1, grown * 0.5)
+    assert limiter.stats()["throttled"] == 1
+#--------------------------------------------------------
+def test_client_reports_throttling_to_the_limiter():
+    limiter = nios4.AdaptiveLimiter(initial_concurrency=8)
+    transport = FakeTransport(make_response(429, "slow down"), ok(tables=[]))
+    client = nios4.api_nios4(token="t", dbname="db", transport=transport, limiter=limiter,
+                             retry=nios4.RetryPolicy(backoff=0, jitter=False))
+    assert client.table_list() == []
+    stats = limiter.stats()
+    assert stats["throttled"] == 1 and stats["decreases"] == 1 and stats["in_flight"] == 0
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+import api_nios4 as nios4
+from helpers import FakeTransport, ok
+
+#--------------------------------------------------------
+def schema_server():
+    #every user sees a different label for the same table
+    def handler(method, url, **kwargs):
+        token = url.split("token=")[1].split("&")[0]
+        return ok(table={"tablename": "customers", "label": token}, fields=[{"fieldname": "gguid"}])
+    return FakeTransport(handler=handler)
+#--------------------------------------------------------
+def test_lookups_are_served_from_memory(client, server):
+    cache = nios4.MetadataCache()
+    client.metadata_cache = cache
+    assert client.fields_info("customers") == client.fields_info("customers")
+    assert server.requests["table_info"] == 1
+    assert cache.stats()["hits"] == 1
+#--------------------------------------------------------
+def test_mutating_the_result_does_not_corrupt_the_cache():
+    transport = schema_server()
+    client = nios4.api_nios4(token="alice", dbname="db", transport=transport, metadata_cache=nios4.MetadataCache())
+    client.fields_info("customers").append({"fieldname": "injected"})
+    fields = client.fields_info("customers")
+    fields[0]["fieldname"] = "changed"
+    assert client.fields_info("customers") == [{"fieldname": "gguid"}]
+    assert len(transport.calls) == 1
+#--------------------------------------------------------
+def test_users_do_not_share_entries():
+    cache = nios4.MetadataCache()
+    transport = schema_server()
+    alice = nios4.api_nios4(token="alice", dbname="db", transport=transport, metadata_cache=cache)
+    bob = nios4.api_nios4(token="bob", dbname="db", transport=transport, metadata_cache=cache)
+    assert alice.table_info("customers")["label"] == "alice"
+    assert bob.table_info("customers")["label"] == "bob"
+    assert alice.table_info("customers")["label"] == "alice"
+    assert len(transport.calls) == 2
+    assert not any("alice" in str(key) for key in cache._entries)
+#--------------------------------------------------------
+def test_invalidate_removes_the_table_for_every_user():
+    cache = nios4.MetadataCache()
+    for user in ("u1", "u2"):
+        cache.set(("db", "customers", user), {"table": {}})
+        cache.set(("db", "orders", user), {"table": {}})
+    cache.invalidate("db", "customers")
+    assert sorted(key[1] for key in cache._entries) == ["orders", "orders"]
+    assert list(cache.entries("db", "u1")) == ["orders"]
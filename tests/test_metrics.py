@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import requests
+
+import api_nios4 as nios4
+from helpers import FakeTransport, make_response, ok
+
+#--------------------------------------------------------
+def test_hooks_receive_events_without_the_token():
+    before, after = [], []
+    client = nios4.api_nios4(token="secret-token", dbname="db", transport=FakeTransport(ok(tables=["t"])))
+    client.add_hook(before=before.append, after=after.append)
+    client.table_list()
+    assert before[0] == {"action": "table_list", "method": "GET", "tablename": "", "db": "db", "bytes_sent": 0}
+    event = after[0]
+    assert event["status"] == 200 and event["retries"] == 0 and event["error"] is None
+    assert event["bytes_received"] > 0 and event["duration"] >= 0
+    assert "secret-token" not in repr(before + after)
+#--------------------------------------------------------
+def test_failing_hook_does_not_break_the_request():
+    client = nios4.api_nios4(token="t", dbname="db", transport=FakeTransport(ok(tables=[])))
+    client.add_hook(before=lambda event: 1 / 0, after=lambda event: 1 / 0)
+    assert client.table_list() == []
+#--------------------------------------------------------
+def test_transport_errors_are_reported_to_after_hooks():
+    after = []
+    client = nios4.api_nios4(token="t", dbname="db", transport=FakeTransport(requests.ConnectionError("refused")))
+    client.add_hook(after=after.append)
+    try:
+        client.table_list()
+    except requests.ConnectionError:
+        pass
+    assert after[0]["error"] == "ConnectionError" and after[0]["status"] is None
+#--------------------------------------------------------
+def test_metrics_aggregate_per_action():
+    metrics = nios4.RequestMetrics(buckets=(0.1, 1.0))
+    for duration, status in ((0.05, 200), (0.5, 200), (2.0, 503)):
+        metrics.record({"action": "model", "status": status, "duration": duration, "retries": 1,
+                        "bytes_sent": 10, "bytes_received": 100, "error": None})
+    stats = metrics.snapshot()["model"]
+    assert stats["count"] == 3 and stats["errors"] == 1 and stats["retries"] == 3
+    assert stats["bytes_sent"] == 30 and stats["bytes_received"] == 300
+    assert 0.1 <= stats["p50"] <= 1.0 and stats["max"] == 2.0
+#--------------------------------------------------------
+def test_exports():
+    metrics = nios4.RequestMetrics(buckets=(0.1, 1.0), namespace="app")
+    metrics.record({"action": "sync", "status": 200, "duration": 0.05})
+    text = metrics.to_prometheus()
+    assert 'app_request_duration_seconds_bucket{action="sync",le="0.1"} 1' in text
+    assert 'app_request_duration_seconds_bucket{action="sync",le="+Inf"} 1' in text
+    assert 'app_requests_total{action="sync"} 1' in text
+    otlp = metrics.to_otlp()
+    names = [metric["name"] for metric in otlp["resourceMetrics"][0]["scopeMetrics"][0]["metrics"]]
+    assert names[0] == "app.request.duration" and "app.requests" in names
+#--------------------------------------------------------
+def test_client_metrics_count_retries():
+    metrics = nios4.RequestMetrics()
+    transport = FakeTransport(make_response(503, "busy"), ok(tables=[]))
+    client = nios4.api_nios4(token="t", dbname="db", transport=transport, metrics=metrics,
+                             retry=nios4.RetryPolicy(backoff=0, jitter=False))
+    client.table_list()
+    stats = metrics.snapshot()["table_list"]
+    assert stats["count"] == 1 and stats["retries"] == 1 and stats["errors"] == 0
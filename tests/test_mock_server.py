@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+#--------------------------------------------------------
+def test_database_and_user_lists(client):
+    assert client.database_list() == [{"name": "mockdb"}]
+    assert client.users_list() == [{"id": "1", "email": "user@example.com"}]
+    assert client.error_code == ""
+#--------------------------------------------------------
+def test_field_types_are_nios4_types(client):
+    fields = client.fields_info("customers")
+    assert {field["fieldtype"] for field in fields} == {"text", "integernumber", "decimalnumber", "date"}
+#--------------------------------------------------------
+def test_record_coercer_converts_every_typed_field(client):
+    coercer = client.record_coercer("customers")
+    assert set(coercer.formats) == {"gguid", "name", "code", "amount", "created", "notes"}
+    row = coercer.coerce_rows([{"gguid": "g", "code": "7", "amount": "1.25", "created": "2025-01-31"}])[0]
+    assert row == {"gguid": "g", "code": 7, "amount": 1.25, "created": client.normalize_date("2025-01-31")}
+#--------------------------------------------------------
+def test_records_match_the_declared_fields(client):
+    fields = {field["fieldname"] for field in client.fields_info("customers")}
+    record = client.get_record("customers", "customers-00000001")[0]
+    assert set(record) == fields
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+import api_nios4 as nios4
+from helpers import FakeTransport, action, make_response, ok
+
+#--------------------------------------------------------
+def test_fan_out_on_every_tenant(server):
+    with nios4.ClientPool(base_url=server.url, file_url=server.url) as pool:
+        for i in range(5):
+            pool.add_tenant(f"t{i}", dbname=f"db{i}", token="mock-token")
+        outcome = pool.fan_out("table_info", "customers")
+    assert sorted(outcome["results"]) == [f"t{i}" for i in range(5)]
+    assert outcome["errors"] == {}
+#--------------------------------------------------------
+def test_one_malformed_tenant_does_not_lose_the_others():
+    def handler(method, url, **kwargs):
+        if "db=broken" in url:
+            return make_response(200, "<html>proxy error</html>")
+        return ok(sync={"partial": False})
+    pool = nios4.ClientPool(transport=FakeTransport(handler=handler))
+    for name in ("a", "broken", "c"):
+        pool.add_tenant(name, dbname=name, token="t")
+    outcome = pool.fan_out("sync")
+    assert sorted(outcome["results"]) == ["a", "c"]
+    assert outcome["errors"]["broken"]["error_code"] == "CP1"
+    pool.close()
+#--------------------------------------------------------
+def test_tenant_errors_are_reported():
+    def handler(method, url, **kwargs):
+        if "db=locked" in url:
+            return make_response(200, {"error": True, "error_code": "DB9", "error_message": "locked"})
+        return ok(tables=[])
+    pool = nios4.ClientPool(transport=FakeTransport(handler=handler))
+    pool.add_tenant("ok", dbname="ok", token="t")
+    pool.add_tenant("locked", dbname="locked", token="t")
+    outcome = pool.fan_out(lambda client: client.table_list())
+    assert outcome["results"] == {"ok": []}
+    assert outcome["errors"] == {"locked": {"error_code": "DB9", "error_message": "locked"}}
+#--------------------------------------------------------
+def test_shared_token_manager_is_rejected():
+    with pytest.raises(ValueError):
+        nios4.ClientPool(transport=FakeTransport(ok()), auth=nios4.TokenManager())
+#--------------------------------------------------------
+def test_every_tenant_renews_its_own_token():
+    def handler(method, url, **kwargs):
+        if action(url) == "user_login":
+            return ok(user={"token": "new-" + url.split("email=")[1].split("&")[0]})
+        return make_response(401, "expired") if "token=old" in url else ok(tables=[])
+    pool = nios4.ClientPool(transport=FakeTransport(handler=handler), auth_factory=nios4.TokenManager)
+    for name in ("a", "b"):
+        pool.add_tenant(name, token="old", username=name, password="secret")
+    assert pool["a"].auth is not pool["b"].auth
+    outcome = pool.fan_out("table_list")
+    assert outcome["errors"] == {}
+    assert (pool["a"].token, pool["b"].token) == ("new-a", "new-b")
+    pool.close()
+#--------------------------------------------------------
+def test_unknown_tenant_is_reported_per_tenant():
+    pool = nios4.ClientPool(transport=FakeTransport(ok(tables=[])))
+    pool.add_tenant("a", token="t")
+    outcome = pool.fan_out("table_list", tenants=["a", "missing"])
+    assert outcome["results"] == {"a": []}
+    assert outcome["errors"] == {"missing": {"error_code": "CP2", "error_message": "Unknown tenant"}}
+    pool.close()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+import api_nios4 as nios4
+
+#--------------------------------------------------------
+def test_repeated_query_is_served_from_memory(client, server):
+    client.query_cache = nios4.QueryCache()
+    first = client.find_records("customers")
+    first[0]["name"] = "changed"
+    assert client.find_records("customers")[0]["name"] != "changed"
+    assert server.requests["model"] == 1
+#--------------------------------------------------------
+def test_write_invalidates_only_its_table(client, server):
+    client.query_cache = nios4.QueryCache()
+    client.find_records("customers")
+    client.find_records("orders")
+    assert client.save_record("orders", {"gguid": "o-1"}) is not None
+    client.find_records("customers")
+    client.find_records("orders")
+    assert server.requests["model"] == 3
+#--------------------------------------------------------
+def test_result_fetched_during_a_write_on_the_table_is_dropped():
+    cache = nios4.QueryCache()
+    key = cache.key("db", "customers", "model", {}, "t")
+    generation = cache.generation("db", "customers")
+    cache.invalidate("db", "customers")
+    cache.set(key, b'{"error":false,"records":[]}', generation)
+    assert cache.get(key) is None
+#--------------------------------------------------------
+def test_writes_on_other_tables_do_not_drop_a_result():
+    cache = nios4.QueryCache()
+    key = cache.key("db", "customers", "model", {}, "t")
+    generation = cache.generation("db", "customers")
+    cache.invalidate("db", "orders")
+    cache.set(key, b'{"error":false,"records":[]}', generation)
+    assert cache.get(key) is not None
+    generation = cache.generation("db", "customers")
+    cache.invalidate("db")
+    cache.set(key, b'{"error":false,"records":[]}', generation)
+    assert cache.get(key) is None
+#--------------------------------------------------------
+def test_async_writes_invalidate_a_shared_cache(client, server):
+    pytest.importorskip("aiohttp")
+    cache = nios4.QueryCache()
+    client.query_cache = cache
+    client.find_records("customers")
+    async def main():
+        async with nios4.AsyncNios4(token="mock-token", query_cache=cache) as aclient:
+            aclient.base_url = server.url
+            aclient.set_defaults(dbname="mockdb")
+            await aclient.find_records("customers")
+            saved = await aclient.save_record("customers", {"gguid": "c-1"})
+            await aclient.find_records("customers")
+            return saved
+    assert asyncio.run(main()) is not None
+    assert server.requests["model"] == 2
+    client.find_records("customers")
+    assert server.requests["model"] == 2
+#--------------------------------------------------------
+def test_zero_ttl_disables_expiration_like_the_metadata_cache():
+    cache = nios4.QueryCache(ttl=0)
+    key = cache.key("db", "orders", "model", {}, "t")
+    cache.set(key, b"{}", cache.generation("db", "orders"))
+    assert cache.get(key) == b"{}"
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+import pytest
+import requests
+
+import api_nios4 as nios4
+from helpers import FakeTransport, make_response, ok
+
+BUSY = make_response(503, "busy")
+
+#--------------------------------------------------------
+def new_client(*responses, **kwargs):
+    transport = FakeTransport(*responses)
+    return nios4.api_nios4(token="t", dbname="db", transport=transport, **kwargs), transport
+#--------------------------------------------------------
+def test_requests_are_sent_once_by_default():
+    client, transport = new_client(BUSY, ok(tables=[]))
+    assert client.table_list() is None
+    assert len(transport.calls) == 1
+#--------------------------------------------------------
+def test_reads_are_retried_when_enabled():
+    client, transport = new_client(BUSY, ok(tables=[]), retry=nios4.RetryPolicy(backoff=0, jitter=False))
+    assert client.table_list() == []
+    assert len(transport.calls) == 2
+#--------------------------------------------------------
+def test_table_save_is_not_retried_after_it_may_have_run():
+    retry = nios4.RetryPolicy(backoff=0, jitter=False)
+    client, transport = new_client(BUSY, ok(rows=[]), retry=retry)
+    assert client.save_records("orders", [{"gguid": "g"}]) is None
+    assert transport.actions() == ["table_save"]
+    client, transport = new_client(requests.ReadTimeout("slow"), ok(rows=[]), retry=retry)
+    with pytest.raises(requests.ReadTimeout):
+        client.save_records("orders", [{"gguid": "g"}])
+    assert transport.actions() == ["table_save"]
+#--------------------------------------------------------
+def test_table_save_is_retried_when_it_never_reached_the_server():
+    retry = nios4.RetryPolicy(backoff=0, jitter=False)
+    for failure in (make_response(429, "slow down"), requests.ConnectTimeout("no route")):
+        client, transport = new_client(failure, ok(rows=[]), retry=retry)
+        assert client.save_records("orders", [{"gguid": "g"}]) is not None
+        assert transport.actions() == ["table_save", "table_save"]
+#--------------------------------------------------------
+def test_new_record_is_not_retried_on_server_error():
+    client, transport = new_client(BUSY, ok(), retry=nios4.RetryPolicy(backoff=0, jitter=False))
+    client.save_record("orders", {"gguid": "g"}, is_new=True)
+    assert transport.actions() == ["detail_save"]
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+import json
+
+import api_nios4 as nios4
+from helpers import FakeTransport, make_response, ok
+
+#--------------------------------------------------------
+def test_rows_are_saved_in_chunks(client, server):
+    rows = [{"gguid": f"b{i}", "name": f"row {i}"} for i in range(25)] + [{"name": "no gguid"}]
+    summary = client.save_records_batch("orders", rows, chunk_size=10, max_workers=3)
+    assert summary["saved"] == 25 and summary["failed"] == 1
+    assert [len(chunk["rows"]) for chunk in summary["chunks"]] == [10, 10, 5]
+    assert summary["errors"] == {25: {"error_code": "E1", "error_message": "The record's gguid is not defined"}}
+    assert server.requests["table_save"] == 3
+    assert client.error_code == "E14"
+#--------------------------------------------------------
+def test_chunks_respect_max_bytes(client):
+    rows = [{"gguid": f"b{i}", "blob": "x" * 400} for i in range(10)]
+    summary = client.save_records_batch("orders", rows, chunk_size=100, max_bytes=1500)
+    assert summary["saved"] == 10
+    assert all(len(chunk["rows"]) <= 3 for chunk in summary["chunks"])
+#--------------------------------------------------------
+def test_malformed_chunk_response_is_reported_per_chunk():
+    def handler(method, url, **kwargs):
+        rows = json.loads(kwargs["data"])["rows"]
+        if rows[0]["gguid"] == "b2":
+            return make_response(200, "<html>bad gateway</html>")
+        return ok(rows=rows)
+    client = nios4.api_nios4(token="t", dbname="db", transport=FakeTransport(handler=handler))
+    rows = [{"gguid": f"b{i}"} for i in range(6)]
+    summary = client.save_records_batch("orders", rows, chunk_size=2)
+    assert summary["saved"] == 4 and summary["failed"] == 2
+    assert [chunk["ok"] for chunk in summary["chunks"]] == [True, False, True]
+    assert summary["chunks"][1]["error_code"] == "E13"
+    assert sorted(summary["errors"]) == [2, 3]
+    assert client.error_code == "E14"
+    assert "failed chunks: 1" in client.error_message
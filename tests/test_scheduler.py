@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+import api_nios4 as nios4
+from helpers import FakeTransport, ok
+
+#--------------------------------------------------------
+def new_client(*responses, **kwargs):
+    transport = FakeTransport(*responses)
+    client = nios4.api_nios4(token="t", dbname="db", transport=transport, sync_window=0.05, **kwargs)
+    return client, transport
+#--------------------------------------------------------
+def test_writes_are_coalesced_in_one_sync():
+    client, transport = new_client(ok(sync={"partial": False}))
+    for i in range(10):
+        client.sync_scheduler.mark_dirty("db", "t")
+    assert client.sync_scheduler.flush(timeout=5)
+    assert transport.actions() == ["sync"]
+    assert client.sync_scheduler.stats()["marks"] == 10
+    client.close()
+#--------------------------------------------------------
+def test_stuck_sync_is_abandoned_after_the_timeout():
+    client, transport = new_client(ok(sync={"partial": True, "partial_from": 10, "partial_total": 100}))
+    client.sync_scheduler.sync_timeout = 0.2
+    client.sync_scheduler.mark_dirty("db", "t")
+    assert client.sync_scheduler.flush(timeout=5)
+    assert client.sync_scheduler.stats()["errors"]["db"][0] == "SY1"
+    client.close()
+#--------------------------------------------------------
+def test_writes_after_close_are_rejected():
+    client, transport = new_client(ok(sync={"partial": False}))
+    scheduler = client.sync_scheduler
+    scheduler.close(timeout=5)
+    assert scheduler.mark_dirty("db", "t") is False
+    assert scheduler.stats()["rejected"] == 1 and scheduler.stats()["pending"] == 0
+    assert transport.actions() == []
+#--------------------------------------------------------
+def test_unexpected_sync_failure_is_recorded():
+    client, transport = new_client(ValueError("boom"))
+    client.sync_scheduler.mark_dirty("db", "t")
+    assert client.sync_scheduler.flush(timeout=5)
+    assert client.sync_scheduler.stats()["errors"]["db"] == ("F1", "ValueError: boom")
+    client.close()
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import json
+
+import api_nios4 as nios4
+from helpers import FakeTransport
+
+#--------------------------------------------------------
+def test_snapshot_serves_the_schema_without_requests(make_client, server, tmp_path):
+    writer = make_client(snapshot_dir=str(tmp_path), metadata_cache=nios4.MetadataCache())
+    writer.fields_info("customers")
+    assert writer.save_schema_snapshot(["orders"])
+    calls = dict(server.requests)
+    reader = make_client(snapshot_dir=str(tmp_path))
+    assert reader.load_schema_snapshot()
+    assert [field["fieldname"] for field in reader.fields_info("orders")][0] == "gguid"
+    assert reader.table_info("customers") == {"tablename": "customers"}
+    assert reader.table_list() is not None
+    assert server.requests == calls
+#--------------------------------------------------------
+def test_snapshot_of_another_server_is_rejected(make_client, tmp_path):
+    writer = make_client(snapshot_dir=str(tmp_path))
+    assert writer.save_schema_snapshot(["customers"])
+    reader = make_client(snapshot_dir=str(tmp_path))
+    reader.base_url = "http://127.0.0.1:1/"
+    assert not reader.load_schema_snapshot()
+    assert reader.error_code == "SS1"
+#--------------------------------------------------------
+def test_missing_snapshot(make_client, tmp_path):
+    client = make_client(snapshot_dir=str(tmp_path))
+    assert not client.load_schema_snapshot()
+    assert client.error_code == "SS1"
+#--------------------------------------------------------
+def test_stale_snapshot_is_used_and_refreshed(make_client, server, tmp_path):
+    writer = make_client(snapshot_dir=str(tmp_path))
+    assert writer.save_schema_snapshot(["customers"])
+    path = tmp_path / "mockdb.schema.json"
+    snapshot = json.loads(path.read_text())
+    snapshot["created"] -= 7200
+    snapshot["tables"]["customers"]["table"]["label"] = "old"
+    path.write_text(json.dumps(snapshot))
+    reader = make_client(snapshot_dir=str(tmp_path))
+    assert reader.load_schema_snapshot(max_age=3600)
+    assert reader.table_info("customers")["label"] == "old"
+    reader.snapshot_thread.join(5)
+    refreshed = json.loads(path.read_text())
+    assert refreshed["created"] > snapshot["created"] + 3600
+    assert "label" not in refreshed["tables"]["customers"]["table"]
+#--------------------------------------------------------
+def test_failed_background_refresh_is_recorded(tmp_path):
+    client = nios4.api_nios4(token="t", dbname="db", snapshot_dir=str(tmp_path),
+                             transport=FakeTransport(RuntimeError("transport bug")))
+    snapshot = {"version": nios4.SCHEMA_SNAPSHOT_VERSION, "base_url": client.base_url, "dbname": "db",
+                "created": 0, "table_list": {"tables": ["customers"]}, "tables": {"customers": {"table": {}}}}
+    (tmp_path / "db.schema.json").write_text(json.dumps(snapshot))
+    assert client.load_schema_snapshot()
+    client.snapshot_thread.join(5)
+    assert client.snapshot_result == (False, "SS3", "RuntimeError: transport bug")
+    assert client.table_list() == ["customers"]
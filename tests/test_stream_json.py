@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+import api_nios4 as nios4
+from helpers import FakeTransport, make_response
+
+BODY = json.dumps({"error": False, "total": 3,
+                   "records": [{"gguid": "g1", "name": "Caffè €"}, {"gguid": "g2", "amount": 1234567.25},
+                               {"gguid": "g3", "tags": ["a", {"b": [1, 2]}]}],
+                   "after": "tail"}, ensure_ascii=False).encode("utf-8")
+
+#--------------------------------------------------------
+@pytest.mark.parametrize("size", [1, 2, 3, 7, len(BODY)])
+def test_items_are_decoded_across_chunk_boundaries(size):
+    client = nios4.api_nios4()
+    envelope = {}
+    chunks = (BODY[i:i + size] for i in range(0, len(BODY), size))
+    items = list(client._iter_json_array(chunks, "records", envelope))
+    assert items == json.loads(BODY)["records"]
+    assert envelope == {"error": False, "total": 3, "after": "tail"}
+#--------------------------------------------------------
+def test_truncated_response_raises():
+    client = nios4.api_nios4()
+    with pytest.raises(ValueError):
+        list(client._iter_json_array([BODY[:40]], "records", {}))
+#--------------------------------------------------------
+def test_streamed_find_records_matches_the_buffered_one(client):
+    assert list(client.find_records("customers", stream=True)) == client.find_records("customers")
+#--------------------------------------------------------
+def test_streamed_error_envelope_sets_the_error_state():
+    body = {"error": True, "error_code": "DB3", "error_message": "no table", "records": []}
+    client = nios4.api_nios4(token="t", dbname="db", transport=FakeTransport(make_response(200, body)))
+    assert list(client.find_records("missing", stream=True)) == []
+    assert client.error_code == "DB3"
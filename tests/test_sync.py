@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import api_nios4 as nios4
+from helpers import FakeTransport, make_response, ok
+
+#--------------------------------------------------------
+def partial(done, total=100):
+    return ok(sync={"partial": done < total, "partial_from": done, "partial_total": total})
+#--------------------------------------------------------
+def test_partial_sync_is_followed_to_the_end():
+    transport = FakeTransport(partial(40), partial(80), partial(100))
+    client = nios4.api_nios4(token="t", dbname="db", transport=transport)
+    seen = []
+    values = client.sync_until_complete(progress=lambda done, total, values: seen.append(done))
+    assert values["sync"]["partial"] is False and client.error_code == ""
+    assert seen == [40, 80, 100]
+    assert "partial_from=80" in transport.calls[2][1]
+#--------------------------------------------------------
+def test_repeated_partial_from_stops_the_loop():
+    transport = FakeTransport(partial(40), partial(40))
+    client = nios4.api_nios4(token="t", dbname="db", transport=transport)
+    values = client.sync_until_complete(max_backoff=0, max_stalls=3)
+    assert client.error_code == "SY2"
+    assert values["sync"]["partial_from"] == 40
+    assert len(transport.calls) == 4
+#--------------------------------------------------------
+def test_progress_resets_the_stall_count():
+    transport = FakeTransport(partial(10), partial(10), partial(20), partial(20), partial(100))
+    client = nios4.api_nios4(token="t", dbname="db", transport=transport)
+    assert client.sync_until_complete(max_backoff=0, max_stalls=2)["sync"]["partial"] is False
+    assert client.error_code == ""
+#--------------------------------------------------------
+def test_background_sync_stops_on_stall():
+    client = nios4.api_nios4(token="t", dbname="db", transport=FakeTransport(partial(5)))
+    future = client.sync_until_complete(max_backoff=0, max_stalls=2, background=True)
+    values, code, message = future.result(timeout=5)
+    assert values["sync"]["partial_from"] == 5
+    assert (code, message) == ("SY2", "Sync is not progressing")
+    assert client.error_code == ""
+#--------------------------------------------------------
+def test_background_sync_reports_http_errors():
+    client = nios4.api_nios4(token="t", dbname="db", transport=FakeTransport(make_response(500, "down")))
+    values, code, message = client.sync_until_complete(background=True).result(timeout=5)
+    assert values is None and code != "" and "down" in message
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import weakref
+import copy
+import gc
+
+import api_nios4 as nios4
+from api_nios4 import client as client_module
+from helpers import FakeTransport, make_response, ok
+
+#--------------------------------------------------------
+def test_overrides_and_errors_stay_in_their_thread(make_client):
+    client = make_client(thread_safe=True)
+    barrier = threading.Barrier(8)
+    def work(i):
+        barrier.wait()
+        dbname = f"db{i}"
+        result = client.call(client.get_record, "customers", "missing" if i % 2 else "customers-00000001",
+                             dbname=dbname)
+        return i, result
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(work, range(8)))
+    for i, result in results:
+        assert result.dbname == f"db{i}"
+        assert result.ok
+    assert client.dbname == "mockdb"
+#--------------------------------------------------------
+def test_call_restores_the_thread_overrides():
+    transport = FakeTransport(make_response(500, "down"))
+    client = nios4.api_nios4(token="t", dbname="main", transport=transport, thread_safe=True,
+                             retry=nios4.RetryPolicy(max_attempts=1))
+    result = client.call(client.table_list, dbname="other")
+    assert result.dbname == "other"
+    assert client.dbname == "main"
+    assert client.error_code == ""
+#--------------------------------------------------------
+def test_set_defaults_is_seen_by_every_thread():
+    client = nios4.api_nios4(token="t", transport=FakeTransport(ok(tables=[])), thread_safe=True)
+    client.set_defaults(dbname="shared")
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append(client.dbname))
+    thread.start()
+    thread.join()
+    assert seen == ["shared"]
+#--------------------------------------------------------
+def test_thread_state_does_not_keep_the_client_alive():
+    client = nios4.api_nios4(token="secret", transport=FakeTransport(ok(tables=[])), thread_safe=True)
+    client.token = "per-thread-secret"
+    client.error_code = "E1"
+    ref = weakref.ref(client)
+    del client
+    gc.collect()
+    assert ref() is None
+    states = client_module._CALL_STATE.get()
+    assert states is None or len(states) == 0
+#--------------------------------------------------------
+def test_copies_have_their_own_state():
+    client = nios4.api_nios4(token="t", dbname="db", transport=FakeTransport(ok(tables=[])), thread_safe=True)
+    copy_ = copy.copy(client)
+    copy_.error_code = "E4"
+    assert client.error_code == ""
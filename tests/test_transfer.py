@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+import json
+import io
+import time
+
+import api_nios4 as nios4
+from helpers import FakeTransport, make_response
+
+#--------------------------------------------------------
+def upload_client(transport):
+    return nios4.api_nios4(token="t", dbname="db", transport=transport,
+                           retry=nios4.RetryPolicy(max_attempts=1, backoff=0, jitter=False))
+#--------------------------------------------------------
+class OneWayStream(io.RawIOBase):
+    #readable stream that cannot be rewound (a pipe, a socket)
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+    def readable(self):
+        return True
+    def seekable(self):
+        return False
+    def read(self, n=-1):
+        return self._data.read(n)
+#--------------------------------------------------------
+def test_retried_file_object_is_sent_again_from_its_start():
+    transport = FakeTransport(make_response(500, "error"), make_response(200, {"result": "OK"}))
+    manager = nios4.TransferManager(upload_client(transport), max_workers=1, retries=2)
+    source = io.BytesIO(b"x" * 100000)
+    manifest = manager.upload([(source, "g1", "documents")])
+    assert manifest["failed"] == []
+    entry = manifest["succeeded"][0]
+    assert entry["attempts"] == 2
+    assert [len(body) for body in transport.bodies] == [100000, 100000]
+#--------------------------------------------------------
+def test_file_object_is_rewound_to_its_initial_position():
+    transport = FakeTransport(make_response(500, "error"), make_response(200, {"result": "OK"}))
+    manager = nios4.TransferManager(upload_client(transport), max_workers=1)
+    source = io.BytesIO(b"header" + b"y" * 1000)
+    source.seek(6)
+    manifest = manager.upload([(source, "g1", "documents")])
+    assert manifest["failed"] == []
+    assert transport.bodies == [b"y" * 1000, b"y" * 1000]
+#--------------------------------------------------------
+def test_non_seekable_stream_is_not_retried():
+    transport = FakeTransport(make_response(500, "error"), make_response(200, {"result": "OK"}))
+    manager = nios4.TransferManager(upload_client(transport), max_workers=1, retries=3)
+    manifest = manager.upload([(OneWayStream(b"z" * 5000), "g1", "documents")])
+    assert manifest["succeeded"] == []
+    assert manifest["failed"][0]["attempts"] == 1
+    assert len(transport.calls) == 1
+#--------------------------------------------------------
+def test_upload_shorter_than_its_source_fails():
+    class Discarding:
+        #accepts the request without reading the body
+        def request(self, method, url, **kwargs):
+            return make_response(200, {"result": "OK"})
+    manager = nios4.TransferManager(upload_client(Discarding()), max_workers=1, retries=0)
+    manifest = manager.upload([(b"a" * 2048, "g1", "documents")])
+    assert manifest["failed"][0]["error_code"] == "F4"
+#--------------------------------------------------------
+def test_parallel_downloads_write_manifest(client, tmp_path):
+    jobs = [(str(tmp_path / f"f{i}.bin"), f"file-{i}", "documents") for i in range(6)]
+    manager = nios4.TransferManager(client, max_workers=3)
+    manifest = manager.download(jobs, manifest_path=str(tmp_path / "manifest.json"))
+    assert len(manifest["succeeded"]) == 6
+    assert manifest["bytes"] == 6 * 65536
+    assert all((tmp_path / f"f{i}.bin").stat().st_size == 65536 for i in range(6))
+    with open(tmp_path / "manifest.json", encoding="utf-8") as f:
+        assert json.load(f)["bytes"] == manifest["bytes"]
+#--------------------------------------------------------
+def test_failing_job_does_not_lose_the_others():
+    class Broken(io.RawIOBase):
+        def readable(self):
+            return True
+        def seekable(self):
+            raise OSError("device gone")
+    transport = FakeTransport(make_response(200, {"result": "OK"}))
+    manager = nios4.TransferManager(upload_client(transport), max_workers=2)
+    manifest = manager.upload([(b"a" * 10, "g1", "documents"), (Broken(), "g2", "documents")])
+    assert [entry["gguidrif"] for entry in manifest["succeeded"]] == ["g1"]
+    assert manifest["failed"][0]["error_code"] == "TR1"
+    assert "device gone" in manifest["failed"][0]["error_message"]
+#--------------------------------------------------------
+def test_upload_stream_throttles_before_reading_each_chunk():
+    events = []
+    stream = nios4.UploadStream(b"z" * 250, chunk_size=100,
+                                progress=lambda sent, total: events.append(("sent", sent)),
+                                throttle=lambda n: events.append(("throttle", n)))
+    assert b"".join(bytes(chunk) for chunk in stream) == b"z" * 250
+    assert events == [("throttle", 100), ("sent", 100), ("throttle", 100), ("sent", 200),
+                      ("throttle", 50), ("sent", 250)]
+#--------------------------------------------------------
+def test_bandwidth_cap_paces_every_chunk_before_it_is_sent():
+    stamps = []
+    transport = FakeTransport(make_response(200, {"result": "OK"}))
+    manager = nios4.TransferManager(upload_client(transport), max_workers=1, chunk_size=100,
+                                    max_bytes_per_second=2000)
+    throttle = manager._throttle
+    def recording(nbytes):
+        throttle(nbytes)
+        stamps.append(time.monotonic())
+    manager._throttle = recording
+    started = time.monotonic()
+    manifest = manager.upload([(b"q" * 500, "g1", "documents")])
+    assert manifest["failed"] == []
+    #one chunk of burst, then 100 bytes every 50 ms: no chunk leaves early
+    for index, stamp in enumerate(stamps):
+        assert stamp - started >= index * 0.05 - 0.005
+    assert time.monotonic() - started >= 0.2 - 0.005
+#--------------------------------------------------------
+def test_download_reserves_each_chunk_before_reading_it(client, tmp_path):
+    reserved = []
+    assert client.download_file(str(tmp_path / "f.bin"), "file-1", "documents",
+                                chunk_size=30000, throttle=reserved.append)
+    assert reserved[:3] == [30000, 30000, 30000]
+    assert sum(reserved) == 65536
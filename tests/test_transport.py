@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+import requests
+
+import api_nios4 as nios4
+from helpers import FakeTransport, ok
+
+#--------------------------------------------------------
+def test_transport_mounts_pooled_adapter():
+    transport = nios4.Nios4Transport(pool_connections=3, pool_maxsize=7, timeout=(1, 2))
+    adapter = transport.session.get_adapter("https://web.nios4.com/ws/")
+    assert adapter._pool_connections == 3
+    assert adapter._pool_maxsize == 7
+    transport.close()
+#--------------------------------------------------------
+def test_transport_applies_default_timeout(monkeypatch):
+    transport = nios4.Nios4Transport(timeout=(1, 2))
+    seen = []
+    monkeypatch.setattr(transport.session, "request", lambda method, url, **kw: seen.append(kw["timeout"]))
+    transport.request("GET", "http://localhost/")
+    transport.request("GET", "http://localhost/", timeout=9)
+    assert seen == [(1, 2), 9]
+#--------------------------------------------------------
+def test_client_routes_every_call_through_its_transport():
+    transport = FakeTransport(ok(tables=[{"tablename": "customers"}]))
+    client = nios4.api_nios4(token="t", dbname="db", transport=transport)
+    assert client.table_list() == [{"tablename": "customers"}]
+    assert client.table_list() is not None
+    assert transport.actions() == ["table_list", "table_list"]
+    client.close()
+    assert transport.closed
+#--------------------------------------------------------
+def test_clients_share_one_session(client, server):
+    session = client.transport.session
+    assert isinstance(session, requests.Session)
+    for _ in range(5):
+        assert client.table_info("customers") is not None
+    assert client.transport.session is session
+    assert server.requests["table_info"] == 5
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import io
+
+import api_nios4 as nios4
+from helpers import FakeTransport, make_response
+
+CONTENT = bytes(range(256)) * 40
+
+#--------------------------------------------------------
+class OneWay(io.RawIOBase):
+    #readable stream that cannot seek (a pipe, a socket...)
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+    def readable(self):
+        return True
+    def readinto(self, buffer):
+        return self._data.readinto(buffer)
+#--------------------------------------------------------
+def test_buffer_is_sent_in_chunks_without_copies():
+    seen = []
+    stream = nios4.UploadStream(CONTENT, chunk_size=4096, progress=lambda sent, total: seen.append((sent, total)))
+    chunks = list(stream)
+    assert all(isinstance(chunk, memoryview) for chunk in chunks)
+    assert b"".join(chunks) == CONTENT and len(stream) == len(CONTENT)
+    assert seen[-1] == (len(CONTENT), len(CONTENT)) and len(seen) == 3
+#--------------------------------------------------------
+def test_file_is_sent_from_its_position_and_rewound():
+    source = io.BytesIO(b"header" + CONTENT)
+    source.seek(6)
+    stream = nios4.UploadStream(source, chunk_size=1000)
+    assert len(stream) == len(CONTENT)
+    assert b"".join(stream) == CONTENT
+    stream.seek(0)
+    assert b"".join(stream) == CONTENT
+#--------------------------------------------------------
+def test_stream_of_unknown_size():
+    stream = nios4.UploadStream(OneWay(CONTENT), chunk_size=3000)
+    assert stream.size is None and not stream.seekable()
+    assert b"".join(bytes(chunk) for chunk in stream) == CONTENT
+#--------------------------------------------------------
+def test_upload_of_a_path(client, server, tmp_path):
+    source = tmp_path / "doc.bin"
+    source.write_bytes(CONTENT)
+    progress = []
+    assert client.upload_file(str(source), False, "doc-1", "documents", chunk_size=1024,
+                              progress=lambda sent, total: progress.append(sent))
+    assert server.files["doc-1"] == CONTENT
+    assert progress[-1] == len(CONTENT)
+#--------------------------------------------------------
+def test_upload_of_a_non_seekable_stream_is_chunked():
+    transport = FakeTransport(make_response(200, {"result": "OK"}))
+    client = nios4.api_nios4(token="t", dbname="db", transport=transport)
+    assert client.upload_file(OneWay(CONTENT), False, "doc-1", "documents")
+    method, url, kwargs = transport.calls[0]
+    #an unsized iterable: requests sends it with Transfer-Encoding: chunked
+    assert not hasattr(kwargs["data"], "__len__")
+    assert transport.bodies[0] == CONTENT
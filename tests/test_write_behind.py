@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+import json
+import time
+
+import requests
+
+import api_nios4 as nios4
+from helpers import FakeTransport, make_response
+
+#--------------------------------------------------------
+def wait_idle(buffer, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while buffer._thread is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return buffer._thread is None
+#--------------------------------------------------------
+def test_records_are_batched(client, server):
+    client.enable_write_behind("events", max_rows=10, max_delay=5)
+    futures = [client.save_record("events", {"gguid": f"e{i}", "n": i}) for i in range(10)]
+    results = [future.result(timeout=2) for future in futures]
+    assert all(result["error"] == False for result in results)
+    assert server.requests["table_save"] == 1
+    assert len(server.tables["events"]) == 50 + 10
+#--------------------------------------------------------
+def test_non_json_body_resolves_futures():
+    transport = FakeTransport(make_response(200, "<html>maintenance</html>"))
+    client = nios4.api_nios4(token="t", dbname="db", transport=transport)
+    buffer = client.enable_write_behind("events", max_rows=100, max_delay=0.05)
+    futures = [buffer.add({"gguid": f"e{i}"}) for i in range(3)]
+    results = [future.result(timeout=2) for future in futures]
+    assert [result["error_code"] for result in results] == ["E13"] * 3
+    assert wait_idle(buffer)
+    client.close()
+#--------------------------------------------------------
+def test_unexpected_error_resolves_futures_and_clears_thread():
+    transport = FakeTransport(RuntimeError("boom"))
+    client = nios4.api_nios4(token="t", dbname="db", transport=transport)
+    buffer = client.enable_write_behind("events", max_rows=100, max_delay=0.05)
+    future = buffer.add({"gguid": "e1"})
+    assert future.result(timeout=2)["error_code"] == "E13"
+    assert wait_idle(buffer)
+    #the buffer keeps working after the failure
+    transport.responses = [make_response(200, {"error": False, "rows": []})]
+    assert buffer.add({"gguid": "e2"}).result(timeout=2)["error"] == False
+    client.close()
+#--------------------------------------------------------
+def test_connection_error_is_reported_as_f1():
+    transport = FakeTransport(requests.ConnectionError("refused"))
+    client = nios4.api_nios4(token="t", dbname="db", transport=transport,
+                             retry=nios4.RetryPolicy(max_attempts=1))
+    buffer = client.enable_write_behind("events", max_rows=1)
+    assert buffer.add({"gguid": "e1"}).result(timeout=2)["error_code"] == "F1"
+    client.close()
+#--------------------------------------------------------
+def test_closed_buffer_rejects_records(client):
+    buffer = client.enable_write_behind("events")
+    buffer.close()
+    assert buffer.add({"gguid": "e1"}).result(timeout=1)["error_code"] == "WB1"
+#--------------------------------------------------------
+def test_batch_save_flushes_the_buffer_first():
+    transport = FakeTransport(make_response(200, {"error": False, "rows": []}))
+    client = nios4.api_nios4(token="t", dbname="db", transport=transport)
+    client.enable_write_behind("events", max_rows=100, max_delay=60)
+    future = client.save_record("events", {"gguid": "e1", "n": "old"})
+    client.save_records_batch("events", [{"gguid": "e1", "n": "new"}])
+    assert future.done()
+    assert [json.loads(body)["rows"] for body in transport.bodies] == [[{"gguid": "e1", "n": "old"}],
+                                                                       [{"gguid": "e1", "n": "new"}]]
+    client.close()